@@ -1,78 +1,245 @@
+import time
+from datetime import datetime, timedelta
+
 import frappe
 import requests
 from frappe import _
+from frappe.utils import cint, get_datetime, now_datetime
+
+from erpnext_zoho_integration.erpnext_zoho_integration.api.circuit_breaker import get_circuit_breaker
+from erpnext_zoho_integration.erpnext_zoho_integration.api.failures import record_failure
+from erpnext_zoho_integration.erpnext_zoho_integration.api.http_session import DEFAULT_TIMEOUT, get_session
+from erpnext_zoho_integration.erpnext_zoho_integration.api.journal import get_journal, is_replaying
 from erpnext_zoho_integration.erpnext_zoho_integration.api.oauth import refresh_access_token
-from datetime import datetime, timedelta
+from erpnext_zoho_integration.erpnext_zoho_integration.api.rate_limit import (
+    MAX_RETRIES,
+    RETRY_STATUS_CODES,
+    backoff_delay,
+    get_rate_limiter,
+    get_retry_after,
+)
+from erpnext_zoho_integration.erpnext_zoho_integration.api.telemetry import get_telemetry, timed
+from erpnext_zoho_integration.erpnext_zoho_integration.api.token_cache import (
+    count,
+    get_cached_token,
+    refresh_lock,
+    set_cached_token,
+)
+
+API_BASE_URL = "https://campaigns.zoho.in/api/v1.1"
+DEFAULT_RECIPIENT_PAGE_SIZE = 200
+CAMPAIGN_PAGE_SIZE = 50
+DEFAULT_MAX_WORKERS = 4
 
-from frappe.utils import get_datetime, now_datetime
 
 def get_valid_token():
-    """Get valid access token, refresh if expired"""
-    settings = frappe.get_single("Zoho Settings")
+    """
+    Get valid access token, refresh if expired.
 
-    if not settings.is_active:
-        frappe.throw(_("Zoho integration is not active"))
+    The token is served from process memory or Redis. Only on a miss are Zoho
+    Settings read, under a Redis lock so a single worker refreshes an expired
+    token while the others wait for it.
+    """
+    if is_replaying():
+        # Responses come from the journal, no request is ever sent
+        return None
+    
+    token = get_cached_token()
+    if token:
+        return token
+    
+    with refresh_lock():
+        # Another worker may have refreshed it while we waited for the lock; the miss is counted already
+        token = get_cached_token(record_stats=False)
+        if token:
+            return token
+        
+        settings = frappe.get_single("Zoho Settings")
+        
+        if not settings.is_active:
+            frappe.throw(_("Zoho integration is not active"))
+        
+        token_expiry = get_datetime(settings.token_expiry)
+        
+        # Refresh if expired or about to expire (5 min buffer)
+        if token_expiry and now_datetime() >= (token_expiry - timedelta(minutes=5)):
+            count("refresh", shared=True)
+            return refresh_access_token()
+        
+        token = settings.get_password("access_token")
+        set_cached_token(token, token_expiry)
+        return token
 
-    token_expiry = get_datetime(settings.token_expiry)
 
-    # Refresh if expired or about to expire (5 min buffer)
-    if token_expiry and now_datetime() >= (token_expiry - timedelta(minutes=5)):
+def refresh_rejected_token(rejected_token):
+    """Replace a token Zoho answered 401 for, unless another worker already did"""
+    with refresh_lock():
+        token = get_cached_token(record_stats=False)
+        if token and token != rejected_token:
+            return token
+        
+        count("refresh", shared=True)
         return refresh_access_token()
 
-    return settings.get_password("access_token")
 
+class ZohoAPIError(Exception):
+    """Zoho answered the request with a non-success status"""
 
-def make_api_call(endpoint, method="GET", params=None, data=None):
-    """Generic API call handler with automatic token refresh"""
-    token = get_valid_token()
+
+def send_api_request(
+    endpoint,
+    token,
+    method="GET",
+    params=None,
+    data=None,
+    limiter=None,
+    telemetry=None,
+    base_url=API_BASE_URL,
+    journal=None,
+    breaker=None
+):
+    """
+    Perform a single Zoho Campaigns API request with the given token.
+
+    Waits for the shared rate limiter before every attempt, and retries 429/5xx
+    responses and connection errors with jittered exponential backoff, honouring
+    Retry-After. Does not touch frappe.local, so it can run on worker threads.
+    Every attempt is recorded in `telemetry` when given. Responses are appended to
+    `journal`, or served from it without any request while it is replaying.
+    Every attempt goes through the host's circuit `breaker` when given, which raises
+    CircuitOpen instead of sending while the host is failing.
+    Raises requests.exceptions.HTTPError for HTTP failures and ZohoAPIError when
+    Zoho reports an error in the response body.
+    """
+    if journal and journal.replaying:
+        start = time.monotonic()
+        result = journal.replay(endpoint, params)
+        record_attempt(telemetry, endpoint, "journal", start)
+        return result
     
     headers = {
         "Authorization": f"Zoho-oauthtoken {token}"
     }
     
-    url = f"https://campaigns.zoho.in/api/v1.1/{endpoint}"
+    url = f"{base_url}/{endpoint}"
+    session = get_session()
     
-    try:
-        if method == "GET":
-            response = requests.get(url, headers=headers, params=params)
-        elif method == "POST":
-            response = requests.post(url, headers=headers, params=params, json=data)
+    for attempt in range(MAX_RETRIES + 1):
+        if breaker:
+            breaker.check()
+        if limiter:
+            limiter.acquire()
         
-        response.raise_for_status()
-        result = response.json()
-        
-        # Check Zoho's response status
-        if result.get("status") != "success":
-            msg = result.get("message", "").lower()
-            if "no contacts" in msg:
-                return result
-            frappe.throw(_(f"Zoho API Error: {result.get('message')}"))
-        
-        return result
-        
-    except requests.exceptions.HTTPError as e:
-        # If unauthorized, try refreshing token once
-        if e.response.status_code == 401:
-            token = refresh_access_token()
-            headers["Authorization"] = f"Zoho-oauthtoken {token}"
-            
+        start = time.monotonic()
+        try:
             if method == "GET":
-                response = requests.get(url, headers=headers, params=params)
+                response = session.get(url, headers=headers, params=params, timeout=DEFAULT_TIMEOUT)
             elif method == "POST":
-                response = requests.post(url, headers=headers, params=params, json=data)
-            
-            response.raise_for_status()
-            return response.json()
-        else:
+                response = session.post(url, headers=headers, params=params, json=data, timeout=DEFAULT_TIMEOUT)
+        except (requests.exceptions.ConnectionError, requests.exceptions.Timeout):
+            record_attempt(telemetry, endpoint, "error", start)
+            if breaker:
+                breaker.record(None)
+            if attempt == MAX_RETRIES:
+                raise
+            if telemetry:
+                telemetry.incr("zoho_api_retries_total", endpoint=endpoint)
+            time.sleep(backoff_delay(attempt))
+            continue
+        
+        record_attempt(telemetry, endpoint, response.status_code, start, len(response.content))
+        if breaker:
+            breaker.record(response.status_code)
+        if response.status_code in RETRY_STATUS_CODES and attempt < MAX_RETRIES:
+            if telemetry:
+                telemetry.incr("zoho_api_retries_total", endpoint=endpoint)
+            delay = get_retry_after(response)
+            if delay is None:
+                delay = backoff_delay(attempt)
+            elif response.status_code == 429 and limiter:
+                # Zoho told us how long to back off, hold every worker back with us
+                limiter.pause(delay)
+            time.sleep(delay)
+            continue
+        
+        break
+    
+    response.raise_for_status()
+    result = response.json()
+    
+    # Check Zoho's response status
+    if result.get("status") != "success":
+        msg = (result.get("message") or "").lower()
+        if "no contacts" not in msg:
+            raise ZohoAPIError(result.get("message"))
+    
+    if journal:
+        journal.record(endpoint, params, result)
+    
+    return result
+
+
+def record_attempt(telemetry, endpoint, status, start, size=0):
+    if not telemetry:
+        return
+    telemetry.observe("zoho_api_request_seconds", time.monotonic() - start, endpoint=endpoint)
+    telemetry.incr("zoho_api_requests_total", endpoint=endpoint, status=status)
+    telemetry.incr("zoho_api_bytes_total", size, endpoint=endpoint)
+
+
+@timed("make_api_call")
+def make_api_call(endpoint, method="GET", params=None, data=None):
+    """Generic API call handler with automatic token refresh"""
+    token = get_valid_token()
+    limiter = get_rate_limiter()
+    telemetry = get_telemetry()
+    base_url = get_api_base_url()
+    journal = get_journal()
+    breaker = get_circuit_breaker(base_url)
+    
+    try:
+        try:
+            return send_api_request(
+                endpoint, token, method, params, data, limiter, telemetry, base_url, journal, breaker
+            )
+        except requests.exceptions.HTTPError as e:
+            # If unauthorized, try refreshing token once
+            if e.response is not None and e.response.status_code == 401:
+                token = refresh_rejected_token(token)
+                return send_api_request(
+                    endpoint, token, method, params, data, limiter, telemetry, base_url, journal, breaker
+                )
             raise
+    except ZohoAPIError as e:
+        frappe.throw(_("Zoho API Error: {0}").format(str(e)))
+
+
+def get_api_base_url():
+    """Root of the Campaigns API; zoho_campaigns_api_url in site config points the sync elsewhere"""
+    return (frappe.conf.get("zoho_campaigns_api_url") or API_BASE_URL).rstrip("/")
+
+
+def get_max_workers():
+    """Number of concurrent Zoho requests allowed during a sync, from Zoho Settings"""
+    workers = cint(frappe.db.get_single_value("Zoho Settings", "max_concurrent_requests"))
+    return workers if workers > 0 else DEFAULT_MAX_WORKERS
+
+
+def is_unauthorized(error):
+    return (
+        isinstance(error, requests.exceptions.HTTPError)
+        and error.response is not None
+        and error.response.status_code == 401
+    )
 
 
 @frappe.whitelist()
-def get_recent_campaigns(limit=20):
+def get_recent_campaigns(limit=20, fromindex=1):
     """Fetch recent campaigns with proper response parsing"""
     try:
         params = {
             "resfmt": "JSON",
+            "fromindex": cint(fromindex) or 1,
             "range": limit
         }
         data = make_api_call("recentcampaigns", params=params)
@@ -88,7 +255,7 @@ def get_recent_campaigns(limit=20):
         }
         
     except Exception as e:
-        frappe.log_error(frappe.get_traceback(), _("Zoho Get Recent Campaigns Error"))
+        record_failure(_("Zoho Get Recent Campaigns Error"), endpoint="recentcampaigns")
         frappe.throw(_("Failed to fetch campaigns: {0}").format(str(e)))
 
 
@@ -102,21 +269,23 @@ def get_campaign_report(campaign_key):
         }
         data = make_api_call("campaignreports", params=params)
         
-        # Parse response sections
-        report = {
-            "campaign_details": data.get("campaign-details", [{}])[0],
-            "campaign_reports": data.get("campaign-reports", [{}])[0],
-            "campaign_reach": data.get("campaign-reach", [{}])[0],
-            "campaign_by_location": data.get("campaign-by-loaction", {}),  # Note: Zoho typo "loaction"
-        }
-        
-        return report
+        return parse_campaign_report(data)
         
     except Exception as e:
-        frappe.log_error(frappe.get_traceback(), _("Zoho Get Campaign Report Error"))
+        record_failure(_("Zoho Get Campaign Report Error"), endpoint="campaignreports")
         frappe.throw(_("Failed to fetch campaign report: {0}").format(str(e)))
 
 
+def parse_campaign_report(data):
+    """Pick the report sections out of a campaignreports response"""
+    return {
+        "campaign_details": data.get("campaign-details", [{}])[0],
+        "campaign_reports": data.get("campaign-reports", [{}])[0],
+        "campaign_reach": data.get("campaign-reach", [{}])[0],
+        "campaign_by_location": data.get("campaign-by-loaction", {}),  # Note: Zoho typo "loaction"
+    }
+
+
 @frappe.whitelist()
 def get_campaign_recipients(campaign_key, action="openedcontacts", fromindex=1, range_val=20):
     """
@@ -146,10 +315,34 @@ def get_campaign_recipients(campaign_key, action="openedcontacts", fromindex=1,
         }
         
     except Exception as e:
-        frappe.log_error(frappe.get_traceback(), _("Zoho Get Campaign Recipients Error"))
+        record_failure(_("Zoho Get Campaign Recipients Error"), endpoint="getcampaignrecipientsdata")
         frappe.throw(_("Failed to fetch campaign recipients: {0}").format(str(e)))
 
 
+def iter_recent_campaign_pages(page_size=CAMPAIGN_PAGE_SIZE):
+    """Walk every campaign of the account, newest first, one page at a time"""
+    fromindex = 1
+    
+    while True:
+        result = get_recent_campaigns(limit=page_size, fromindex=fromindex)
+        campaigns = result.get("campaigns") or []
+        
+        if not campaigns:
+            return
+        
+        yield campaigns
+        
+        fromindex += len(campaigns)
+        if fromindex > result.get("total_count", 0):
+            return
+
+
+def get_recipient_page_size():
+    """Page size used when walking recipient lists, from Zoho Settings"""
+    page_size = cint(frappe.db.get_single_value("Zoho Settings", "recipient_page_size"))
+    return page_size if page_size > 0 else DEFAULT_RECIPIENT_PAGE_SIZE
+
+
 @frappe.whitelist()
 def sync_campaign_data(campaign_key):
     """
@@ -187,5 +380,5 @@ def sync_campaign_data(campaign_key):
         }
         
     except Exception as e:
-        frappe.log_error(frappe.get_traceback(), _("Zoho Sync Campaign Data Error"))
+        record_failure(_("Zoho Sync Campaign Data Error"))
         frappe.throw(_("Failed to sync campaign data: {0}").format(str(e)))
\ No newline at end of file
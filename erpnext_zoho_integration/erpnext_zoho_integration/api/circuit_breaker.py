@@ -0,0 +1,135 @@
+from urllib.parse import urlparse
+
+import frappe
+from frappe.utils import cint
+
+BREAKER_KEY = "zoho_circuit_breaker"
+
+DEFAULT_FAILURE_THRESHOLD = 5
+DEFAULT_OPEN_SECONDS = 60
+
+# Seconds a half-open probe may take before another caller may probe instead
+PROBE_TIMEOUT = 90
+
+# Decides whether a request to the host may be sent, using Redis' clock so workers on
+# different hosts agree. Returns 0 to go, or the ms until the circuit lets a call through.
+ALLOW_SCRIPT = """
+local breaker = redis.call('HMGET', KEYS[1], 'state', 'until')
+local state = breaker[1]
+if not state or state == 'closed' then
+    return 0
+end
+
+local clock = redis.call('TIME')
+local now = clock[1] * 1000 + math.floor(clock[2] / 1000)
+local wait = (tonumber(breaker[2]) or 0) - now
+if wait > 0 then
+    return wait
+end
+
+-- Open long enough, or the last probe never reported back: this caller probes
+redis.call('HSET', KEYS[1], 'state', 'half_open', 'until', now + tonumber(ARGV[1]))
+return 0
+"""
+
+# Counts a failed call and opens the circuit at the threshold, or at once when a probe failed
+FAILURE_SCRIPT = """
+local failures = redis.call('HINCRBY', KEYS[1], 'failures', 1)
+local state = redis.call('HGET', KEYS[1], 'state')
+if state == 'half_open' or (state ~= 'open' and failures >= tonumber(ARGV[1])) then
+    local clock = redis.call('TIME')
+    local now = clock[1] * 1000 + math.floor(clock[2] / 1000)
+    redis.call('HSET', KEYS[1], 'state', 'open', 'until', now + tonumber(ARGV[2]), 'opened_on', clock[1])
+end
+return failures
+"""
+
+
+class CircuitOpen(Exception):
+    """The circuit of a Zoho host is open: the call was not sent"""
+
+    def __init__(self, host, retry_in):
+        self.host = host
+        self.retry_in = retry_in
+        super().__init__(f"{host} is failing, calls are suspended for another {retry_in:.0f}s")
+
+
+class CircuitBreaker:
+    """
+    Circuit breaker of one Zoho host shared by every worker of the site through Redis.
+
+    Closed, calls go through and consecutive failures are counted. After
+    `failure_threshold` of them the circuit opens and calls fail fast with CircuitOpen
+    for `open_seconds`. Then it is half-open: one probe call at a time goes through,
+    closing the circuit on success and opening it again on failure.
+
+    Built on the main thread with get_circuit_breaker(); it only talks to Redis, so
+    the same instance can be used from the sync's worker threads.
+    """
+
+    def __init__(self, cache, host, failure_threshold, open_seconds):
+        self.cache = cache
+        self.host = host
+        self.failure_threshold = failure_threshold
+        self.open_seconds = open_seconds
+        self.key = cache.make_key(f"{BREAKER_KEY}:{host}")
+        self.allow_script = cache.register_script(ALLOW_SCRIPT)
+        self.failure_script = cache.register_script(FAILURE_SCRIPT)
+
+    def check(self):
+        """Raise CircuitOpen unless a call may be sent now"""
+        wait = cint(self.allow_script(keys=[self.key], args=[PROBE_TIMEOUT * 1000]))
+        if wait > 0:
+            raise CircuitOpen(self.host, wait / 1000)
+
+    def record(self, status):
+        """
+        Report the outcome of a call: its HTTP status, or None when no response came
+        back. Only server errors and network failures count against the host.
+        """
+        if status is None or status >= 500:
+            self.failure_script(keys=[self.key], args=[self.failure_threshold, self.open_seconds * 1000])
+        else:
+            self.cache.delete(self.key)
+
+
+def get_circuit_breaker(url):
+    """Circuit breaker of the host of `url` configured in Zoho Settings, None when disabled"""
+    threshold = cint(frappe.db.get_single_value("Zoho Settings", "circuit_failure_threshold"))
+    if threshold <= 0:
+        return None
+
+    open_seconds = cint(frappe.db.get_single_value("Zoho Settings", "circuit_open_seconds"))
+    return CircuitBreaker(
+        frappe.cache(),
+        urlparse(url).hostname,
+        threshold,
+        open_seconds if open_seconds > 0 else DEFAULT_OPEN_SECONDS,
+    )
+
+
+def get_circuit_state(url):
+    """State of the circuit of the host of `url`: closed, open or half_open"""
+    host = urlparse(url).hostname
+    cache = frappe.cache()
+    key = cache.make_key(f"{BREAKER_KEY}:{host}")
+    state, failures, opened_on = (
+        value.decode() if isinstance(value, bytes) else value
+        for value in cache.hmget(key, ["state", "failures", "opened_on"])
+    )
+    return {
+        "host": host,
+        "state": state or "closed",
+        "failures": cint(failures),
+        "opened_on": cint(opened_on) or None,
+    }
+
+
+@frappe.whitelist()
+def get_circuit_states():
+    """Circuit states of the Zoho hosts the sync talks to, for the Zoho Settings form"""
+    from erpnext_zoho_integration.erpnext_zoho_integration.api.campaigns import get_api_base_url
+    from erpnext_zoho_integration.erpnext_zoho_integration.api.oauth import TOKEN_URL
+
+    frappe.only_for("System Manager")
+    return [get_circuit_state(get_api_base_url()), get_circuit_state(TOKEN_URL)]
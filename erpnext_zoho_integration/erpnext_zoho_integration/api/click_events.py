@@ -0,0 +1,276 @@
+import hashlib
+
+import frappe
+from frappe.utils import get_datetime, now_datetime
+
+from erpnext_zoho_integration.erpnext_zoho_integration.api.payload_parser import parse_click_events
+
+CLICK_FIELDS = (
+    "name",
+    "owner",
+    "creation",
+    "modified",
+    "modified_by",
+    "docstatus",
+    "idx",
+    "parent",
+    "parenttype",
+    "parentfield",
+    "url",
+    "click_time",
+    "click_count",
+    "campaign",
+    "url_hash",
+)
+
+LINK_STATS_FIELDS = (
+    "name",
+    "owner",
+    "creation",
+    "modified",
+    "modified_by",
+    "docstatus",
+    "idx",
+    "campaign",
+    "url",
+    "url_hash",
+    "total_clicks",
+    "unique_clicks",
+    "last_clicked_on",
+)
+
+# Columns refreshed when the link already has a stats row; it keeps its name and creation
+LINK_STATS_UPDATE_FIELDS = ("modified", "modified_by", "total_clicks", "unique_clicks", "last_clicked_on")
+
+
+def write_click_events(campaign_name, rows):
+    """
+    Replace the Campaign Click rows of a page of clicked recipients and refresh the
+    Campaign Link Stats of every URL they clicked, before or now.
+    """
+    rows = [row for row in rows if row.get("email")]
+    if not rows:
+        return
+
+    recipients = {
+        email.lower(): name
+        for email, name in frappe.get_all(
+            "Campaign Recipient",
+            filters={
+                "campaign": campaign_name,
+                "action_type": "Clicked",
+                "email": ["in", [row["email"] for row in rows]],
+            },
+            fields=["email", "name"],
+            as_list=True,
+        )
+    }
+    if not recipients:
+        return
+
+    parents = list(recipients.values())
+    url_hashes = set(
+        frappe.get_all("Campaign Click", filters={"parent": ["in", parents]}, pluck="url_hash", distinct=True)
+    )
+    frappe.db.delete("Campaign Click", {"parent": ["in", parents], "parenttype": "Campaign Recipient"})
+
+    now = now_datetime()
+    user = frappe.session.user
+    clicks = []
+    for row in rows:
+        parent = recipients.get(row["email"].lower())
+        if not parent:
+            continue
+
+        events = parse_click_events(row.get("click_reports"), row.get("clicked_links"))
+        for idx, (url, click_time, count) in enumerate(events, 1):
+            url_hash = get_url_hash(url)
+            url_hashes.add(url_hash)
+            clicks.append(
+                [
+                    frappe.generate_hash(length=10),
+                    user,
+                    now,
+                    now,
+                    user,
+                    0,
+                    idx,
+                    parent,
+                    "Campaign Recipient",
+                    "clicks",
+                    url,
+                    click_time or row.get("action_date"),
+                    count,
+                    campaign_name,
+                    url_hash,
+                ]
+            )
+
+    if clicks:
+        frappe.db.bulk_insert("Campaign Click", CLICK_FIELDS, clicks)
+
+    refresh_link_stats(campaign_name, url_hashes)
+
+
+def add_click_events(campaign_name, clicks):
+    """
+    Append single clicks, as (email, url, click_time) tuples reported by webhooks, to the
+    Campaign Click rows of clicked recipients. Zoho retries deliveries it got no answer
+    for, so a click the recipient already has, same URL and time, is not added again.
+    """
+    clicks = [click for click in clicks if click[0] and click[1]]
+    if not clicks:
+        return
+
+    recipients = {
+        email.lower(): name
+        for email, name in frappe.get_all(
+            "Campaign Recipient",
+            filters={
+                "campaign": campaign_name,
+                "action_type": "Clicked",
+                "email": ["in", list({email for email, _url, _time in clicks})],
+            },
+            fields=["email", "name"],
+            as_list=True,
+        )
+    }
+    if not recipients:
+        return
+
+    parents = list(recipients.values())
+    last_idx = dict(
+        frappe.get_all(
+            "Campaign Click",
+            filters={"parent": ["in", parents]},
+            fields=["parent", "max(idx) as idx"],
+            group_by="parent",
+            as_list=True,
+        )
+    )
+    stored = {
+        (parent, url, get_datetime(click_time))
+        for parent, url, click_time in frappe.get_all(
+            "Campaign Click",
+            filters={"parent": ["in", parents], "parenttype": "Campaign Recipient"},
+            fields=["parent", "url", "click_time"],
+            as_list=True,
+        )
+    }
+
+    now = now_datetime()
+    user = frappe.session.user
+    rows = []
+    url_hashes = set()
+    for email, url, click_time in clicks:
+        parent = recipients.get(email.lower())
+        if not parent:
+            continue
+
+        click = (parent, url, get_datetime(click_time))
+        if click in stored:
+            continue
+        stored.add(click)
+
+        last_idx[parent] = (last_idx.get(parent) or 0) + 1
+        url_hash = get_url_hash(url)
+        url_hashes.add(url_hash)
+        rows.append(
+            [
+                frappe.generate_hash(length=10),
+                user,
+                now,
+                now,
+                user,
+                0,
+                last_idx[parent],
+                parent,
+                "Campaign Recipient",
+                "clicks",
+                url,
+                click_time,
+                1,
+                campaign_name,
+                url_hash,
+            ]
+        )
+
+    if rows:
+        frappe.db.bulk_insert("Campaign Click", CLICK_FIELDS, rows)
+    refresh_link_stats(campaign_name, url_hashes)
+
+
+def refresh_link_stats(campaign_name, url_hashes):
+    """Recompute the Campaign Link Stats of some URLs of a campaign from its Campaign Click rows"""
+    url_hashes = list(url_hashes)
+    if not url_hashes:
+        return
+
+    totals = {
+        row.url_hash: row
+        for row in frappe.db.sql(
+            """
+            select url_hash, min(url) as url, sum(click_count) as total_clicks,
+                count(distinct parent) as unique_clicks, max(click_time) as last_clicked_on
+            from `tabCampaign Click`
+            where campaign = %(campaign)s and url_hash in %(url_hashes)s
+            group by url_hash
+            """,
+            {"campaign": campaign_name, "url_hashes": url_hashes},
+            as_dict=True,
+        )
+    }
+
+    # Links nobody clicks anymore, e.g. after Zoho corrected a report
+    gone = [url_hash for url_hash in url_hashes if url_hash not in totals]
+    if gone:
+        frappe.db.delete("Campaign Link Stats", {"campaign": campaign_name, "url_hash": ["in", gone]})
+
+    if not totals:
+        return
+
+    now = now_datetime()
+    user = frappe.session.user
+    values = []
+    for url_hash, row in totals.items():
+        values.extend(
+            [
+                frappe.generate_hash(length=10),
+                user,
+                now,
+                now,
+                user,
+                0,
+                0,
+                campaign_name,
+                row.url,
+                url_hash,
+                row.total_clicks,
+                row.unique_clicks,
+                row.last_clicked_on,
+            ]
+        )
+
+    # Upserted on unique_campaign_url, so a webhook writing the same link concurrently updates
+    # the row instead of failing on a duplicate key
+    if frappe.db.db_type == "postgres":
+        conflict = "on conflict (campaign, url_hash) do update set " + ", ".join(
+            f"`{field}` = excluded.`{field}`" for field in LINK_STATS_UPDATE_FIELDS
+        )
+    else:
+        conflict = "on duplicate key update " + ", ".join(
+            f"`{field}` = values(`{field}`)" for field in LINK_STATS_UPDATE_FIELDS
+        )
+
+    placeholders = "(" + ", ".join(["%s"] * len(LINK_STATS_FIELDS)) + ")"
+    frappe.db.sql(
+        f"""insert into `tabCampaign Link Stats` ({", ".join(f"`{field}`" for field in LINK_STATS_FIELDS)})
+        values {", ".join([placeholders] * len(totals))}
+        {conflict}""",
+        values,
+    )
+
+
+def get_url_hash(url):
+    """Fixed-length key of a URL, which is too long to index itself"""
+    return hashlib.sha1(url.encode()).hexdigest()
@@ -0,0 +1,104 @@
+import time
+
+import frappe
+from frappe.utils import cint
+
+DEFAULT_COMMIT_ROWS = 1000
+DEFAULT_COMMIT_SECONDS = 10
+
+# Savepoint each page, and each replayed row of a failed page, is written under
+SYNC_SAVEPOINT = "zoho_sync_write"
+
+
+class CommitPolicy:
+    """
+    Groups the sync's writes into transactions of at most `rows` rows, kept open at most
+    `seconds` seconds, instead of one commit per page or per job.
+
+    Work that may only happen once its rows are durable, such as moving a recipient
+    cursor, is passed to add() and runs after the commit; a rollback drops it.
+    """
+
+    def __init__(self, rows=DEFAULT_COMMIT_ROWS, seconds=DEFAULT_COMMIT_SECONDS):
+        self.rows = rows
+        self.seconds = seconds
+        self.reset()
+
+    def reset(self):
+        self.pending_rows = 0
+        self.pending_keys = set()
+        self.callbacks = []
+        self.opened = None
+
+    def add(self, rows, key=None, on_commit=None):
+        """Count rows written in the open transaction, committing once the batch is full"""
+        if self.opened is None:
+            self.opened = time.monotonic()
+        self.pending_rows += rows
+        if key is not None:
+            self.pending_keys.add(key)
+        if on_commit:
+            self.callbacks.append(on_commit)
+
+        if self.pending_rows >= self.rows or time.monotonic() - self.opened >= self.seconds:
+            self.commit()
+
+    def commit(self):
+        frappe.db.commit()
+        callbacks = self.callbacks
+        self.reset()
+        for callback in callbacks:
+            callback()
+
+    def rollback(self):
+        """Roll back the open batch, returns the keys of the work that was lost with it"""
+        frappe.db.rollback()
+        lost = self.pending_keys
+        self.reset()
+        return lost
+
+
+def get_commit_policy():
+    """Commit policy of the recipient sync, from Zoho Settings"""
+    rows = cint(frappe.db.get_single_value("Zoho Settings", "commit_batch_rows"))
+    seconds = cint(frappe.db.get_single_value("Zoho Settings", "commit_interval"))
+    return CommitPolicy(
+        rows if rows > 0 else DEFAULT_COMMIT_ROWS,
+        seconds if seconds > 0 else DEFAULT_COMMIT_SECONDS,
+    )
+
+
+def write_with_savepoint(write, items):
+    """
+    Call write(items) inside a savepoint. If it fails, only its own writes are rolled back
+    and the items are replayed one at a time, so a bad row costs itself and not the batch.
+
+    Returns (item, traceback) of the items that could not be written. Raises when the
+    savepoint itself is gone, e.g. after a deadlock rolled back the whole transaction.
+    """
+    frappe.db.savepoint(SYNC_SAVEPOINT)
+    try:
+        write(items)
+    except Exception:
+        rollback_to_savepoint()
+    else:
+        frappe.db.release_savepoint(SYNC_SAVEPOINT)
+        return []
+
+    failed = []
+    for item in items:
+        frappe.db.savepoint(SYNC_SAVEPOINT)
+        try:
+            write([item])
+        except Exception:
+            failed.append((item, frappe.get_traceback()))
+            rollback_to_savepoint()
+        else:
+            frappe.db.release_savepoint(SYNC_SAVEPOINT)
+    return failed
+
+
+def rollback_to_savepoint():
+    frappe.db.rollback(save_point=SYNC_SAVEPOINT)
+    # Contacts the resolver saw created may have been rolled back with the rows
+    frappe.flags.zoho_contact_resolver = None
@@ -0,0 +1,347 @@
+import frappe
+from frappe.utils import now_datetime
+
+from erpnext_zoho_integration.erpnext_zoho_integration.api.telemetry import count_db_writes
+from erpnext_zoho_integration.erpnext_zoho_integration.api.utils import payload_hash
+
+# Zoho recipient keys copied onto the Contact, hashed to detect changes
+CONTACT_PAYLOAD_KEYS = ("contactid", "contactstatus", "companyname", "jobtitle")
+
+# Insert attempts for contacts whose name another worker took in the meantime
+CREATE_ATTEMPTS = 3
+
+STANDARD_FIELDS = ("name", "owner", "creation", "modified", "modified_by", "docstatus", "idx")
+CHILD_FIELDS = (*STANDARD_FIELDS, "parent", "parenttype", "parentfield")
+CONTACT_FIELDS = (
+    *STANDARD_FIELDS,
+    "first_name",
+    "last_name",
+    "full_name",
+    "email_id",
+    "phone",
+    "status",
+    "zoho_contact_id",
+    "zoho_status",
+    "zoho_last_synced",
+    "zoho_payload_hash",
+    "company_name",
+    "designation",
+)
+
+
+class ContactResolver:
+    """
+    Index of Zoho recipients to ERPNext Contacts for the duration of one sync run.
+
+    Every batch of recipients costs one IN query on Contact Email.email_id and one on
+    Contact (by zoho_contact_id or name) for the keys not seen before in the run. Zoho fields of
+    known contacts are updated with one bulk UPDATE and missing contacts are created
+    with multi-row INSERTs, so lookups scale with batches rather than rows.
+    """
+
+    def __init__(self):
+        self.by_zoho_id = {}
+        self.by_email = {}
+        # contact name -> {"hash", "company_name", "designation"} as last written
+        self.contacts = {}
+        self.skipped_writes = 0
+
+    def resolve(self, recipients, update_known=True):
+        """
+        Return a dict of lower-cased email -> Contact name for a batch of Zoho recipients.
+
+        With update_known=False known contacts are only looked up, not updated, for
+        partial payloads such as webhook events.
+        """
+        recipients = [r for r in recipients if r.get("contactemailaddress")]
+        self.preload(recipients)
+
+        resolved = {}
+        updates = {}
+        missing = {}
+        missing_ids = set()
+        deferred = []
+        for recipient_data in recipients:
+            email = recipient_data["contactemailaddress"].lower()
+            name = self.lookup(recipient_data)
+
+            if not name:
+                zoho_contact_id = recipient_data.get("contactid")
+                if email in missing or (zoho_contact_id and zoho_contact_id in missing_ids):
+                    # Same person again in this batch, resolved once it is created
+                    deferred.append(recipient_data)
+                else:
+                    missing[email] = recipient_data
+                    if zoho_contact_id:
+                        missing_ids.add(zoho_contact_id)
+                continue
+
+            resolved[email] = name
+            self.remember(name, recipient_data)
+            if not update_known:
+                continue
+            contact_hash = contact_payload_hash(recipient_data)
+            if self.contacts.get(name, {}).get("hash") == contact_hash:
+                self.skipped_writes += 1
+            else:
+                updates[name] = self.zoho_values(name, recipient_data, contact_hash)
+
+        if updates:
+            frappe.db.bulk_update("Contact", updates)
+            count_db_writes("Contact", "update", len(updates))
+
+        if missing:
+            resolved.update(self.create_contacts(list(missing.values())))
+
+        for recipient_data in deferred:
+            resolved[recipient_data["contactemailaddress"].lower()] = self.lookup(recipient_data)
+
+        return resolved
+
+    def lookup(self, recipient_data):
+        zoho_contact_id = recipient_data.get("contactid")
+        if zoho_contact_id and zoho_contact_id in self.by_zoho_id:
+            return self.by_zoho_id[zoho_contact_id]
+
+        return self.by_email.get(recipient_data["contactemailaddress"].lower())
+
+    def remember(self, name, recipient_data):
+        if recipient_data.get("contactid"):
+            self.by_zoho_id.setdefault(recipient_data["contactid"], name)
+        self.by_email.setdefault(recipient_data["contactemailaddress"].lower(), name)
+
+    def preload(self, recipients):
+        """Load the contacts of a batch that are not in the index yet, two queries at most"""
+        zoho_ids = {
+            r["contactid"] for r in recipients if r.get("contactid") and r["contactid"] not in self.by_zoho_id
+        }
+        emails = {
+            r["contactemailaddress"].lower()
+            for r in recipients
+            if r["contactemailaddress"].lower() not in self.by_email
+        }
+
+        if emails:
+            self.load_emails(emails)
+
+        # Contacts matched by email are fetched together with the Zoho id lookup
+        names = {self.by_email[email] for email in emails if email in self.by_email} - set(self.contacts)
+        if not zoho_ids and not names:
+            return
+
+        or_filters = []
+        if zoho_ids:
+            or_filters.append(["zoho_contact_id", "in", list(zoho_ids)])
+        if names:
+            or_filters.append(["name", "in", list(names)])
+
+        for contact in frappe.get_all(
+            "Contact",
+            or_filters=or_filters,
+            fields=["name", "zoho_contact_id", "zoho_payload_hash", "company_name", "designation"],
+        ):
+            if contact.zoho_contact_id:
+                self.by_zoho_id.setdefault(contact.zoho_contact_id, contact.name)
+            self.contacts[contact.name] = {
+                "hash": contact.zoho_payload_hash,
+                "company_name": contact.company_name,
+                "designation": contact.designation,
+            }
+
+    def load_emails(self, emails):
+        """Index the contacts of these lower-cased emails"""
+        for email_id, parent in frappe.get_all(
+            "Contact Email",
+            filters={"email_id": ["in", list(emails)], "parenttype": "Contact"},
+            fields=["email_id", "parent"],
+            as_list=True,
+        ):
+            self.by_email.setdefault(email_id.lower(), parent)
+
+    def zoho_values(self, name, recipient_data, contact_hash):
+        """Zoho fields to write on an existing contact; company and designation are only filled when empty"""
+        known = self.contacts.setdefault(name, {})
+        known["hash"] = contact_hash
+        values = {
+            "zoho_contact_id": recipient_data.get("contactid"),
+            "zoho_status": recipient_data.get("contactstatus"),
+            "zoho_last_synced": now_datetime(),
+            "zoho_payload_hash": contact_hash,
+        }
+
+        # Update company and designation if not already set
+        if not known.get("company_name") and recipient_data.get("companyname"):
+            values["company_name"] = known["company_name"] = recipient_data.get("companyname")
+        if not known.get("designation") and recipient_data.get("jobtitle"):
+            values["designation"] = known["designation"] = recipient_data.get("jobtitle")
+
+        return values
+
+    def create_contacts(self, recipients):
+        """
+        Create Contacts, with their email and phone rows, for recipients not in ERPNext yet.
+
+        Other workers may create the same contacts at the same time. Contacts are inserted
+        skipping duplicates of the unique zoho_contact_id or of the name, then read back: a
+        Zoho id another worker stored resolves to that worker's contact, and a name taken in
+        the meantime is retried with the next free number.
+        """
+        created = {}
+        # Names found taken by an insert; a plain read may not see them in this transaction
+        collided = set()
+        for _attempt in range(CREATE_ATTEMPTS):
+            recipients = self.insert_contacts(recipients, created, collided)
+            if not recipients:
+                break
+        return created
+
+    def insert_contacts(self, recipients, created, collided):
+        """One insert attempt, adds the resolved emails to `created` and returns the recipients to retry"""
+        now = now_datetime()
+        user = frappe.session.user
+        names = self.make_contact_names(recipients, collided)
+
+        contacts = {}
+        for recipient_data, name in zip(recipients, names, strict=True):
+            first_name = recipient_data.get("contactfn") or "Unknown"
+            last_name = recipient_data.get("contactln") or ""
+            contacts[name] = [
+                name,
+                user,
+                now,
+                now,
+                user,
+                0,
+                0,
+                first_name,
+                last_name,
+                " ".join(filter(None, [first_name, last_name])),
+                recipient_data["contactemailaddress"],
+                recipient_data.get("phone") or recipient_data.get("mobile") or "",
+                "Passive",
+                recipient_data.get("contactid"),
+                recipient_data.get("contactstatus"),
+                now,
+                contact_payload_hash(recipient_data),
+                recipient_data.get("companyname"),
+                recipient_data.get("jobtitle"),
+            ]
+
+        frappe.db.bulk_insert("Contact", CONTACT_FIELDS, list(contacts.values()), ignore_duplicates=True)
+
+        # A locking read also sees the rows other workers committed since this transaction began
+        stored = {
+            (contact.name, contact.zoho_contact_id, contact.email_id)
+            for contact in frappe.get_all(
+                "Contact",
+                filters={"name": ["in", names]},
+                fields=["name", "zoho_contact_id", "email_id"],
+                for_update=True,
+            )
+        }
+        zoho_ids = [r["contactid"] for r in recipients if r.get("contactid")]
+        existing = {}
+        if zoho_ids:
+            existing = dict(
+                frappe.get_all(
+                    "Contact",
+                    filters={"zoho_contact_id": ["in", zoho_ids]},
+                    fields=["zoho_contact_id", "name"],
+                    as_list=True,
+                    for_update=True,
+                )
+            )
+
+        emails, phones, retry = [], [], []
+        for recipient_data, name in zip(recipients, names, strict=True):
+            email = recipient_data["contactemailaddress"]
+            zoho_contact_id = recipient_data.get("contactid")
+            if (name, zoho_contact_id, email) not in stored:
+                if zoho_contact_id and existing.get(zoho_contact_id):
+                    # Another worker created this contact first
+                    created[email.lower()] = existing[zoho_contact_id]
+                    self.remember(existing[zoho_contact_id], recipient_data)
+                else:
+                    collided.add(name.lower())
+                    retry.append(recipient_data)
+                continue
+
+            emails.append(
+                [frappe.generate_hash(length=10), user, now, now, user, 0, 1, name, "Contact", "email_ids", email, 1]
+            )
+            phone = recipient_data.get("phone") or recipient_data.get("mobile")
+            if phone:
+                phones.append(
+                    [frappe.generate_hash(length=10), user, now, now, user, 0, 1, name, "Contact", "phone_nos", phone, 1]
+                )
+
+            created[email.lower()] = name
+            self.contacts[name] = {
+                "hash": contact_payload_hash(recipient_data),
+                "company_name": recipient_data.get("companyname"),
+                "designation": recipient_data.get("jobtitle"),
+            }
+            self.remember(name, recipient_data)
+
+        if emails:
+            frappe.db.bulk_insert("Contact Email", [*CHILD_FIELDS, "email_id", "is_primary"], emails)
+        if phones:
+            frappe.db.bulk_insert("Contact Phone", [*CHILD_FIELDS, "phone", "is_primary_phone"], phones)
+        count_db_writes("Contact", "insert", len(emails))
+
+        return retry
+
+    def make_contact_names(self, recipients, collided=()):
+        """Contact names the way Contact.autoname builds them, numbered when taken or in `collided`"""
+        candidates = [
+            " ".join(filter(None, [r.get("contactfn") or "Unknown", r.get("contactln")])) for r in recipients
+        ]
+        # Names compare case-insensitively in the database, so "ann lee" takes "Ann Lee"
+        taken = {
+            name.lower()
+            for name in frappe.get_all("Contact", filters={"name": ["in", list(set(candidates))]}, pluck="name")
+        }
+        taken.update(collided)
+
+        # Numbered variants only matter for the candidates that are already taken
+        if taken:
+            taken.update(
+                name.lower()
+                for name in frappe.get_all(
+                    "Contact",
+                    or_filters=[
+                        ["name", "like", f"{escape_like(candidate)}-%"]
+                        for candidate in set(candidates)
+                        if candidate.lower() in taken
+                    ],
+                    pluck="name",
+                )
+            )
+
+        names = []
+        for candidate in candidates:
+            name, number = candidate, 0
+            while name.lower() in taken:
+                number += 1
+                name = f"{candidate}-{number}"
+            taken.add(name.lower())
+            names.append(name)
+
+        return names
+
+
+def escape_like(value):
+    """Escape the LIKE wildcards of a literal value"""
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def contact_payload_hash(contact_data):
+    """Stable hash of the Zoho fields copied onto a Contact"""
+    return payload_hash({key: contact_data.get(key) for key in CONTACT_PAYLOAD_KEYS})
+
+
+def get_contact_resolver():
+    """Contact resolver shared by every campaign synced in the current request or job"""
+    if frappe.flags.zoho_contact_resolver is None:
+        frappe.flags.zoho_contact_resolver = ContactResolver()
+    return frappe.flags.zoho_contact_resolver
@@ -1,6 +1,7 @@
 import frappe
 from frappe.custom.doctype.custom_field.custom_field import create_custom_fields
 
+
 def execute():
     """Add custom fields to Campaign and Contact doctypes"""
     
@@ -119,6 +120,47 @@ def execute():
                 "insert_after": "campaign_analytics",
                 "read_only": 1,
                 "module": "ERPNext Zoho Integration"
+            },
+            {
+                "fieldname": "zoho_recipients_synced_on",
+                "label": "Recipients Synced On",
+                "fieldtype": "Datetime",
+                "insert_after": "last_synced",
+                "read_only": 1,
+                "no_copy": 1,
+                "description": "Last time every recipient action of the campaign was synced from Zoho",
+                "module": "ERPNext Zoho Integration"
+            },
+            {
+                "fieldname": "zoho_payload_hash",
+                "label": "Zoho Payload Hash",
+                "fieldtype": "Data",
+                "insert_after": "zoho_recipients_synced_on",
+                "read_only": 1,
+                "hidden": 1,
+                "no_copy": 1,
+                "module": "ERPNext Zoho Integration"
+            },
+            {
+                "fieldname": "zoho_report_hash",
+                "label": "Zoho Report Hash",
+                "fieldtype": "Data",
+                "insert_after": "zoho_payload_hash",
+                "read_only": 1,
+                "hidden": 1,
+                "no_copy": 1,
+                "module": "ERPNext Zoho Integration"
+            },
+            {
+                "fieldname": "zoho_next_sync_at",
+                "label": "Next Sync At",
+                "fieldtype": "Datetime",
+                "insert_after": "zoho_report_hash",
+                "read_only": 1,
+                "no_copy": 1,
+                "search_index": 1,
+                "description": "When the scheduler syncs the campaign from Zoho next, empty once it has settled",
+                "module": "ERPNext Zoho Integration"
             }
         ],
         "Contact": [
@@ -160,6 +202,16 @@ def execute():
                 "insert_after": "zoho_column_break",
                 "read_only": 1,
                 "module": "ERPNext Zoho Integration"
+            },
+            {
+                "fieldname": "zoho_payload_hash",
+                "label": "Zoho Payload Hash",
+                "fieldtype": "Data",
+                "insert_after": "zoho_last_synced",
+                "read_only": 1,
+                "hidden": 1,
+                "no_copy": 1,
+                "module": "ERPNext Zoho Integration"
             }
         ]
     }
@@ -0,0 +1,83 @@
+import frappe
+
+from erpnext_zoho_integration.erpnext_zoho_integration.api.metrics import (
+    CAMPAIGN_METRICS,
+    get_campaign_metrics,
+)
+
+# Redis hash of campaign name -> {"last_synced", "payload"}
+DASHBOARD_CACHE_KEY = "zoho_campaign_dashboard"
+
+TOP_LINKS = 10
+TOP_COUNTRIES = 10
+
+
+@frappe.whitelist()
+def get_campaign_dashboard(campaign_name):
+    """
+    Dashboard payload of the Campaign form: metrics, recipient action counts, top links
+    and recipients by country. Served from Redis while the campaign's last_synced is
+    unchanged; the sync drops the entry whenever it writes the campaign's rows.
+    """
+    frappe.has_permission("Campaign", "read", campaign_name, throw=True)
+
+    last_synced = str(frappe.db.get_value("Campaign", campaign_name, "last_synced"))
+    cached = frappe.cache().hget(DASHBOARD_CACHE_KEY, campaign_name)
+    if cached and cached.get("last_synced") == last_synced:
+        return cached["payload"]
+
+    payload = build_campaign_dashboard(campaign_name)
+    frappe.cache().hset(DASHBOARD_CACHE_KEY, campaign_name, {"last_synced": last_synced, "payload": payload})
+    return payload
+
+
+def build_campaign_dashboard(campaign_name):
+    values = get_campaign_metrics(campaign_name)
+    metrics = [
+        {"fieldname": fieldname, "label": label, "fieldtype": fieldtype, "value": values[fieldname]}
+        for fieldname, label, fieldtype in CAMPAIGN_METRICS.values()
+        if values.get(fieldname) is not None
+    ]
+
+    action_counts = dict(
+        frappe.get_all(
+            "Campaign Recipient",
+            filters={"campaign": campaign_name},
+            fields=["action_type", "count(*) as count"],
+            group_by="action_type",
+            as_list=True,
+        )
+    )
+
+    top_links = frappe.get_all(
+        "Campaign Link Stats",
+        filters={"campaign": campaign_name},
+        fields=["url", "total_clicks", "unique_clicks", "last_clicked_on"],
+        order_by="total_clicks desc",
+        limit=TOP_LINKS,
+    )
+
+    countries = frappe.get_all(
+        "Campaign Recipient",
+        filters={"campaign": campaign_name, "country": ["is", "set"]},
+        fields=["country", "count(distinct email) as recipients"],
+        group_by="country",
+        order_by="recipients desc",
+        limit=TOP_COUNTRIES,
+    )
+
+    return {
+        "campaign": campaign_name,
+        "last_synced": values.get("last_synced"),
+        "metrics": metrics,
+        "action_counts": action_counts,
+        "top_links": top_links,
+        "countries": countries,
+    }
+
+
+def invalidate_campaign_dashboard(*campaign_names):
+    """Drop the cached dashboards of campaigns whose rows were just written"""
+    cache = frappe.cache()
+    for campaign_name in campaign_names:
+        cache.hdel(DASHBOARD_CACHE_KEY, campaign_name)
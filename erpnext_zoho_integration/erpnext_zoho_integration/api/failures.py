@@ -0,0 +1,282 @@
+"""
+One Error Log per kind of failure and time window, instead of one per failure.
+
+During a Zoho outage every campaign job, action and page fails the same way. Inside a
+run failures are grouped by signature (endpoint, exception type). When the run ends its
+groups are merged into a Redis bucket per signature and FAILURE_WINDOW, shared by all
+jobs, and write_failure_summaries logs every bucket once its window has closed, with
+the count, first and last occurrence, the campaigns and a few sample messages.
+Tracebacks of a signature are logged at most once per TRACEBACK_INTERVAL. Outside of a
+run failures are logged at once.
+"""
+
+import hashlib
+import sys
+import time
+from traceback import format_exception
+
+import frappe
+from frappe.utils import now_datetime
+
+# Distinct messages kept per failure group
+MAX_SAMPLES = 5
+
+# Campaigns named in a summary, the rest are only counted
+MAX_CAMPAIGNS = 20
+
+# Seconds of failures, across all jobs, summarized in one Error Log per signature
+FAILURE_WINDOW = 600
+FAILURE_WINDOW_KEY = "zoho_failure_window"
+# Redis set of the "<signature>:<window>" buckets not summarized yet
+FAILURE_WINDOWS_KEY = "zoho_failure_windows"
+
+# Seconds before the traceback of an endpoint and exception type is logged again
+TRACEBACK_INTERVAL = 3600
+TRACEBACK_KEY = "zoho_failure_traceback"
+
+# Attribute marking exceptions that were already reported
+RECORDED_FLAG = "zoho_failure_recorded"
+
+
+class FailureGroup:
+    """Failures sharing one signature"""
+
+    def __init__(self, title, endpoint, exception):
+        self.title = title
+        self.endpoint = endpoint
+        self.exception = exception
+        self.campaigns = set()
+        self.count = 0
+        self.first_seen = None
+        self.last_seen = None
+        self.samples = []
+        self.traceback = None
+
+    def add(self, message, traceback, campaign=None):
+        self.count += 1
+        self.last_seen = now_datetime()
+        self.first_seen = self.first_seen or self.last_seen
+        if campaign:
+            self.campaigns.add(campaign)
+        if message and message not in self.samples and len(self.samples) < MAX_SAMPLES:
+            self.samples.append(message)
+        self.traceback = self.traceback or traceback
+
+    def summary(self, with_traceback):
+        campaigns = sorted(self.campaigns)
+        if len(campaigns) > MAX_CAMPAIGNS:
+            campaigns = [*campaigns[:MAX_CAMPAIGNS], f"and {len(campaigns) - MAX_CAMPAIGNS} more"]
+        lines = [
+            f"Endpoint: {self.endpoint or '-'}",
+            f"Exception: {self.exception}",
+            f"Campaigns: {', '.join(campaigns) or '-'}",
+            f"Occurrences: {self.count} between {self.first_seen} and {self.last_seen}",
+            "",
+            "Samples:",
+            *(f"- {sample}" for sample in self.samples),
+        ]
+        if self.traceback:
+            lines.append("")
+            if with_traceback:
+                lines.append(self.traceback)
+            else:
+                lines.append(
+                    f"Traceback omitted, one was logged for {self.endpoint or '-'} {self.exception} "
+                    f"within the last {TRACEBACK_INTERVAL // 60} minutes"
+                )
+        return "\n".join(lines)
+
+    def log_title(self):
+        if self.count == 1:
+            return self.title
+        if len(self.campaigns) > 1:
+            # The first title may name a campaign, the summary is about all of them
+            return f"Zoho Sync Error: {self.exception} ({self.count} failures in {len(self.campaigns)} campaigns)"
+        return f"{self.title} ({self.count} failures)"
+
+
+class FailureAggregator:
+    """Failure groups of one run, by signature"""
+
+    def __init__(self, parent=None):
+        # Run that was active when this one started, e.g. a coordinator running jobs inline
+        self.parent = parent
+        self.groups = {}
+
+    def add(self, title, endpoint, exception, campaign, message, traceback):
+        signature = (endpoint, exception)
+        group = self.groups.get(signature)
+        if not group:
+            group = self.groups[signature] = FailureGroup(title, endpoint, exception)
+        group.add(message, traceback, campaign)
+
+
+def start_failures():
+    """Start aggregating the failures of the current request or job"""
+    frappe.flags.zoho_sync_failures = FailureAggregator(get_failures())
+    return frappe.flags.zoho_sync_failures
+
+
+def get_failures():
+    """Failure aggregator of the running sync, None outside of one"""
+    return frappe.flags.zoho_sync_failures
+
+
+def record_failure(title, exc=None, endpoint=None, campaign=None, message=None, traceback=None, exception=None):
+    """
+    Report a failure of the sync. `exc` defaults to the exception being handled. An
+    exception that was reported already, also as the cause or context of the one
+    being handled, is not counted again, so wrappers and their callers can both report.
+    """
+    if exc is None:
+        exc = sys.exc_info()[1]
+
+    if exc is not None:
+        if was_recorded(exc):
+            return
+        try:
+            setattr(exc, RECORDED_FLAG, True)
+        except AttributeError:
+            pass
+        traceback = traceback or "".join(format_exception(type(exc), exc, exc.__traceback__))
+
+    exception = exception or (type(exc).__name__ if exc is not None else exception_name(traceback))
+    message = message or (str(exc) if exc is not None else None) or exception
+
+    failures = get_failures()
+    if not failures:
+        frappe.log_error(title=title, message=f"{message}\n\n{traceback}" if traceback else message)
+        return
+
+    failures.add(title, endpoint, exception, campaign, message, traceback)
+
+
+def was_recorded(exc):
+    seen = set()
+    while exc is not None and id(exc) not in seen:
+        if getattr(exc, RECORDED_FLAG, False):
+            return True
+        seen.add(id(exc))
+        exc = exc.__cause__ or exc.__context__
+    return False
+
+
+def exception_name(traceback):
+    """Exception type from the last line of a formatted traceback"""
+    last_line = (traceback or "").strip().rsplit("\n", 1)[-1]
+    return last_line.split(":", 1)[0].rsplit(".", 1)[-1].strip() or "Error"
+
+
+def flush_failures():
+    """
+    End the aggregation of the current run and merge its failure groups into the shared
+    window buckets, or log them at once when Redis is unavailable
+    """
+    failures = get_failures()
+    if not failures:
+        return None
+    frappe.flags.zoho_sync_failures = failures.parent
+    if not failures.groups:
+        return failures
+
+    try:
+        add_to_windows(failures.groups.values())
+    except Exception:
+        for group in failures.groups.values():
+            log_group(group)
+
+    return failures
+
+
+def add_to_windows(groups):
+    cache = frappe.cache()
+    window = int(time.time() // FAILURE_WINDOW)
+    pipeline = cache.pipeline()
+    for group in groups:
+        bucket = f"{signature_hash(group.endpoint, group.exception)}:{window}"
+        key = cache.make_key(f"{FAILURE_WINDOW_KEY}:{bucket}")
+        for field, value in (
+            ("title", group.title),
+            ("endpoint", group.endpoint or ""),
+            ("exception", group.exception),
+            ("first_seen", str(group.first_seen)),
+            ("traceback", group.traceback or ""),
+        ):
+            pipeline.hsetnx(key, field, value)
+        pipeline.hset(key, "last_seen", str(group.last_seen))
+        pipeline.hincrby(key, "count", group.count)
+        if group.campaigns:
+            pipeline.sadd(f"{key}:campaigns", *group.campaigns)
+        if group.samples:
+            pipeline.rpush(f"{key}:samples", *group.samples)
+            pipeline.ltrim(f"{key}:samples", 0, MAX_SAMPLES * 4 - 1)
+        for name in (key, f"{key}:campaigns", f"{key}:samples"):
+            # Kept past the window in case the summary job is late, never forever
+            pipeline.expire(name, FAILURE_WINDOW * 6)
+        pipeline.sadd(cache.make_key(FAILURE_WINDOWS_KEY), bucket)
+    pipeline.execute()
+
+
+def write_failure_summaries():
+    """Scheduler job: one Error Log per failure signature of every closed window"""
+    cache = frappe.cache()
+    windows_key = cache.make_key(FAILURE_WINDOWS_KEY)
+    current = int(time.time() // FAILURE_WINDOW)
+
+    pipeline = cache.pipeline()
+    pipeline.smembers(windows_key)
+    (buckets,) = pipeline.execute()
+
+    for bucket in sorted(frappe.safe_decode(bucket) for bucket in buckets or ()):
+        if int(bucket.rsplit(":", 1)[1]) >= current:
+            continue
+
+        key = cache.make_key(f"{FAILURE_WINDOW_KEY}:{bucket}")
+        pipeline = cache.pipeline()
+        # Whoever removes the bucket from the set writes its summary
+        pipeline.srem(windows_key, bucket)
+        pipeline.hgetall(key)
+        pipeline.smembers(f"{key}:campaigns")
+        pipeline.lrange(f"{key}:samples", 0, -1)
+        pipeline.delete(key, f"{key}:campaigns", f"{key}:samples")
+        claimed, values, campaigns, samples, _deleted = pipeline.execute()
+        if not claimed or not values:
+            continue
+
+        group = group_from_window(values, campaigns, samples)
+        log_group(group)
+
+
+def log_group(group):
+    frappe.log_error(
+        title=group.log_title(), message=group.summary(claim_traceback(group.endpoint, group.exception))
+    )
+
+
+def group_from_window(values, campaigns, samples):
+    values = {frappe.safe_decode(field): frappe.safe_decode(value) for field, value in values.items()}
+    group = FailureGroup(values.get("title"), values.get("endpoint") or None, values.get("exception"))
+    group.count = int(values.get("count") or 0)
+    group.first_seen = values.get("first_seen")
+    group.last_seen = values.get("last_seen")
+    group.traceback = values.get("traceback") or None
+    group.campaigns = {frappe.safe_decode(campaign) for campaign in campaigns or ()}
+    for sample in samples or ():
+        sample = frappe.safe_decode(sample)
+        if sample not in group.samples and len(group.samples) < MAX_SAMPLES:
+            group.samples.append(sample)
+    return group
+
+
+def signature_hash(endpoint, exception):
+    return hashlib.sha1(f"{endpoint}:{exception}".encode()).hexdigest()
+
+
+def claim_traceback(endpoint, exception):
+    """Whether a traceback of this endpoint and exception type may be logged now"""
+    cache = frappe.cache()
+    key = f"{TRACEBACK_KEY}:{signature_hash(endpoint, exception)}"
+    if cache.get_value(key):
+        return False
+    cache.set_value(key, 1, expires_in_sec=TRACEBACK_INTERVAL)
+    return True
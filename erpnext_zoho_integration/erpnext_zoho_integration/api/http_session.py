@@ -0,0 +1,45 @@
+import os
+import threading
+
+import requests
+from requests.adapters import HTTPAdapter
+
+# (connect, read) timeouts in seconds, so a stalled socket can't hold a worker forever
+DEFAULT_TIMEOUT = (5, 60)
+
+# Zoho hosts we talk to (campaigns + accounts) and connections kept alive per host,
+# sized above Zoho Settings' max concurrent requests so threads don't open throwaway sockets
+POOL_CONNECTIONS = 4
+POOL_MAXSIZE = 16
+
+_session = None
+_session_pid = None
+_session_lock = threading.Lock()
+
+
+def get_session():
+    """
+    Keep-alive HTTP session shared by everything in this worker process.
+
+    requests.Session is safe to share between the sync's worker threads for plain
+    GET/POST calls. The session is rebuilt after a fork so pooled sockets are never
+    shared between processes.
+    """
+    global _session, _session_pid
+
+    if _session is None or _session_pid != os.getpid():
+        with _session_lock:
+            if _session is None or _session_pid != os.getpid():
+                _session = make_session()
+                _session_pid = os.getpid()
+
+    return _session
+
+
+def make_session():
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=POOL_CONNECTIONS, pool_maxsize=POOL_MAXSIZE)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    session.headers.update({"Accept": "application/json", "Accept-Encoding": "gzip, deflate"})
+    return session
@@ -0,0 +1,165 @@
+"""
+Append-only journal of Zoho API responses, and offline replay of the sync from it.
+
+Every response is appended as its own gzip member, holding one NDJSON line, to
+private/zoho_journal/<date>.ndjson.gz. A plain NDJSON <date>.index next to it maps the
+request key (endpoint, campaign_key, action, fromindex) to the member's offset and
+length, so a replay only reads the responses it asks for. A journal is shared with
+the API worker threads and never touches frappe.local. Day files older than the
+Journal Retention setting are deleted daily by prune_journal.
+"""
+
+import fcntl
+import gzip
+import json
+import os
+import threading
+from datetime import date, datetime, timedelta
+
+import frappe
+from frappe.utils import cint
+
+JOURNAL_FOLDER = "zoho_journal"
+DEFAULT_RETENTION_DAYS = 14
+
+
+class JournalMiss(LookupError):
+    pass
+
+
+class ResponseJournal:
+    """Records responses under `folder`, or serves them back from it when `replaying`"""
+
+    def __init__(self, folder, replaying=False):
+        self.folder = folder
+        self.replaying = replaying
+        self.lock = threading.Lock()
+        # key -> (path, offset, length) of the latest response, loaded on the first replay
+        self.index = None
+
+    def record(self, endpoint, params, response):
+        key = request_key(endpoint, params)
+        # Server time: frappe's system timezone lookup needs frappe.local
+        recorded_on = datetime.now()
+        line = json.dumps(
+            {"key": key, "recorded_on": str(recorded_on), "params": params, "response": response},
+            separators=(",", ":"),
+            default=str,
+        )
+        member = gzip.compress(line.encode() + b"\n")
+        day = recorded_on.strftime("%Y-%m-%d")
+
+        with self.lock:
+            os.makedirs(self.folder, exist_ok=True)
+            with open(os.path.join(self.folder, f"{day}.ndjson.gz"), "ab") as journal:
+                # Workers of other processes append to the same files; the file lock keeps
+                # the offset, the member and its index line together
+                fcntl.flock(journal, fcntl.LOCK_EX)
+                try:
+                    offset = journal.seek(0, os.SEEK_END)
+                    journal.write(member)
+                    journal.flush()
+                    # Written after the member, so the index never points at a partial one
+                    with open(os.path.join(self.folder, f"{day}.index"), "a") as index:
+                        index.write(json.dumps([key, f"{day}.ndjson.gz", offset, len(member)]) + "\n")
+                finally:
+                    fcntl.flock(journal, fcntl.LOCK_UN)
+
+    def replay(self, endpoint, params):
+        """The latest recorded response of a request; raises JournalMiss when there is none"""
+        key = request_key(endpoint, params)
+        with self.lock:
+            if self.index is None:
+                self.index = self.load_index()
+
+        location = self.index.get(key)
+        if not location:
+            raise JournalMiss(f"No journaled response for {key}")
+
+        path, offset, length = location
+        with open(path, "rb") as journal:
+            journal.seek(offset)
+            member = journal.read(length)
+        return json.loads(gzip.decompress(member))["response"]
+
+    def load_index(self):
+        index = {}
+        if not os.path.isdir(self.folder):
+            return index
+
+        # Day files sort chronologically, so later recordings of a request win
+        for name in sorted(os.listdir(self.folder)):
+            if not name.endswith(".index"):
+                continue
+            with open(os.path.join(self.folder, name)) as lines:
+                for line in lines:
+                    try:
+                        key, journal_name, offset, length = json.loads(line)
+                    except ValueError:
+                        continue
+                    index[tuple(key)] = (os.path.join(self.folder, journal_name), offset, length)
+        return index
+
+
+def request_key(endpoint, params):
+    params = params or {}
+    return (endpoint, params.get("campaignkey"), params.get("action"), cint(params.get("fromindex")) or None)
+
+
+def get_journal():
+    """
+    Journal of the current request or job: replaying while replay_sync runs, recording
+    when Zoho Settings keep a response journal, None otherwise.
+    """
+    if frappe.flags.zoho_journal is None:
+        folder = frappe.get_site_path("private", JOURNAL_FOLDER)
+        if frappe.flags.zoho_journal_replay:
+            frappe.flags.zoho_journal = ResponseJournal(folder, replaying=True)
+        elif cint(frappe.db.get_single_value("Zoho Settings", "journal_responses")):
+            frappe.flags.zoho_journal = ResponseJournal(folder)
+        else:
+            frappe.flags.zoho_journal = False
+    return frappe.flags.zoho_journal or None
+
+
+def prune_journal():
+    """Daily: delete the journal files of days older than the retention window"""
+    days = frappe.db.get_single_value("Zoho Settings", "journal_retention_days")
+    days = DEFAULT_RETENTION_DAYS if days is None else cint(days)
+    folder = frappe.get_site_path("private", JOURNAL_FOLDER)
+    if days <= 0 or not os.path.isdir(folder):
+        return
+
+    # Day names sort like dates, so the comparison is a string one
+    cutoff = str(date.today() - timedelta(days=days))
+    for name in os.listdir(folder):
+        if name.endswith((".ndjson.gz", ".index")) and name.split(".", 1)[0] < cutoff:
+            os.remove(os.path.join(folder, name))
+
+
+def is_replaying():
+    return bool(frappe.flags.zoho_journal_replay)
+
+
+def replay_sync():
+    """
+    Run the full sync from the journal, without network access:
+
+        bench --site <site> execute erpnext_zoho_integration.erpnext_zoho_integration.api.journal.replay_sync
+
+    Campaign jobs run inline, settled campaigns are included and campaign reports are
+    re-derived even when unchanged, so mapping changes apply to the whole history.
+    Recipient pages are looked up by fromindex: replay with the Recipient Page Size the
+    journal was recorded with.
+    """
+    from erpnext_zoho_integration.erpnext_zoho_integration.api.sync import sync_all_campaigns
+
+    frappe.flags.zoho_journal_replay = True
+    frappe.flags.zoho_journal = None
+    frappe.flags.zoho_sync_now = True
+    try:
+        return sync_all_campaigns()
+    finally:
+        frappe.flags.zoho_journal_replay = False
+        frappe.flags.zoho_journal = None
+        frappe.flags.zoho_sync_now = False
@@ -0,0 +1,81 @@
+import frappe
+from frappe.utils import cint, flt, now_datetime
+
+# Zoho campaign-reports key -> (Campaign Metrics field, Campaign Analytics label, fieldtype)
+CAMPAIGN_METRICS = {
+    "emails_sent_count": ("emails_sent", "Emails Sent", "Int"),
+    "delivered_count": ("delivered", "Delivered", "Int"),
+    "delivered_percent": ("delivered_rate", "Delivered %", "Percent"),
+    "opens_count": ("opens", "Opens", "Int"),
+    "open_percent": ("open_rate", "Open Rate %", "Percent"),
+    "unique_clicks_count": ("unique_clicks", "Unique Clicks", "Int"),
+    "unique_clicked_percent": ("click_rate", "Click Rate %", "Percent"),
+    "bounces_count": ("bounces", "Bounces", "Int"),
+    "bounce_percent": ("bounce_rate", "Bounce Rate %", "Percent"),
+    "hardbounce_count": ("hard_bounces", "Hard Bounces", "Int"),
+    "softbounce_count": ("soft_bounces", "Soft Bounces", "Int"),
+    "unsub_count": ("unsubscribes", "Unsubscribes", "Int"),
+    "unsubscribe_percent": ("unsubscribe_rate", "Unsubscribe Rate %", "Percent"),
+    "complaints_count": ("spam_complaints", "Spam Complaints", "Int"),
+    "complaints_percent": ("spam_rate", "Spam Rate %", "Percent"),
+    "unopened": ("unopened", "Unopened", "Int"),
+    "unopened_percent": ("unopened_rate", "Unopened %", "Percent"),
+    "clicksperopenrate": ("click_to_open_rate", "Click-to-Open Rate", "Percent"),
+    "forwards_count": ("forwards", "Forwards", "Int"),
+}
+
+METRIC_FIELDS = tuple(fieldname for fieldname, _label, _fieldtype in CAMPAIGN_METRICS.values())
+
+
+def parse_campaign_metrics(campaign_reports):
+    """Typed metric values from Zoho's campaign-reports section, keyed by Campaign Metrics field"""
+    values = {}
+    for key, (fieldname, _label, fieldtype) in CAMPAIGN_METRICS.items():
+        value = campaign_reports.get(key)
+        if value is not None:
+            values[fieldname] = flt(value) if fieldtype == "Percent" else cint(flt(value))
+    return values
+
+
+def build_analytics_rows(values):
+    """Campaign Analytics rows for the metrics, the campaign's backward compatible view"""
+    rows = []
+    for fieldname, label, fieldtype in CAMPAIGN_METRICS.values():
+        if fieldname in values:
+            rows.append(
+                {
+                    "metric": label,
+                    "value": str(values[fieldname]),
+                    "percentage": values[fieldname] if fieldtype == "Percent" else None,
+                }
+            )
+    return rows
+
+
+def save_campaign_metrics(campaign_name, values, synced_on=None):
+    """Write the metrics record of a campaign, and a snapshot when metric history is kept"""
+    synced_on = synced_on or now_datetime()
+
+    if frappe.db.exists("Campaign Metrics", campaign_name):
+        metrics = frappe.get_doc("Campaign Metrics", campaign_name)
+    else:
+        metrics = frappe.new_doc("Campaign Metrics")
+        metrics.campaign = campaign_name
+
+    metrics.update({fieldname: values.get(fieldname) for fieldname in METRIC_FIELDS})
+    metrics.last_synced = synced_on
+    metrics.save(ignore_permissions=True)
+
+    if cint(frappe.db.get_single_value("Zoho Settings", "keep_metrics_history")):
+        snapshot = frappe.new_doc("Campaign Metrics Snapshot")
+        snapshot.campaign = campaign_name
+        snapshot.captured_on = synced_on
+        snapshot.update({fieldname: values.get(fieldname) for fieldname in METRIC_FIELDS})
+        snapshot.insert(ignore_permissions=True)
+
+    return metrics
+
+
+def get_campaign_metrics(campaign_name):
+    """Metric values of a campaign as numbers, an empty dict when it was never synced"""
+    return frappe.db.get_value("Campaign Metrics", campaign_name, ["last_synced", *METRIC_FIELDS], as_dict=True) or {}
@@ -1,7 +1,18 @@
+from datetime import datetime, timedelta
+
 import frappe
 import requests
 from frappe import _
-from datetime import datetime, timedelta
+
+from erpnext_zoho_integration.erpnext_zoho_integration.api.circuit_breaker import (
+    CircuitOpen,
+    get_circuit_breaker,
+)
+from erpnext_zoho_integration.erpnext_zoho_integration.api.failures import record_failure
+from erpnext_zoho_integration.erpnext_zoho_integration.api.http_session import DEFAULT_TIMEOUT, get_session
+from erpnext_zoho_integration.erpnext_zoho_integration.api.token_cache import set_cached_token
+
+TOKEN_URL = "https://accounts.zoho.in/oauth/v2/token"
 
 @frappe.whitelist(allow_guest=True)
 def authorize():
@@ -34,7 +45,6 @@ def fetch_tokens(code):
     """Exchange authorization code for access & refresh tokens"""
     settings = frappe.get_single("Zoho Settings")
 
-    token_url = "https://accounts.zoho.in/oauth/v2/token"
     payload = {
         "client_id": settings.client_id,
         "client_secret": settings.get_password("client_secret"),
@@ -44,7 +54,7 @@ def fetch_tokens(code):
     }
 
     try:
-        response = requests.post(token_url, data=payload)
+        response = post_token_request(payload)
         response.raise_for_status()
         data = response.json()
 
@@ -59,10 +69,11 @@ def fetch_tokens(code):
         settings.is_active = 1
         settings.save(ignore_permissions=True)
         frappe.db.commit()
+        set_cached_token(data.get("access_token"), settings.token_expiry)
 
         return data
     
-    except requests.exceptions.RequestException as e:
+    except (requests.exceptions.RequestException, CircuitOpen) as e:
         frappe.log_error(frappe.get_traceback(), _("Zoho OAuth Error"))
         frappe.throw(_("Failed to fetch tokens: {0}").format(str(e)))
 
@@ -74,7 +85,6 @@ def refresh_access_token():
     if not settings.refresh_token:
         frappe.throw(_("No refresh token available. Please re-authorize."))
     
-    token_url = "https://accounts.zoho.in/oauth/v2/token"
     payload = {
         "client_id": settings.client_id,
         "client_secret": settings.get_password("client_secret"),
@@ -83,7 +93,7 @@ def refresh_access_token():
     }
     
     try:
-        response = requests.post(token_url, data=payload)
+        response = post_token_request(payload)
         response.raise_for_status()
         data = response.json()
         
@@ -96,9 +106,27 @@ def refresh_access_token():
         settings.token_expiry = datetime.now() + timedelta(seconds=data.get("expires_in", 3600))
         settings.save(ignore_permissions=True)
         frappe.db.commit()
+        set_cached_token(data.get("access_token"), settings.token_expiry)
         
         return data.get("access_token")
         
-    except requests.exceptions.RequestException as e:
-        frappe.log_error(frappe.get_traceback(), _("Zoho Token Refresh Error"))
-        frappe.throw(_("Failed to refresh access token: {0}").format(str(e)))
\ No newline at end of file
+    except (requests.exceptions.RequestException, CircuitOpen) as e:
+        record_failure(_("Zoho Token Refresh Error"), endpoint="oauth/v2/token")
+        frappe.throw(_("Failed to refresh access token: {0}").format(str(e)))
+
+def post_token_request(payload):
+    """POST to Zoho's token endpoint through the circuit breaker of the accounts host"""
+    breaker = get_circuit_breaker(TOKEN_URL)
+    if breaker:
+        breaker.check()
+    
+    try:
+        response = get_session().post(TOKEN_URL, data=payload, timeout=DEFAULT_TIMEOUT)
+    except requests.exceptions.RequestException:
+        if breaker:
+            breaker.record(None)
+        raise
+    
+    if breaker:
+        breaker.record(response.status_code)
+    return response
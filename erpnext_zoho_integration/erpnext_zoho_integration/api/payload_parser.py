@@ -0,0 +1,201 @@
+"""
+Parsers for the loosely formatted values in Zoho recipient payloads.
+
+Zoho sends openreports/clickreports as the Python repr of a list or dict, clickedurls
+as "[url, url]" and sentdate as "05 Dec 2025, 04:21 PM". Nothing here touches frappe,
+so a page of recipients can be parsed on any thread.
+"""
+
+import ast
+import json
+import re
+from datetime import datetime
+from functools import lru_cache
+
+SENT_DATE_FORMAT = "%d %b %Y, %I:%M %p"
+
+# Inputs above these limits are rejected rather than parsed
+MAX_REPORT_LENGTH = 256 * 1024
+MAX_CLICKED_URLS_LENGTH = 64 * 1024
+MAX_CLICKED_URLS = 500
+MAX_DATE_LENGTH = 32
+
+MONTHS = {
+    month: number
+    for number, month in enumerate(
+        ("jan", "feb", "mar", "apr", "may", "jun", "jul", "aug", "sep", "oct", "nov", "dec"), 1
+    )
+}
+
+SENT_DATE_PATTERN = re.compile(r"(\d{1,2}) ([A-Za-z]{3}) (\d{4}), (\d{1,2}):(\d{2}) ([AaPp][Mm])")
+
+# String literals, in either quote style, and the Python constants JSON spells differently
+LITERAL_TOKEN = re.compile(r"""'((?:[^'\\]|\\.)*)'|"((?:[^"\\]|\\.)*)"|\b(True|False|None)\b""", re.DOTALL)
+JSON_CONSTANTS = {"True": "true", "False": "false", "None": "null"}
+
+# A URL starts after the comma separating it from the previous one
+CLICKED_URL_SEPARATOR = re.compile(r",\s*(?=[A-Za-z][A-Za-z0-9+.-]*://)")
+
+
+class PayloadTooLarge(ValueError):
+    pass
+
+
+@lru_cache(maxsize=4096)
+def parse_sent_date(value):
+    """Datetime of a Zoho sentdate such as "05 Dec 2025, 04:21 PM"; raises ValueError"""
+    if not isinstance(value, str) or len(value) > MAX_DATE_LENGTH:
+        raise ValueError(f"Invalid sent date: {value!r}")
+
+    match = SENT_DATE_PATTERN.fullmatch(value.strip())
+    if not match:
+        return datetime.strptime(value, SENT_DATE_FORMAT)
+
+    day, month, year, hour, minute, meridiem = match.groups()
+    month = MONTHS.get(month.lower())
+    hour = int(hour)
+    if not month or not 1 <= hour <= 12:
+        raise ValueError(f"Invalid sent date: {value!r}")
+
+    hour = hour % 12 + (12 if meridiem.lower() == "pm" else 0)
+    return datetime(int(year), month, int(day), hour, int(minute))
+
+
+def parse_report(value):
+    """
+    The list or dict behind a stringified openreports/clickreports value.
+
+    The repr is rewritten to JSON with string operations and loaded with the C json
+    parser; reprs that can't be rewritten (e.g. with \\x escapes) go through ast.literal_eval.
+    Raises PayloadTooLarge above MAX_REPORT_LENGTH and ValueError when unparsable.
+    """
+    if not isinstance(value, str):
+        return value
+    if len(value) > MAX_REPORT_LENGTH:
+        raise PayloadTooLarge(f"Report of {len(value)} characters exceeds {MAX_REPORT_LENGTH}")
+
+    try:
+        return json.loads(repr_to_json(value))
+    except ValueError:
+        pass
+
+    try:
+        return ast.literal_eval(value)
+    except (SyntaxError, ValueError, TypeError, MemoryError, RecursionError) as e:
+        raise ValueError(f"Unparsable report: {e}") from e
+
+
+def repr_to_json(value):
+    """Rewrite a Python literal repr as JSON text"""
+    if '"' in value or "\\" in value:
+        return LITERAL_TOKEN.sub(to_json_token, value)
+
+    # Common case: every string is single quoted without escapes, so the odd parts of
+    # the split are string bodies and only the even parts can hold True/False/None
+    parts = value.split("'")
+    for i in range(0, len(parts), 2):
+        part = parts[i]
+        if "True" in part or "False" in part or "None" in part:
+            parts[i] = part.replace("True", "true").replace("False", "false").replace("None", "null")
+    return '"'.join(parts)
+
+
+def to_json_token(match):
+    single, double, constant = match.groups()
+    if constant:
+        return JSON_CONSTANTS[constant]
+
+    body = single if single is not None else double
+    if "\\x" in body or "\\N" in body or "\\U" in body:
+        # Escapes JSON has no spelling for, parse_report falls back to literal_eval
+        raise ValueError("Python-only escape in string literal")
+    if single is not None:
+        body = body.replace("\\'", "'").replace('"', '\\"')
+    return f'"{body}"'
+
+
+def report_to_json(value):
+    """
+    JSON text stored for a report: the parsed value, or the raw string when it can't be
+    parsed. Raises PayloadTooLarge above MAX_REPORT_LENGTH.
+    """
+    if not value:
+        return None
+
+    try:
+        return json.dumps(parse_report(value))
+    except PayloadTooLarge:
+        raise
+    except ValueError:
+        return value
+
+
+def parse_clicked_urls(value):
+    """URLs of a clickedurls value such as "[https://a, https://b]", at most MAX_CLICKED_URLS"""
+    if not value:
+        return []
+    if isinstance(value, list | tuple):
+        return [str(url) for url in value[:MAX_CLICKED_URLS]]
+    if len(value) > MAX_CLICKED_URLS_LENGTH:
+        raise PayloadTooLarge(f"Clicked URLs of {len(value)} characters exceed {MAX_CLICKED_URLS_LENGTH}")
+
+    value = value.strip().strip("[]").strip()
+    if not value:
+        return []
+    return [url.strip() for url in CLICKED_URL_SEPARATOR.split(value, MAX_CLICKED_URLS)[:MAX_CLICKED_URLS]]
+
+
+# Keys Zoho has used for the fields of a click report entry
+CLICK_URL_KEYS = ("url", "clickedurl", "link")
+CLICK_TIME_KEYS = ("time", "clickeddate", "clicktime", "date")
+CLICK_COUNT_KEYS = ("count", "clickcount")
+
+
+def parse_click_events(click_reports, clicked_urls=None):
+    """
+    (url, click_time, count) tuples of a clicked recipient, from the entries of its
+    click report, or one click per clicked URL when Zoho sent no report.
+    """
+    if isinstance(click_reports, str):
+        try:
+            click_reports = parse_report(click_reports)
+        except ValueError:
+            click_reports = None
+
+    if isinstance(click_reports, dict):
+        click_reports = [click_reports]
+
+    events = []
+    for entry in click_reports or ():
+        if not isinstance(entry, dict):
+            continue
+
+        url = first_value(entry, CLICK_URL_KEYS)
+        if not url:
+            continue
+
+        try:
+            click_time = parse_sent_date(first_value(entry, CLICK_TIME_KEYS))
+        except (TypeError, ValueError):
+            click_time = None
+
+        try:
+            count = max(int(first_value(entry, CLICK_COUNT_KEYS) or 1), 1)
+        except (TypeError, ValueError):
+            count = 1
+
+        events.append((str(url), click_time, count))
+
+    if events:
+        return events[:MAX_CLICKED_URLS]
+
+    try:
+        return [(url, None, 1) for url in parse_clicked_urls(clicked_urls)]
+    except PayloadTooLarge:
+        return []
+
+
+def first_value(entry, keys):
+    for key in keys:
+        if entry.get(key) is not None:
+            return entry[key]
@@ -0,0 +1,367 @@
+"""
+Staged recipient sync: fetch -> normalize -> resolve -> write.
+
+fetch and normalize run on a thread pool and never touch frappe.local. resolve and
+write run on the calling thread, which owns the database connection. Normalized pages
+wait in a bounded queue between the two sides, so the network keeps fetching while
+the database writes, and memory is capped by the queue depth plus one page per worker.
+"""
+
+import json
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import frappe
+from frappe.utils import cint
+
+from erpnext_zoho_integration.erpnext_zoho_integration.api.campaigns import (
+    get_api_base_url,
+    get_max_workers,
+    get_recipient_page_size,
+    get_valid_token,
+    is_unauthorized,
+    refresh_rejected_token,
+    send_api_request,
+)
+from erpnext_zoho_integration.erpnext_zoho_integration.api.circuit_breaker import get_circuit_breaker
+from erpnext_zoho_integration.erpnext_zoho_integration.api.journal import get_journal
+from erpnext_zoho_integration.erpnext_zoho_integration.api.payload_parser import (
+    PayloadTooLarge,
+    parse_clicked_urls,
+    parse_sent_date,
+    report_to_json,
+)
+from erpnext_zoho_integration.erpnext_zoho_integration.api.rate_limit import get_rate_limiter
+from erpnext_zoho_integration.erpnext_zoho_integration.api.telemetry import get_telemetry
+
+# Normalized pages waiting for the writer
+DEFAULT_QUEUE_DEPTH = 4
+
+# Seconds between checks for a closed pipeline while a fetch thread waits on a full queue
+PUT_TIMEOUT = 0.1
+
+# Recipient keys the contact resolver reads; the rest of the raw payload is dropped
+CONTACT_KEYS = (
+    "contactemailaddress",
+    "contactid",
+    "contactfn",
+    "contactln",
+    "contactstatus",
+    "companyname",
+    "jobtitle",
+    "phone",
+    "mobile",
+)
+
+
+class RecipientRecord:
+    """One normalized recipient: its Campaign Recipient values and the fields its Contact needs"""
+
+    __slots__ = ("contact", "email", "row")
+
+    def __init__(self, email, row, contact):
+        self.email = email
+        self.row = row
+        self.contact = contact
+
+
+class StagedPage:
+    """
+    A page of one action on its way to the writer; `error` is set when fetching it failed
+    and `token` is the access token its request was sent with
+    """
+
+    __slots__ = ("action", "error", "fromindex", "received", "records", "skipped", "token", "warnings")
+
+    def __init__(
+        self, action, fromindex, token=None, received=0, records=(), skipped=0, warnings=(), error=None
+    ):
+        self.action = action
+        self.token = token
+        self.fromindex = fromindex
+        self.received = received
+        self.records = records
+        self.skipped = skipped
+        self.warnings = warnings
+        self.error = error
+
+
+class RecipientPipeline:
+    """
+    Fetch and normalize stages for the recipient lists of several actions of a campaign.
+
+    Every action has one page fetch in flight; a full page queues the fetch of the next
+    one before it is normalized. Iterating yields StagedPages on the calling thread, the
+    pages of each action in order. A page rejected with 401 is fetched again with the current
+    token, which is refreshed first when the page was sent with it; a page is only given
+    up when a refreshed token is rejected too. Actions the caller adds to `cancelled`
+    are not paged any further.
+    """
+
+    def __init__(
+        self, campaign_key, action_types, start_indexes=None, cancelled=None, page_size=None, max_workers=None, depth=None
+    ):
+        self.campaign_key = campaign_key
+        # Zoho action -> Campaign Recipient action type
+        self.action_types = action_types
+        self.start_indexes = start_indexes or {}
+        self.cancelled = cancelled if cancelled is not None else set()
+        self.page_size = cint(page_size) or get_recipient_page_size()
+        self.max_workers = max_workers or get_max_workers()
+        self.pages = queue.Queue(maxsize=depth or get_queue_depth())
+
+        # Everything the pool threads use is resolved here, on the calling thread
+        self.limiter = get_rate_limiter()
+        self.telemetry = get_telemetry()
+        self.base_url = get_api_base_url()
+        self.journal = get_journal()
+        self.breaker = get_circuit_breaker(self.base_url)
+        self.token = get_valid_token()
+
+        self.lock = threading.Lock()
+        self.outstanding = 0
+        self.closed = False
+        self.executor = None
+
+    def __iter__(self):
+        arrivals = self.arrivals()
+        try:
+            starts = {action: self.start_index(action) for action in self.action_types}
+            yield from ordered_pages(arrivals, starts)
+        finally:
+            arrivals.close()
+
+    def start_index(self, action):
+        return max(cint(self.start_indexes.get(action)), 1)
+
+    def arrivals(self):
+        """Pages as they leave the queue, in any order; rejected ones are fetched again"""
+        # Tokens obtained by refreshing a rejected one, a 401 for these is final
+        refreshed = set()
+        self.executor = ThreadPoolExecutor(max_workers=self.max_workers)
+        try:
+            for action in self.action_types:
+                self.submit(action, self.start_index(action))
+
+            # Every fetch puts exactly one page, after queueing the fetch that follows it
+            while self.outstanding:
+                page = self.pages.get()
+                with self.lock:
+                    self.outstanding -= 1
+
+                if page.error is not None:
+                    if is_unauthorized(page.error) and page.token not in refreshed:
+                        # Pages sent before a refresh are retried with the token that replaced theirs
+                        if page.token == self.token:
+                            self.token = refresh_rejected_token(self.token)
+                            refreshed.add(self.token)
+                        self.submit(page.action, page.fromindex)
+                        continue
+
+                yield page
+        finally:
+            self.closed = True
+            self.executor.shutdown(wait=True, cancel_futures=True)
+
+    def submit(self, action, fromindex):
+        with self.lock:
+            self.outstanding += 1
+        self.executor.submit(self.fetch, action, fromindex)
+
+    def fetch(self, action, fromindex):
+        """Fetch and normalize stages of one page, on a pool thread"""
+        token = self.token
+        try:
+            start = time.monotonic()
+            result = send_api_request(
+                "getcampaignrecipientsdata",
+                token,
+                "POST",
+                {
+                    "resfmt": "JSON",
+                    "campaignkey": self.campaign_key,
+                    "action": action,
+                    "fromindex": fromindex,
+                    "range": self.page_size,
+                },
+                None,
+                self.limiter,
+                self.telemetry,
+                self.base_url,
+                self.journal,
+                self.breaker,
+            )
+            recipients = result.get("list_of_details") or []
+            self.observe("fetch_recipient_page", start)
+
+            if len(recipients) >= self.page_size and action not in self.cancelled and not self.closed:
+                self.submit(action, fromindex + len(recipients))
+
+            start = time.monotonic()
+            records, skipped, warnings = normalize_page(recipients, self.action_types[action])
+            self.observe("normalize_recipient_page", start)
+            page = StagedPage(action, fromindex, token, len(recipients), records, skipped, warnings)
+        except Exception as e:
+            page = StagedPage(action, fromindex, token, error=e)
+
+        self.put(page)
+
+    def put(self, page):
+        """Wait for room in the queue, giving up once the caller stopped iterating"""
+        while not self.closed:
+            try:
+                self.pages.put(page, timeout=PUT_TIMEOUT)
+                return
+            except queue.Full:
+                continue
+
+    def observe(self, stage, start):
+        if self.telemetry:
+            self.telemetry.observe("zoho_sync_stage_seconds", time.monotonic() - start, stage=stage)
+
+
+def ordered_pages(pages, start_indexes):
+    """
+    Yield the pages of every action in fromindex order, holding back the ones that arrive
+    before their predecessors. The next page of an action is fetched before its own page
+    is queued, so pages can arrive out of order; the caller moves a resume cursor past
+    each page it writes and must never skip one. Empty pages end an action and are
+    dropped, after an error the action's later pages are never yielded.
+    """
+    expected = dict(start_indexes)
+    held = {action: {} for action in start_indexes}
+    for page in pages:
+        waiting = held[page.action]
+        waiting[page.fromindex] = page
+        while expected[page.action] in waiting:
+            ready = waiting.pop(expected[page.action])
+            if ready.error is None and not ready.received:
+                break
+            yield ready
+            if ready.error is not None:
+                break
+            expected[page.action] += ready.received
+
+
+def get_queue_depth():
+    """Normalized pages allowed to wait for the writer, from Zoho Settings"""
+    depth = cint(frappe.db.get_single_value("Zoho Settings", "pipeline_queue_depth"))
+    return depth if depth > 0 else DEFAULT_QUEUE_DEPTH
+
+
+def normalize_page(recipients, action_type):
+    """
+    Normalize stage: raw Zoho recipients to RecipientRecords. Returns the records, the
+    number of recipients without an email and the warnings to log on the calling thread.
+    """
+    records = []
+    skipped = 0
+    warnings = []
+    for recipient_data in recipients:
+        row = build_recipient_row(recipient_data, action_type, warnings)
+        if not row:
+            skipped += 1
+            continue
+
+        contact = {key: recipient_data[key] for key in CONTACT_KEYS if recipient_data.get(key) is not None}
+        records.append(RecipientRecord(row["email"], row, contact))
+
+    return records, skipped, warnings
+
+
+def build_recipient_row(recipient_data, action_type, warnings=None):
+    """
+    Map a Zoho recipient payload to Campaign Recipient field values. Warnings go to
+    `warnings` when given, which keeps this off frappe.local, or to the logger.
+    """
+    def warn(message):
+        if warnings is None:
+            frappe.logger().warning(message)
+        else:
+            warnings.append(message)
+
+    email = recipient_data.get("contactemailaddress")
+
+    if not email:
+        return None
+
+    # Every page row carries the same columns, a value Zoho no longer sends is cleared
+    row = {
+        "email": email,
+        "action_type": action_type,
+        "zoho_contact_id": recipient_data.get("contactid"),
+        "sent_time": None,
+        "action_date": None
+    }
+
+    # Handle sent_date - parse from "sentdate" field
+    sent_date = recipient_data.get("sentdate")
+    if sent_date:
+        try:
+            # Parse date like "05 Dec 2025, 04:21 PM"
+            dt = parse_sent_date(sent_date)
+            row["sent_time"] = dt
+            row["action_date"] = dt
+        except (ValueError, TypeError) as e:
+            warn(f"Invalid sent_date {sent_date}: {e!s}")
+
+    # For clicked recipients, handle click-specific data
+    if action_type == "Clicked":
+        # Get click count
+        click_count = recipient_data.get("clickcount")
+        row["click_count"] = None
+        if click_count:
+            try:
+                row["click_count"] = int(click_count)
+            except (ValueError, TypeError):
+                row["click_count"] = 1
+
+        # Store clicked URLs without the surrounding brackets
+        try:
+            clicked_urls = parse_clicked_urls(recipient_data.get("clickedurls"))
+        except PayloadTooLarge as e:
+            warn(f"Skipping clicked URLs of {email}: {e!s}")
+            clicked_urls = []
+        row["clicked_links"] = ", ".join(clicked_urls) or None
+
+        # Store click reports as JSON
+        try:
+            row["click_reports"] = report_to_json(recipient_data.get("clickreports"))
+        except PayloadTooLarge as e:
+            warn(f"Skipping click reports of {email}: {e!s}")
+            row["click_reports"] = None
+
+        # Store URL clicks data
+        url_clicks = recipient_data.get("urlclicks")
+        row["url_clicks"] = json.dumps(url_clicks) if url_clicks else None
+
+    # For opened recipients
+    elif action_type == "Opened":
+        # Store open reports if available
+        try:
+            row["open_reports"] = report_to_json(recipient_data.get("openreports"))
+        except PayloadTooLarge as e:
+            warn(f"Skipping open reports of {email}: {e!s}")
+            row["open_reports"] = None
+
+    # Common fields
+    row["country"] = recipient_data.get("country")
+    row["city"] = recipient_data.get("city")
+    row["state"] = recipient_data.get("state")
+
+    # Handle boolean fields
+    rtbf = recipient_data.get("rtbf")
+    row["is_rtbf"] = 1 if rtbf == "1" else 0
+
+    row["contact_status"] = recipient_data.get("contactstatus")
+
+    # Store additional data
+    full_name = f"{recipient_data.get('contactfn', '')} {recipient_data.get('contactln', '')}".strip()
+    row["full_name"] = full_name if full_name else None
+
+    row["company_name"] = recipient_data.get("companyname")
+    row["job_title"] = recipient_data.get("jobtitle")
+
+    return row
@@ -0,0 +1,109 @@
+import random
+import time
+from email.utils import parsedate_to_datetime
+
+import frappe
+from frappe.utils import cint
+
+BUCKET_KEY = "zoho_api_rate_limit"
+PAUSE_KEY = "zoho_api_rate_limit_pause"
+
+# Responses worth retrying and how hard to back off between attempts (seconds)
+RETRY_STATUS_CODES = (429, 500, 502, 503, 504)
+MAX_RETRIES = 4
+BACKOFF_BASE = 1
+BACKOFF_CAP = 60
+MAX_RETRY_AFTER = 300
+
+# Token bucket shared by every worker of the site. Uses Redis' clock so workers on
+# different hosts agree, and returns how many ms the caller has to wait (0 = go).
+TOKEN_BUCKET_SCRIPT = """
+local paused = redis.call('PTTL', KEYS[2])
+if paused > 0 then
+    return paused
+end
+
+local rate = tonumber(ARGV[1]) / 60000
+local capacity = tonumber(ARGV[2])
+local clock = redis.call('TIME')
+local now = clock[1] * 1000 + math.floor(clock[2] / 1000)
+
+local bucket = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(bucket[1]) or capacity
+local ts = tonumber(bucket[2]) or now
+tokens = math.min(capacity, tokens + (now - ts) * rate)
+
+local wait = 0
+if tokens >= 1 then
+    tokens = tokens - 1
+else
+    wait = math.ceil((1 - tokens) / rate)
+end
+
+redis.call('HSET', KEYS[1], 'tokens', tokens, 'ts', now)
+redis.call('PEXPIRE', KEYS[1], math.ceil(capacity / rate) + 1000)
+return wait
+"""
+
+
+class RateLimiter:
+    """
+    Requests-per-minute budget for the Zoho API shared through Redis.
+
+    Built on the main thread with get_rate_limiter(); acquire() only talks to Redis,
+    so the same instance can be used from the sync's worker threads.
+    """
+
+    def __init__(self, cache, requests_per_minute, burst=None):
+        self.cache = cache
+        self.requests_per_minute = requests_per_minute
+        self.burst = burst or max(1, requests_per_minute // 6)
+        self.bucket_key = cache.make_key(BUCKET_KEY)
+        self.pause_key = cache.make_key(PAUSE_KEY)
+        self.script = cache.register_script(TOKEN_BUCKET_SCRIPT)
+
+    def acquire(self):
+        """Block until a request may be sent"""
+        while True:
+            wait = cint(
+                self.script(keys=[self.bucket_key, self.pause_key], args=[self.requests_per_minute, self.burst])
+            )
+            if wait <= 0:
+                return
+            time.sleep(wait / 1000)
+
+    def pause(self, seconds):
+        """Hold back every worker, e.g. after Zoho answered 429 with Retry-After"""
+        self.cache.set(self.pause_key, 1, px=max(1, int(seconds * 1000)))
+
+
+def get_rate_limiter():
+    """Rate limiter configured in Zoho Settings, None when no budget is set"""
+    requests_per_minute = cint(frappe.db.get_single_value("Zoho Settings", "requests_per_minute"))
+    if requests_per_minute <= 0:
+        return None
+
+    return RateLimiter(frappe.cache(), requests_per_minute)
+
+
+def backoff_delay(attempt):
+    """Exponential backoff with full jitter"""
+    return random.uniform(0, min(BACKOFF_CAP, BACKOFF_BASE * 2**attempt))
+
+
+def get_retry_after(response):
+    """Seconds to wait according to a Retry-After header, None if absent or unparsable"""
+    value = response.headers.get("Retry-After")
+    if not value:
+        return None
+
+    if value.strip().isdigit():
+        seconds = int(value)
+    else:
+        try:
+            retry_at = parsedate_to_datetime(value)
+        except (TypeError, ValueError):
+            return None
+        seconds = retry_at.timestamp() - time.time()
+
+    return min(max(seconds, 0), MAX_RETRY_AFTER)
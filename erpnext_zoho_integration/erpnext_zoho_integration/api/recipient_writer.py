@@ -0,0 +1,216 @@
+import frappe
+from frappe.utils import cint, now_datetime
+
+# Campaign Recipient is named "format:{contact}-{email}-{##}"; frappe resolves the
+# "{##}" part against the series with an empty key, so bulk inserts draw from it too.
+RECIPIENT_NAME_SERIES = ""
+
+# Columns written by the bulk path, besides the standard document columns
+RECIPIENT_COLUMNS = (
+    "campaign",
+    "contact",
+    "email",
+    "zoho_contact_id",
+    "action_type",
+    "action_date",
+    "open_count",
+    "click_count",
+    "sent_time",
+    "location",
+    "country",
+    "city",
+    "state",
+    "is_spam",
+    "is_optout",
+    "is_rtbf",
+    "contact_status",
+    "open_reports",
+    "click_reports",
+    "url_clicks",
+    "clicked_links",
+    "full_name",
+    "company_name",
+    "job_title",
+    "payload_hash",
+)
+
+# Unique key of Campaign Recipient, see campaign_recipient.on_doctype_update
+RECIPIENT_KEY = ("campaign", "email", "action_type")
+
+# Rows per INSERT ... ON DUPLICATE KEY UPDATE statement
+UPSERT_CHUNK_SIZE = 500
+
+RECIPIENT_DEFAULTS = {
+    "open_count": 0,
+    "click_count": 0,
+    "is_spam": 0,
+    "is_optout": 0,
+    "is_rtbf": 0,
+}
+
+
+def upsert_recipient_rows(campaign_name, action_type, rows, partial=False):
+    """
+    Insert or update a batch of Campaign Recipient rows for one campaign action.
+
+    Existing (campaign, email, action_type) keys are resolved with a single query over
+    the table's unique key. New and changed rows are then written with one atomic
+    multi-row upsert, so a row inserted concurrently by another job is updated instead
+    of duplicated. Rows skip document validation and hooks.
+
+    A column a row carries is written even when its value is None, which clears it.
+    With partial=True, for rows that only know a few fields such as webhook events,
+    None keeps the stored value instead.
+
+    Rows whose payload_hash matches the stored one are left alone. Returns a dict with
+    the number of rows inserted, updated, unchanged and skipped, and the written rows.
+    """
+    stats = {"inserted": 0, "updated": 0, "unchanged": 0, "skipped": 0, "written": []}
+
+    # The last occurrence of an email wins, earlier duplicates in the page are skipped.
+    # Emails are compared lower-cased, like the unique key under the table's collation.
+    rows_by_email = {}
+    for row in rows:
+        email = (row.get("email") or "").lower()
+        if email in rows_by_email:
+            stats["skipped"] += 1
+        rows_by_email[email] = row
+
+    if not rows_by_email:
+        return stats
+
+    existing = {
+        email.lower(): (name, stored_hash)
+        for email, name, stored_hash in frappe.get_all(
+            "Campaign Recipient",
+            filters={
+                "campaign": campaign_name,
+                "action_type": action_type,
+                "email": ["in", [row.get("email") for row in rows_by_email.values()]],
+            },
+            fields=["email", "name", "payload_hash"],
+            as_list=True,
+        )
+    }
+
+    updates = {}
+    inserts = []
+    columns = set()
+    for email, row in rows_by_email.items():
+        values = {field: row.get(field) for field in RECIPIENT_COLUMNS if field in row}
+        if partial:
+            values = {field: value for field, value in values.items() if value is not None}
+        columns.update(values)
+        values["campaign"] = campaign_name
+        values["action_type"] = action_type
+
+        if email in existing:
+            name, stored_hash = existing[email]
+            if stored_hash and stored_hash == row.get("payload_hash"):
+                stats["unchanged"] += 1
+            else:
+                updates[name] = values
+        else:
+            inserts.append({**RECIPIENT_DEFAULTS, **values})
+
+    if frappe.db.db_type in ("mariadb", "postgres"):
+        upsert_rows(updates, inserts, columns, partial)
+    else:
+        if updates:
+            frappe.db.bulk_update("Campaign Recipient", updates)
+        if inserts:
+            insert_recipient_rows(inserts)
+
+    stats["updated"] = len(updates)
+    stats["inserted"] = len(inserts)
+    stats["written"] = [*updates.values(), *inserts]
+    return stats
+
+
+def upsert_rows(updates, inserts, columns, partial=False):
+    """
+    Write Campaign Recipient rows with INSERT ... ON DUPLICATE KEY UPDATE (ON CONFLICT on
+    Postgres) against the (campaign, email, action_type) key. `updates` maps the names of
+    stored rows to their values; series numbers are only reserved for `inserts`. Only the
+    `columns` the rows carry are updated, with partial=True None keeps the stored value.
+    """
+    if not updates and not inserts:
+        return
+
+    now = now_datetime()
+    user = frappe.session.user
+    named_rows = list(updates.items())
+    if inserts:
+        start = reserve_series(RECIPIENT_NAME_SERIES, len(inserts))
+        named_rows.extend(
+            (make_recipient_name(row.get("contact"), row.get("email"), start + offset), row)
+            for offset, row in enumerate(inserts)
+        )
+
+    fields = ["name", "owner", "creation", "modified", "modified_by", "docstatus", "idx", *RECIPIENT_COLUMNS]
+    update_fields = [f for f in RECIPIENT_COLUMNS if f in columns and f not in RECIPIENT_KEY]
+
+    if frappe.db.db_type == "postgres":
+        new, stored = "excluded.`{0}`", "`tabCampaign Recipient`.`{0}`"
+        conflict = f"on conflict ({', '.join(RECIPIENT_KEY)}) do update set "
+    else:
+        new, stored = "values(`{0}`)", "`{0}`"
+        conflict = "on duplicate key update "
+    assignment = f"coalesce({new}, {stored})" if partial else new
+    conflict += ", ".join(
+        [
+            *(f"`{field}` = {new.format(field)}" for field in ("modified", "modified_by")),
+            *(f"`{field}` = {assignment.format(field)}" for field in update_fields),
+        ]
+    )
+
+    placeholders = "(" + ", ".join(["%s"] * len(fields)) + ")"
+    for chunk_start in range(0, len(named_rows), UPSERT_CHUNK_SIZE):
+        chunk = named_rows[chunk_start : chunk_start + UPSERT_CHUNK_SIZE]
+        values = []
+        for name, row in chunk:
+            values.extend([name, user, now, now, user, 0, 0])
+            # Inserts carry RECIPIENT_DEFAULTS, columns updates don't carry are not updated
+            values.extend(row.get(field) for field in RECIPIENT_COLUMNS)
+
+        frappe.db.sql(
+            f"""insert into `tabCampaign Recipient` ({", ".join(f"`{field}`" for field in fields)})
+            values {", ".join([placeholders] * len(chunk))}
+            {conflict}""",
+            values,
+        )
+
+
+def insert_recipient_rows(rows):
+    """Insert new Campaign Recipient rows with one multi-row INSERT"""
+    now = now_datetime()
+    user = frappe.session.user
+    start = reserve_series(RECIPIENT_NAME_SERIES, len(rows))
+
+    fields = ["name", "owner", "creation", "modified", "modified_by", "docstatus", "idx", *RECIPIENT_COLUMNS]
+    values = []
+    for offset, row in enumerate(rows):
+        name = make_recipient_name(row.get("contact"), row.get("email"), start + offset)
+        standard = [name, user, now, now, user, 0, 0]
+        values.append(standard + [row.get(field, RECIPIENT_DEFAULTS.get(field)) for field in RECIPIENT_COLUMNS])
+
+    frappe.db.bulk_insert("Campaign Recipient", fields, values)
+
+
+def make_recipient_name(contact, email, number):
+    """Build the same name the "format:{contact}-{email}-{##}" autoname would"""
+    return f"{contact or 'contact'}-{email or 'email'}-{number:02d}"
+
+
+def reserve_series(key, count):
+    """Reserve `count` consecutive numbers of a naming series, returns the first one"""
+    current = frappe.db.sql("select `current` from `tabSeries` where `name`=%s for update", (key,))
+
+    if current and current[0][0] is not None:
+        start = cint(current[0][0]) + 1
+        frappe.db.sql("update `tabSeries` set `current` = `current` + %s where `name`=%s", (count, key))
+    else:
+        start = 1
+        frappe.db.sql("insert into `tabSeries` (`name`, `current`) values (%s, %s)", (key, count))
+
+    return start
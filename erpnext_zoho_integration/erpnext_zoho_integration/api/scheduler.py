@@ -0,0 +1,83 @@
+"""
+Adaptive sync schedule of Zoho linked Campaigns.
+
+A campaign's numbers change fast right after it is sent and hardly at all a few weeks
+later, so every campaign carries its own zoho_next_sync_at, set from its age: every
+5 minutes its first day, hourly its first week and daily until its settle window
+closes. One full pass after the window closes is the last, then it is never synced
+again. The sync_due_campaigns tick queues the campaigns whose time has come.
+"""
+
+from datetime import timedelta
+
+import frappe
+from frappe.utils import cint, get_datetime, now_datetime
+
+# Days after sending during which a campaign's numbers are still re-synced
+DEFAULT_SETTLE_DAYS = 30
+
+# While webhooks are enabled, hours between the scheduled reconciliation polls
+DEFAULT_RECONCILE_HOURS = 6
+
+# (age since sending, sync interval up to that age)
+SYNC_TIERS = (
+    (timedelta(days=1), timedelta(minutes=5)),
+    (timedelta(days=7), timedelta(hours=1)),
+)
+
+# Sync interval from the last tier until the settle window closes, and between
+# retries of the final pass after it closed
+SETTLING_INTERVAL = timedelta(days=1)
+
+
+def get_settle_window():
+    """How long after sending a campaign's numbers keep changing, from Zoho Settings"""
+    days = cint(frappe.db.get_single_value("Zoho Settings", "settle_days"))
+    return timedelta(days=days if days > 0 else DEFAULT_SETTLE_DAYS)
+
+
+def get_reconcile_interval():
+    """Time between polls of a campaign while webhooks deliver its events, None without webhooks"""
+    if not cint(frappe.db.get_single_value("Zoho Settings", "enable_webhooks")):
+        return None
+
+    hours = cint(frappe.db.get_single_value("Zoho Settings", "reconcile_hours"))
+    return timedelta(hours=hours if hours > 0 else DEFAULT_RECONCILE_HOURS)
+
+
+def get_next_sync_at(sent_time, recipients_synced_on=None, now=None, settle_window=None, min_interval=None):
+    """
+    When a campaign sent at `sent_time` is synced next, None once it is settled: past
+    its settle window with its recipients fully synced after the window closed.
+    """
+    now = now or now_datetime()
+    settle_window = settle_window or get_settle_window()
+    if not sent_time:
+        return now + SETTLING_INTERVAL
+
+    settled_on = get_datetime(sent_time) + settle_window
+    if now >= settled_on:
+        if recipients_synced_on and get_datetime(recipients_synced_on) >= settled_on:
+            return None
+        return now + SETTLING_INTERVAL
+
+    age = now - get_datetime(sent_time)
+    interval = next((interval for max_age, interval in SYNC_TIERS if age < max_age), SETTLING_INTERVAL)
+    if min_interval:
+        # Webhooks keep the numbers current, polls only reconcile
+        interval = max(interval, min_interval)
+
+    # The final pass runs as soon as the window closes
+    return min(now + interval, settled_on)
+
+
+def schedule_next_sync(campaign_name, now=None):
+    """Store the next sync time of a campaign from its age and watermark, returns it"""
+    sent_time, recipients_synced_on = frappe.db.get_value(
+        "Campaign", campaign_name, ["zoho_sent_time", "zoho_recipients_synced_on"]
+    )
+    next_sync_at = get_next_sync_at(
+        sent_time, recipients_synced_on, now, min_interval=get_reconcile_interval()
+    )
+    frappe.db.set_value("Campaign", campaign_name, "zoho_next_sync_at", next_sync_at, update_modified=False)
+    return next_sync_at
@@ -1,54 +1,301 @@
+from functools import partial
+
 import frappe
 from frappe import _
+from frappe.utils import cint, get_datetime, now_datetime
+
 from erpnext_zoho_integration.erpnext_zoho_integration.api.campaigns import (
-    get_recent_campaigns,
     get_campaign_report,
-    get_campaign_recipients
+    iter_recent_campaign_pages,
+)
+from erpnext_zoho_integration.erpnext_zoho_integration.api.click_events import write_click_events
+from erpnext_zoho_integration.erpnext_zoho_integration.api.commit_policy import (
+    get_commit_policy,
+    write_with_savepoint,
+)
+from erpnext_zoho_integration.erpnext_zoho_integration.api.contact_resolver import get_contact_resolver
+from erpnext_zoho_integration.erpnext_zoho_integration.api.dashboard import invalidate_campaign_dashboard
+from erpnext_zoho_integration.erpnext_zoho_integration.api.failures import record_failure
+from erpnext_zoho_integration.erpnext_zoho_integration.api.journal import is_replaying
+from erpnext_zoho_integration.erpnext_zoho_integration.api.metrics import (
+    build_analytics_rows,
+    parse_campaign_metrics,
+    save_campaign_metrics,
+)
+from erpnext_zoho_integration.erpnext_zoho_integration.api.pipeline import RecipientPipeline
+from erpnext_zoho_integration.erpnext_zoho_integration.api.recipient_writer import upsert_recipient_rows
+from erpnext_zoho_integration.erpnext_zoho_integration.api.scheduler import (
+    get_next_sync_at,
+    get_reconcile_interval,
+    get_settle_window,
+    schedule_next_sync,
 )
-import json
-from frappe.utils import get_datetime, now_datetime
+from erpnext_zoho_integration.erpnext_zoho_integration.api.telemetry import (
+    count_db_writes,
+    count_skipped_writes,
+    finish_run,
+    get_telemetry,
+    start_run,
+    timed,
+)
+from erpnext_zoho_integration.erpnext_zoho_integration.api.utils import payload_hash
+
+# Redis hash of "<campaign_key>:<action>" -> next fromindex for resumable recipient syncs
+RECIPIENT_CURSOR_KEY = "zoho_recipient_sync_cursor"
+
+# Last run of the full poll while webhooks are enabled
+LAST_RECONCILE_KEY = "zoho_last_reconcile"
+
+# Due campaigns queued per scheduler tick
+TICK_BATCH_SIZE = 100
+
+# Realtime event carrying background sync progress to the Campaign form
+SYNC_PROGRESS_EVENT = "zoho_campaign_sync_progress"
+CAMPAIGN_SYNC_TIMEOUT = 60 * 60
 
 @frappe.whitelist()
 def sync_all_campaigns():
-    """Sync all recent campaigns from Zoho"""
+    """
+    Queue an incremental sync of the sent campaigns in Zoho.
+
+    Walks the whole campaign list but only queues campaigns that are new, or not on
+    the adaptive schedule yet and still within the settle window. Scheduled campaigns
+    are queued by sync_due_campaigns when their time comes, and settled campaigns are
+    skipped, so API volume follows the number of active campaigns. Every campaign
+    is synced by its own background job; a campaign whose job is still queued or
+    running from an earlier run is not queued again.
+    """
+    start_run("Coordinator")
     try:
-        # Get recent campaigns
-        result = get_recent_campaigns(limit=50)
-        campaigns = result.get("campaigns", [])
-        
-        synced_count = 0
-        errors = []
+        known = get_known_campaigns()
+        settle_window = get_settle_window()
         
-        for campaign_data in campaigns:
-            try:
-                # Only sync sent campaigns
-                if campaign_data.get("campaign_status") == "Sent":
-                    sync_single_campaign(campaign_data)
-                    synced_count += 1
-            except Exception as e:
-                errors.append({
-                    "campaign": campaign_data.get("campaign_name"),
-                    "error": str(e)
-                })
-                frappe.log_error(
-                    frappe.get_traceback(),
-                    f"Campaign Sync Error: {campaign_data.get('campaign_name')}"
-                )
+        listed_count = 0
+        queued_count = 0
+        skipped_count = 0
         
-        frappe.db.commit()
+        for campaigns in iter_recent_campaign_pages():
+            listed_count += len(campaigns)
+            
+            for campaign_data in campaigns:
+                # Only sync sent campaigns that still change
+                if campaign_data.get("campaign_status") != "Sent" or not campaign_data.get("campaign_key"):
+                    continue
+                # A replay re-derives every campaign in the journal
+                known_campaign = known.get(campaign_data.get("campaignId"))
+                if not is_replaying() and known_campaign and (
+                    known_campaign.zoho_next_sync_at
+                    or is_campaign_settled(campaign_data, known_campaign, settle_window)
+                ):
+                    skipped_count += 1
+                    continue
+                
+                if enqueue_campaign_sync(campaign_data):
+                    queued_count += 1
         
+        finish_run("Success")
         return {
             "success": True,
-            "synced_count": synced_count,
-            "total_campaigns": len(campaigns),
-            "errors": errors
+            "queued_count": queued_count,
+            "skipped_count": skipped_count,
+            "total_campaigns": listed_count
         }
         
     except Exception as e:
-        frappe.log_error(frappe.get_traceback(), "Sync All Campaigns Error")
+        frappe.db.rollback()
+        record_failure("Sync All Campaigns Error")
+        finish_run("Failed", str(e))
         frappe.throw(_("Failed to sync campaigns: {0}").format(str(e)))
 
 
+def scheduled_sync():
+    """
+    Hourly scheduler job. Polls Zoho every hour, or only every reconcile interval while
+    webhooks deliver engagement events as they happen.
+    """
+    reconcile_interval = get_reconcile_interval()
+    if reconcile_interval:
+        last_reconcile = frappe.cache().get_value(LAST_RECONCILE_KEY)
+        if last_reconcile and now_datetime() < get_datetime(last_reconcile) + reconcile_interval:
+            return
+    
+    sync_all_campaigns()
+    frappe.cache().set_value(LAST_RECONCILE_KEY, now_datetime())
+
+
+def sync_due_campaigns():
+    """
+    Scheduler tick, every minute. Queues the sync of the campaigns whose next sync time
+    has come, oldest first, after moving their next sync time on so the following
+    ticks don't pick them up again while the job is queued or running.
+    """
+    now = now_datetime()
+    due = frappe.get_all(
+        "Campaign",
+        filters={"zoho_next_sync_at": ["<=", now], "zoho_campaign_key": ["is", "set"]},
+        fields=["name", "zoho_campaign_id", "zoho_sent_time", "zoho_recipients_synced_on"],
+        order_by="zoho_next_sync_at asc",
+        limit=TICK_BATCH_SIZE
+    )
+    if not due:
+        return
+    
+    settle_window = get_settle_window()
+    reconcile_interval = get_reconcile_interval()
+    for campaign in due:
+        frappe.db.set_value(
+            "Campaign",
+            campaign.name,
+            "zoho_next_sync_at",
+            get_next_sync_at(
+                campaign.zoho_sent_time,
+                campaign.zoho_recipients_synced_on,
+                now,
+                settle_window,
+                reconcile_interval
+            ),
+            update_modified=False
+        )
+    frappe.db.commit()
+    
+    for campaign in due:
+        if frappe.flags.zoho_sync_now:
+            # Benchmarks and tests run the job in the calling process
+            sync_campaign_job(campaign_name=campaign.name)
+            continue
+        
+        frappe.enqueue(
+            "erpnext_zoho_integration.erpnext_zoho_integration.api.sync.sync_campaign_job",
+            queue=get_sync_queue(),
+            timeout=CAMPAIGN_SYNC_TIMEOUT,
+            job_id=get_campaign_job_id(campaign.zoho_campaign_id or campaign.name),
+            deduplicate=True,
+            campaign_name=campaign.name
+        )
+
+
+def enqueue_campaign_sync(campaign_data):
+    """Queue the sync job of one campaign, returns False if it is already pending"""
+    if frappe.flags.zoho_sync_now:
+        # Benchmarks and tests run the job in the calling process
+        sync_campaign_job(campaign_data=campaign_data)
+        return True
+    
+    return bool(frappe.enqueue(
+        "erpnext_zoho_integration.erpnext_zoho_integration.api.sync.sync_campaign_job",
+        queue=get_sync_queue(),
+        timeout=CAMPAIGN_SYNC_TIMEOUT,
+        job_id=get_campaign_job_id(campaign_data.get("campaignId")),
+        deduplicate=True,
+        campaign_data=campaign_data
+    ))
+
+
+def sync_campaign_job(campaign_data=None, campaign_name=None):
+    """Background job syncing one campaign, from Zoho's listing data or by ERPNext name"""
+    frappe.flags.zoho_contact_resolver = None
+    start_run("Campaign", campaign_name)
+    name = campaign_name or frappe.db.get_value(
+        "Campaign", {"zoho_campaign_id": campaign_data.get("campaignId")}, "name"
+    )
+    
+    try:
+        publish_sync_progress(name, "Running", 0, _("Sync started"))
+        
+        if campaign_name:
+            campaign = frappe.get_doc("Campaign", campaign_name)
+            sync_campaign_analytics(campaign, campaign.zoho_campaign_key)
+        else:
+            campaign = sync_single_campaign(campaign_data)
+            if not campaign:
+                finish_run("Skipped")
+                return
+        
+        # From the watermark this pass left, which ends the schedule of settled campaigns
+        schedule_next_sync(campaign.name)
+        frappe.db.commit()
+        invalidate_campaign_dashboard(campaign.name)
+        finish_run("Success", campaign=campaign.name)
+        publish_sync_progress(campaign.name, "Completed", 100, _("Campaign synced successfully"))
+        
+    except Exception as e:
+        frappe.db.rollback()
+        if name:
+            # Batches committed before the failure are on the dashboard too
+            invalidate_campaign_dashboard(name)
+        record_failure(
+            f"Campaign Sync Error: {campaign_name or campaign_data.get('campaign_name')}",
+            campaign=name
+        )
+        finish_run("Failed", str(e), campaign=name)
+        publish_sync_progress(name, "Failed", 100, str(e))
+
+
+def publish_sync_progress(campaign_name, status, progress, message):
+    """Tell open Campaign forms how far their background sync got"""
+    if not campaign_name:
+        return
+    
+    frappe.publish_realtime(
+        SYNC_PROGRESS_EVENT,
+        {
+            "campaign": campaign_name,
+            "status": status,
+            "progress": progress,
+            "message": message
+        },
+        doctype="Campaign",
+        docname=campaign_name
+    )
+
+
+def get_sync_queue():
+    """RQ queue for sync jobs; point zoho_sync_queue in site config at a dedicated worker queue"""
+    return frappe.conf.get("zoho_sync_queue") or "long"
+
+
+def get_campaign_job_id(zoho_campaign_id):
+    return f"zoho_campaign_sync::{zoho_campaign_id}"
+
+
+def get_known_campaigns():
+    """Sync watermarks of every Zoho linked Campaign, keyed by Zoho campaign id"""
+    campaigns = frappe.get_all(
+        "Campaign",
+        filters={"zoho_campaign_id": ["is", "set"]},
+        fields=["zoho_campaign_id", "zoho_sent_time", "zoho_recipients_synced_on", "zoho_next_sync_at"]
+    )
+    return {c.zoho_campaign_id: c for c in campaigns}
+
+
+def is_campaign_settled(campaign_data, known, settle_window):
+    """
+    True when a campaign no longer needs syncing: it is past the settle window and
+    its recipients were fully synced at least once after the window closed.
+    """
+    if not known or not known.zoho_recipients_synced_on:
+        return False
+    
+    sent_time = known.zoho_sent_time or parse_sent_time(campaign_data.get("sent_time"))
+    if not sent_time:
+        return False
+    
+    settled_on = get_datetime(sent_time) + settle_window
+    return now_datetime() >= settled_on and get_datetime(known.zoho_recipients_synced_on) >= settled_on
+
+
+def parse_sent_time(sent_time):
+    """Zoho sends sent_time as a milliseconds timestamp"""
+    if not sent_time:
+        return None
+    
+    try:
+        return get_datetime(int(sent_time) / 1000)
+    except (ValueError, TypeError):
+        return None  # Skip if invalid timestamp
+
+
+@timed("sync_single_campaign")
 def sync_single_campaign(campaign_data):
     """Sync a single campaign with all its data"""
     campaign_id = campaign_data.get("campaignId")
@@ -72,6 +319,13 @@ def sync_single_campaign(campaign_data):
         campaign.campaign_name = campaign_name
         campaign.naming_series = "SAL-CAM-.YYYY.-"
     
+    details_hash = payload_hash(campaign_data)
+    if not campaign.is_new() and campaign.zoho_payload_hash == details_hash and not is_replaying():
+        # Nothing changed in Zoho's campaign details, go straight to the report
+        count_skipped_writes("Campaign")
+        sync_campaign_analytics(campaign, campaign_key)
+        return campaign
+    
     # Map basic fields
     campaign.zoho_campaign_id = campaign_id
     campaign.zoho_campaign_key = campaign_key
@@ -79,12 +333,9 @@ def sync_single_campaign(campaign_data):
     campaign.zoho_from_email = campaign_data.get("from_email")
     
     # Handle sent_time (milliseconds timestamp)
-    sent_time = campaign_data.get("sent_time")
+    sent_time = parse_sent_time(campaign_data.get("sent_time"))
     if sent_time:
-        try:
-            campaign.zoho_sent_time = get_datetime(int(sent_time) / 1000)
-        except (ValueError, TypeError):
-            pass  # Skip if invalid timestamp
+        campaign.zoho_sent_time = sent_time
     
     campaign.zoho_campaign_status = campaign_data.get("campaign_status")
     campaign.zoho_campaign_type = campaign_data.get("campaigntype")
@@ -96,8 +347,11 @@ def sync_single_campaign(campaign_data):
         preview_url = f"https://{preview_url}"
     campaign.zoho_preview_url = preview_url
     
+    campaign.zoho_payload_hash = details_hash
     campaign.last_synced = now_datetime()
     campaign.save(ignore_permissions=True)
+    # Don't hold the Campaign row lock across the report and recipient API calls
+    frappe.db.commit()
     
     # Sync analytics and recipients
     sync_campaign_analytics(campaign, campaign_key)
@@ -105,6 +359,7 @@ def sync_single_campaign(campaign_data):
     return campaign
 
 
+@timed("sync_campaign_analytics")
 def sync_campaign_analytics(campaign, campaign_key):
     """Sync campaign analytics and recipient data"""
     try:
@@ -115,56 +370,49 @@ def sync_campaign_analytics(campaign, campaign_key):
         if not campaign_reports:
             return
         
-        # Clear existing analytics
-        campaign.campaign_analytics = []
-        
-        # Metric mapping with Zoho API field names
-        metric_mapping = {
-            "emails_sent_count": "Emails Sent",
-            "delivered_count": "Delivered",
-            "delivered_percent": "Delivered %",
-            "opens_count": "Opens",
-            "open_percent": "Open Rate %",
-            "unique_clicks_count": "Unique Clicks",
-            "unique_clicked_percent": "Click Rate %",
-            "bounces_count": "Bounces",
-            "bounce_percent": "Bounce Rate %",
-            "hardbounce_count": "Hard Bounces",
-            "softbounce_count": "Soft Bounces",
-            "unsub_count": "Unsubscribes",
-            "unsubscribe_percent": "Unsubscribe Rate %",
-            "complaints_count": "Spam Complaints",
-            "complaints_percent": "Spam Rate %",
-            "unopened": "Unopened",
-            "unopened_percent": "Unopened %",
-            "clicksperopenrate": "Click-to-Open Rate",
-            "forwards_count": "Forwards"
-        }
-        
-        for key, label in metric_mapping.items():
-            value = campaign_reports.get(key)
-            if value is not None:
-                campaign.append("campaign_analytics", {
-                    "metric": label,
-                    "value": str(value),
-                    "percentage": float(value) if "percent" in key or "rate" in key.lower() else None
-                })
-        
-        campaign.save(ignore_permissions=True)
+        report_hash = payload_hash(campaign_reports)
+        if campaign.zoho_report_hash == report_hash and not is_replaying():
+            count_skipped_writes("Campaign")
+        else:
+            update_campaign_analytics(campaign, campaign_reports, report_hash)
+            frappe.db.commit()
+        publish_sync_progress(campaign.name, "Running", 20, _("Campaign report synced"))
         
-        # Sync recipient data for different actions
-        sync_campaign_recipients_data(campaign, campaign_key)
+        # Sync recipient data for different actions, moving the watermark once all succeeded
+        if sync_campaign_recipients_data(campaign, campaign_key):
+            campaign.db_set("zoho_recipients_synced_on", now_datetime(), update_modified=False)
         
-    except Exception as e:
-        frappe.log_error(
-            frappe.get_traceback(),
-            f"Campaign Analytics Sync Error: {campaign.name}"
-        )
+    except Exception:
+        # Reported once: exceptions the API wrappers reported already are not counted again
+        record_failure(f"Campaign Analytics Sync Error: {campaign.name}", campaign=campaign.name)
         raise
 
 
+def update_campaign_analytics(campaign, campaign_reports, report_hash):
+    """Store Zoho's campaign-reports section in Campaign Metrics and the analytics table"""
+    synced_on = now_datetime()
+    values = parse_campaign_metrics(campaign_reports)
+    save_campaign_metrics(campaign.name, values, synced_on)
+
+    # The child table is rebuilt from the typed values for forms and reports reading it
+    campaign.campaign_analytics = []
+    for row in build_analytics_rows(values):
+        campaign.append("campaign_analytics", row)
+    
+    campaign.zoho_report_hash = report_hash
+    campaign.last_synced = synced_on
+    campaign.save(ignore_permissions=True)
+
+
+@timed("sync_campaign_recipients_data")
 def sync_campaign_recipients_data(campaign, campaign_key):
-    """Sync recipient actions (opens, clicks, bounces, etc.) with debug logging"""
+    """
+    Sync recipient actions (opens, clicks, bounces, etc.) page by page.
+
+    Pages are committed in batches following the Zoho Settings commit policy. A page
+    that fails is replayed row by row inside its savepoint, and the rows that still
+    fail are logged and skipped.
+    """
     # Updated action mapping based on Zoho API documentation
     action_mapping = {
         "openedcontacts": "Opened",
@@ -174,265 +422,172 @@ def sync_campaign_recipients_data(campaign, campaign_key):
         "optoutcontacts": "Unsubscribed",
         "spamcontacts": "Complaint"
     }
-    
-    for action_key, action_type in action_mapping.items():
+    start_indexes = {
+        action_key: get_recipient_cursor(campaign_key, action_key) for action_key in action_mapping
+    }
+    synced = dict.fromkeys(action_mapping, 0)
+    failed = set()
+    policy = get_commit_policy()
+    telemetry = get_telemetry()
+    
+    # Pages are fetched and normalized on the pipeline's threads, resolved and written here
+    pipeline = RecipientPipeline(campaign_key, action_mapping, start_indexes, cancelled=failed)
+    for page in pipeline:
+        action_type = action_mapping[page.action]
+        
+        if page.error:
+            failed.add(page.action)
+            record_failure(
+                f"Recipient Sync Error: {campaign.name}",
+                exc=page.error,
+                endpoint="getcampaignrecipientsdata",
+                campaign=campaign.name,
+                message=f"Error syncing {action_type} recipients with key {page.action} "
+                f"from index {page.fromindex}: {page.error!s}"
+            )
+            continue
+        
+        if page.action in failed:
+            continue
+        
+        if telemetry:
+            telemetry.incr("zoho_sync_rows_total", page.received, action=action_type)
+        for warning in page.warnings:
+            frappe.logger().warning(warning)
+        
         try:
-            frappe.logger().info(f"Fetching {action_type} recipients with key: {action_key}")
-            result = get_campaign_recipients(campaign_key, action_key, range_val=100)
-            
-            if not result:
-                frappe.logger().info(f"No result returned for {action_type} with key {action_key}")
-                continue
-            
-            # Check different possible response structures
-            if "list_of_details" in result:
-                recipients = result.get("list_of_details", [])
-                frappe.logger().info(f"Found {len(recipients)} {action_type} recipients in 'list_of_details'")
-            elif "recipients" in result:
-                recipients = result.get("recipients", [])
-                frappe.logger().info(f"Found {len(recipients)} {action_type} recipients in 'recipients'")
-            else:
-                # Try to find any array in the result
-                for key, value in result.items():
-                    if isinstance(value, list) and key != "urlclicks":  # Skip urlclicks array
-                        recipients = value
-                        frappe.logger().info(f"Found {len(recipients)} {action_type} recipients in '{key}'")
-                        break
-                else:
-                    recipients = []
-                    frappe.logger().info(f"No recipient list found in response for {action_type}")
-            
-            if recipients:
-                # Log first recipient to see structure
-                frappe.logger().info(f"First {action_type} recipient: {json.dumps(recipients[0] if recipients else {})}")
-            
-            for recipient_data in recipients:
-                sync_recipient(campaign, recipient_data, action_type)
-                
-            frappe.db.commit()
-            
+            rejected = write_with_savepoint(
+                partial(write_recipient_records, campaign, action_type=action_type), page.records
+            )
         except Exception as e:
-            frappe.log_error(
-                f"Error syncing {action_type} recipients with key {action_key}: {str(e)}",
-                f"Recipient Sync Error: {campaign.name}"
+            # The transaction is gone, and with it every page not committed yet
+            failed.add(page.action)
+            failed.update(policy.rollback())
+            record_failure(
+                f"Recipient Sync Error: {campaign.name}",
+                endpoint="Campaign Recipient",
+                campaign=campaign.name,
+                message=f"Error syncing {action_type} recipients with key {page.action}: {e!s}"
             )
-            frappe.logger().error(f"Full traceback for {action_type}: {frappe.get_traceback()}")
-
-
-def sync_recipient(campaign, recipient_data, action_type):
-    """Sync individual recipient data with better debugging"""
-    email = recipient_data.get("contactemailaddress")
-    zoho_contact_id = recipient_data.get("contactid")
-    
-    frappe.logger().debug(f"Syncing recipient: email={email}, action={action_type}")
-    
-    if not email:
-        frappe.logger().warning(f"No email found for recipient: {recipient_data}")
-        return
-    
-    # Find or create Contact
-    contact = find_or_create_contact(recipient_data)
-    
-    # Check if recipient action already exists
-    existing = frappe.db.exists(
-        "Campaign Recipient",
-        {
-            "campaign": campaign.name,
-            "email": email,
-            "action_type": action_type
-        }
-    )
-    
-    if existing:
-        recipient = frappe.get_doc("Campaign Recipient", existing)
-        frappe.logger().debug(f"Updating existing recipient: {existing}")
-    else:
-        recipient = frappe.new_doc("Campaign Recipient")
-        recipient.campaign = campaign.name
-        recipient.email = email
-        recipient.action_type = action_type
-        frappe.logger().debug(f"Creating new recipient for {email}")
-    
-    # Map fields
-    recipient.contact = contact.name if contact else None
-    recipient.zoho_contact_id = zoho_contact_id
-    
-    # Handle sent_date - parse from "sentdate" field
-    sent_date = recipient_data.get("sentdate")
-    if sent_date:
-        try:
-            # Parse date like "05 Dec 2025, 04:21 PM"
-            from datetime import datetime
-            dt = datetime.strptime(sent_date, "%d %b %Y, %I:%M %p")
-            recipient.sent_time = dt
-            recipient.action_date = dt
-        except (ValueError, TypeError) as e:
-            frappe.logger().warning(f"Invalid sent_date {sent_date}: {str(e)}")
-    
-    # For clicked recipients, handle click-specific data
-    if action_type == "Clicked":
-        # Get click count
-        click_count = recipient_data.get("clickcount")
-        if click_count:
-            try:
-                recipient.click_count = int(click_count)
-            except (ValueError, TypeError):
-                recipient.click_count = 1
-        
-        # Store clicked URLs
-        clicked_urls = recipient_data.get("clickedurls")
-        if clicked_urls:
-            # Clean up the URLs string - remove brackets if present
-            if isinstance(clicked_urls, str):
-                clicked_urls = clicked_urls.strip("[]")
-                recipient.clicked_links = clicked_urls
+            continue
         
-        # Store click reports as JSON
-        click_reports = recipient_data.get("clickreports")
-        if click_reports:
-            try:
-                if isinstance(click_reports, str):
-                    # Parse the string representation of dict
-                    import ast
-                    try:
-                        click_reports_dict = ast.literal_eval(click_reports)
-                        recipient.click_reports = json.dumps(click_reports_dict)
-                    except:
-                        recipient.click_reports = click_reports
-                else:
-                    recipient.click_reports = json.dumps(click_reports)
-            except Exception as e:
-                frappe.logger().warning(f"Error parsing click_reports: {str(e)}")
+        if rejected:
+            log_rejected_recipients(campaign, action_type, rejected)
         
-        # Store URL clicks data
-        url_clicks = recipient_data.get("urlclicks")
-        if url_clicks:
-            recipient.url_clicks = json.dumps(url_clicks)
-    
-    # For opened recipients
-    elif action_type == "Opened":
-        # Store open reports if available
-        open_reports = recipient_data.get("openreports")
-        if open_reports:
-            try:
-                if isinstance(open_reports, str):
-                    import ast
-                    try:
-                        open_reports_dict = ast.literal_eval(open_reports)
-                        recipient.open_reports = json.dumps(open_reports_dict)
-                    except:
-                        recipient.open_reports = open_reports
-                else:
-                    recipient.open_reports = json.dumps(open_reports)
-            except Exception as e:
-                frappe.logger().warning(f"Error parsing open_reports: {str(e)}")
-    
-    # Common fields
-    recipient.country = recipient_data.get("country")
-    recipient.city = recipient_data.get("city")
-    recipient.state = recipient_data.get("state")
-    
-    # Handle boolean fields
-    rtbf = recipient_data.get("rtbf")
-    recipient.is_rtbf = rtbf == "1" if rtbf else False
-    
-    recipient.contact_status = recipient_data.get("contactstatus")
+        # Only move the cursor once the page is committed
+        policy.add(
+            page.received,
+            key=page.action,
+            on_commit=partial(
+                set_recipient_cursor, campaign_key, page.action, page.fromindex + page.received
+            )
+        )
+        synced[page.action] += page.received
+        publish_sync_progress(
+            campaign.name,
+            "Running",
+            50,
+            _("Synced {0} recipients").format(sum(synced.values()))
+        )
     
-    # Store additional data
-    full_name = f"{recipient_data.get('contactfn', '')} {recipient_data.get('contactln', '')}".strip()
-    recipient.full_name = full_name if full_name else None
+    policy.commit()
     
-    recipient.company_name = recipient_data.get("companyname")
-    recipient.job_title = recipient_data.get("jobtitle")
+    for action_key in action_mapping:
+        if action_key not in failed:
+            clear_recipient_cursor(campaign_key, action_key)
     
-    recipient.save(ignore_permissions=True)
-    frappe.logger().debug(f"Saved recipient: {recipient.name}")
+    return not failed
 
 
-def find_or_create_contact(contact_data):
-    """Find existing or create new ERPNext Contact"""
-    email = contact_data.get("contactemailaddress")
-    zoho_contact_id = contact_data.get("contactid")
-    
-    if not email:
-        return None
-    
-    # Check by Zoho Contact ID first
-    if zoho_contact_id:
-        existing = frappe.db.get_value(
-            "Contact",
-            {"zoho_contact_id": zoho_contact_id},
-            "name"
-        )
-        if existing:
-            contact = frappe.get_doc("Contact", existing)
-            update_contact_from_zoho(contact, contact_data)
-            return contact
-    
-    # Check by email
-    existing_email = frappe.db.get_value(
-        "Contact Email",
-        {"email_id": email},
-        "parent"
+def log_rejected_recipients(campaign, action_type, rejected):
+    """Report the recipients of a page that could not be written and were skipped"""
+    emails = ", ".join(record.email for record, _tb in rejected)
+    record_failure(
+        f"Recipient Sync Error: {campaign.name}",
+        endpoint="Campaign Recipient",
+        campaign=campaign.name,
+        message=f"Skipped {len(rejected)} {action_type} recipients that could not be written: {emails}",
+        traceback=rejected[-1][1]
     )
-    
-    if existing_email:
-        contact = frappe.get_doc("Contact", existing_email)
-        update_contact_from_zoho(contact, contact_data)
-        return contact
-    
-    # Create new contact
-    contact = frappe.new_doc("Contact")
-    contact.first_name = contact_data.get("contactfn") or "Unknown"
-    contact.last_name = contact_data.get("contactln") or ""
-    
-    # Add email
-    contact.append("email_ids", {
-        "email_id": email,
-        "is_primary": 1
-    })
-    
-    # Add phone if available
-    phone = contact_data.get("phone") or contact_data.get("mobile")
-    if phone:
-        contact.append("phone_nos", {
-            "phone": phone,
-            "is_primary_phone": 1
-        })
-    
-    update_contact_from_zoho(contact, contact_data)
-    contact.save(ignore_permissions=True)
-    
-    return contact
 
 
-def update_contact_from_zoho(contact, contact_data):
-    """Update contact with Zoho data"""
-    contact.zoho_contact_id = contact_data.get("contactid")
-    contact.zoho_status = contact_data.get("contactstatus")
-    contact.zoho_last_synced = now_datetime()
-    
-    # Update company and designation if not already set
-    if not contact.company_name and contact_data.get("companyname"):
-        contact.company_name = contact_data.get("companyname")
-    
-    if not contact.designation and contact_data.get("jobtitle"):
-        contact.designation = contact_data.get("jobtitle")
-    
-    contact.save(ignore_permissions=True)
+def get_recipient_cursor(campaign_key, action_key):
+    """Index of the first recipient not yet committed for an interrupted action sync"""
+    return cint(frappe.cache().hget(RECIPIENT_CURSOR_KEY, f"{campaign_key}:{action_key}")) or 1
+
+
+def set_recipient_cursor(campaign_key, action_key, fromindex):
+    frappe.cache().hset(RECIPIENT_CURSOR_KEY, f"{campaign_key}:{action_key}", fromindex)
+
+
+def clear_recipient_cursor(campaign_key, action_key):
+    frappe.cache().hdel(RECIPIENT_CURSOR_KEY, f"{campaign_key}:{action_key}")
+
+
+def write_recipient_records(campaign, records, action_type):
+    """Resolve and write stages of a page of normalized RecipientRecords"""
+    resolver = get_contact_resolver()
+    skipped_contacts = resolver.skipped_writes
+    contacts = resolve_record_contacts(resolver, records)
+    stats = write_record_rows(campaign, records, action_type, contacts)
+    count_skipped_writes("Contact", resolver.skipped_writes - skipped_contacts)
+    return stats
+
+
+@timed("resolve_record_contacts")
+def resolve_record_contacts(resolver, records):
+    """Contacts of the whole page are resolved, updated and created in bulk"""
+    return resolver.resolve([record.contact for record in records])
+
+
+@timed("write_record_rows")
+def write_record_rows(campaign, records, action_type, contacts):
+    rows = []
+    for record in records:
+        # A copy, so a replay of the record after a failed page hashes the same values
+        row = dict(record.row)
+        row["contact"] = contacts.get(record.email.lower())
+        row["payload_hash"] = payload_hash(row)
+        rows.append(row)
+    
+    stats = upsert_recipient_rows(campaign.name, action_type, rows)
+    count_db_writes("Campaign Recipient", "insert", stats["inserted"])
+    count_db_writes("Campaign Recipient", "update", stats["updated"])
+    if action_type == "Clicked":
+        write_click_events(campaign.name, stats["written"])
+    count_skipped_writes("Campaign Recipient", stats["unchanged"])
+    return stats
 
 
 @frappe.whitelist()
-def sync_campaign_by_name(campaign_name):
-    """Sync a specific campaign by its ERPNext name"""
+def enqueue_campaign_sync_by_name(campaign_name):
+    """Queue a background sync of a specific campaign by its ERPNext name"""
     campaign = frappe.get_doc("Campaign", campaign_name)
+    campaign.check_permission("write")
     
     if not campaign.zoho_campaign_key:
         frappe.throw(_("This campaign is not linked to Zoho"))
     
-    sync_campaign_analytics(campaign, campaign.zoho_campaign_key)
+    job = frappe.enqueue(
+        "erpnext_zoho_integration.erpnext_zoho_integration.api.sync.sync_campaign_job",
+        queue=get_sync_queue(),
+        timeout=CAMPAIGN_SYNC_TIMEOUT,
+        job_id=get_campaign_job_id(campaign.zoho_campaign_id or campaign.name),
+        deduplicate=True,
+        campaign_name=campaign.name
+    )
+    
+    if job:
+        publish_sync_progress(campaign.name, "Queued", 0, _("Sync queued"))
     
     return {
         "success": True,
-        "message": "Campaign synced successfully"
-    }
\ No newline at end of file
+        "queued": bool(job),
+        "message": _("Campaign sync queued") if job else _("A sync of this campaign is already in progress")
+    }
+
+
+@frappe.whitelist()
+def sync_campaign_by_name(campaign_name):
+    """Kept for existing callers, queues the sync like enqueue_campaign_sync_by_name"""
+    return enqueue_campaign_sync_by_name(campaign_name)
@@ -0,0 +1,226 @@
+import functools
+import json
+import threading
+import time
+from bisect import bisect_left
+from collections import Counter
+from contextlib import contextmanager
+
+import frappe
+from frappe.utils import now_datetime
+from werkzeug.wrappers import Response
+
+from erpnext_zoho_integration.erpnext_zoho_integration.api.failures import flush_failures, start_failures
+from erpnext_zoho_integration.erpnext_zoho_integration.api.utils import get_counter_hash
+
+# Upper bounds (seconds) of the latency histogram buckets
+LATENCY_BUCKETS = (0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 300)
+
+# Redis hash accumulating every finished run, the source of the Prometheus endpoint
+METRICS_KEY = "zoho_sync_metrics"
+
+METRIC_HELP = {
+    "zoho_api_request_seconds": ("histogram", "Latency of Zoho API requests, per attempt"),
+    "zoho_api_requests_total": ("counter", "Zoho API requests by endpoint and HTTP status"),
+    "zoho_api_retries_total": ("counter", "Zoho API attempts that were retried"),
+    "zoho_api_bytes_total": ("counter", "Bytes received from the Zoho API"),
+    "zoho_sync_stage_seconds": ("histogram", "Duration of sync stages"),
+    "zoho_sync_rows_total": ("counter", "Recipient rows received from Zoho by action"),
+    "zoho_sync_db_writes_total": ("counter", "Rows written to the database by doctype and operation"),
+    "zoho_sync_skipped_writes_total": ("counter", "Writes skipped because the Zoho payload was unchanged"),
+    "zoho_sync_runs_total": ("counter", "Finished sync runs by type and status"),
+    "zoho_sync_failures_total": ("counter", "Sync failures by endpoint and exception type"),
+}
+
+
+class SyncTelemetry:
+    """
+    Counters and latency histograms of one sync run.
+
+    Safe to share with the API worker threads: recording only takes a lock and never
+    touches frappe.local.
+    """
+
+    def __init__(self, run_type, campaign=None, parent=None):
+        self.run_type = run_type
+        self.campaign = campaign
+        # Run that was active when this one started, e.g. a coordinator running jobs inline
+        self.parent = parent
+        self.started_on = now_datetime()
+        self.started = time.monotonic()
+        self.counters = Counter()
+        # series -> [bucket counts..., +Inf count], and series -> sum of observations
+        self.buckets = {}
+        self.sums = Counter()
+        self.lock = threading.Lock()
+
+    def incr(self, name, value=1, **labels):
+        if not value:
+            return
+        with self.lock:
+            self.counters[series(name, labels)] += value
+
+    def observe(self, name, seconds, **labels):
+        key = series(name, labels)
+        with self.lock:
+            counts = self.buckets.setdefault(key, [0] * (len(LATENCY_BUCKETS) + 1))
+            counts[bisect_left(LATENCY_BUCKETS, seconds)] += 1
+            self.sums[key] += seconds
+
+    @contextmanager
+    def timer(self, name, **labels):
+        start = time.monotonic()
+        try:
+            yield
+        finally:
+            self.observe(name, time.monotonic() - start, **labels)
+
+    def total(self, name):
+        """Sum of a counter over all its label values"""
+        return sum(value for key, value in self.counters.items() if key.split("{", 1)[0] == name)
+
+    def histogram_series(self):
+        """Prometheus sample name -> value for the histograms, with cumulative buckets"""
+        samples = {}
+        for key, counts in self.buckets.items():
+            name, _, labels = key.partition("{")
+            labels = labels.rstrip("}")
+            cumulative = 0
+            for bound, count in zip((*LATENCY_BUCKETS, "+Inf"), counts, strict=True):
+                cumulative += count
+                le = f'le="{bound}"'
+                samples[f"{name}_bucket{{{labels + ',' if labels else ''}{le}}}"] = cumulative
+            samples[f"{name}_sum{{{labels}}}" if labels else f"{name}_sum"] = self.sums[key]
+            samples[f"{name}_count{{{labels}}}" if labels else f"{name}_count"] = cumulative
+        return samples
+
+
+def series(name, labels):
+    if not labels:
+        return name
+    return name + "{" + ",".join(f'{key}="{labels[key]}"' for key in sorted(labels)) + "}"
+
+
+def start_run(run_type, campaign=None):
+    """Start collecting telemetry and failures for the current request or job"""
+    start_failures()
+    frappe.flags.zoho_sync_telemetry = SyncTelemetry(run_type, campaign, get_telemetry())
+    return frappe.flags.zoho_sync_telemetry
+
+
+def get_telemetry():
+    """Telemetry of the running sync, None outside of one"""
+    return frappe.flags.zoho_sync_telemetry
+
+
+def finish_run(status, error=None, campaign=None):
+    """
+    Add the run's failures to the failure windows, store the run as a Zoho Sync Run and
+    add it to the site wide Prometheus metrics
+    """
+    failures = flush_failures()
+    telemetry = get_telemetry()
+    if not telemetry:
+        return
+    frappe.flags.zoho_sync_telemetry = telemetry.parent
+
+    telemetry.incr("zoho_sync_runs_total", run_type=telemetry.run_type, status=status)
+    for group in failures.groups.values() if failures else ():
+        telemetry.incr(
+            "zoho_sync_failures_total", group.count, endpoint=group.endpoint or "-", exception=group.exception
+        )
+    samples = {**telemetry.counters, **telemetry.histogram_series()}
+
+    try:
+        run = frappe.new_doc("Zoho Sync Run")
+        run.update(
+            {
+                "run_type": telemetry.run_type,
+                "campaign": campaign or telemetry.campaign,
+                "status": status,
+                "started_on": telemetry.started_on,
+                "finished_on": now_datetime(),
+                "duration": round(time.monotonic() - telemetry.started, 3),
+                "api_calls": telemetry.total("zoho_api_requests_total"),
+                "api_retries": telemetry.total("zoho_api_retries_total"),
+                "bytes_received": telemetry.total("zoho_api_bytes_total"),
+                "rows_synced": telemetry.total("zoho_sync_rows_total"),
+                "db_writes": telemetry.total("zoho_sync_db_writes_total"),
+                "skipped_writes": telemetry.total("zoho_sync_skipped_writes_total"),
+                "error": error,
+                "metrics": json.dumps(samples, indent=1, sort_keys=True),
+            }
+        )
+        run.insert(ignore_permissions=True)
+        frappe.db.commit()
+
+        cache = frappe.cache()
+        key = cache.make_key(METRICS_KEY)
+        pipeline = cache.pipeline()
+        for sample, value in samples.items():
+            pipeline.hincrbyfloat(key, sample, value)
+        pipeline.execute()
+    except Exception:
+        # Telemetry must never fail the sync it measures
+        frappe.log_error(frappe.get_traceback(), "Zoho Sync Telemetry Error")
+
+
+def count_db_writes(doctype, operation, count=1):
+    """Count rows the sync wrote, when it runs inside an instrumented run"""
+    telemetry = get_telemetry()
+    if telemetry:
+        telemetry.incr("zoho_sync_db_writes_total", count, doctype=doctype, operation=operation)
+
+
+def count_skipped_writes(doctype, count=1):
+    """Count saves skipped because the Zoho payload was unchanged"""
+    telemetry = get_telemetry()
+    if telemetry:
+        telemetry.incr("zoho_sync_skipped_writes_total", count, doctype=doctype)
+
+
+def timed(stage):
+    """Record the duration of a sync stage when it runs inside an instrumented run"""
+
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            telemetry = get_telemetry()
+            if not telemetry:
+                return fn(*args, **kwargs)
+            with telemetry.timer("zoho_sync_stage_seconds", stage=stage):
+                return fn(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+@frappe.whitelist()
+def metrics():
+    """Sync metrics of this site in the Prometheus text exposition format"""
+    frappe.only_for("System Manager")
+
+    stored = get_counter_hash(METRICS_KEY)
+
+    lines = []
+    for name, (metric_type, help_text) in METRIC_HELP.items():
+        names = metric_names(name, metric_type)
+        samples = sorted(sample for sample in stored if sample.split("{", 1)[0] in names)
+        if not samples:
+            continue
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} {metric_type}")
+        lines.extend(f"{sample} {format_value(stored[sample])}" for sample in samples)
+
+    return Response("\n".join(lines) + "\n", content_type="text/plain; version=0.0.4; charset=utf-8")
+
+
+def format_value(value):
+    return str(int(value)) if value.is_integer() else repr(value)
+
+
+def metric_names(name, metric_type):
+    if metric_type == "histogram":
+        return (f"{name}_bucket", f"{name}_sum", f"{name}_count")
+    return (name,)
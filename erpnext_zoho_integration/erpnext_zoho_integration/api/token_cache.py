@@ -0,0 +1,105 @@
+import threading
+from collections import Counter
+from datetime import timedelta
+
+import frappe
+from frappe.utils import get_datetime, now_datetime
+
+from erpnext_zoho_integration.erpnext_zoho_integration.api.utils import get_counter_hash
+
+# Tokens are treated as expired this long before Zoho's expiry
+EXPIRY_BUFFER = timedelta(minutes=5)
+
+CACHE_KEY = "zoho_access_token"
+REFRESH_LOCK_KEY = "zoho_access_token_refresh"
+STATS_KEY = "zoho_token_cache_stats"
+
+# Seconds a refresh may hold the lock, and how long other workers wait for it
+REFRESH_LOCK_TIMEOUT = 30
+REFRESH_LOCK_WAIT = 40
+
+# site -> (token, expiry), so bench processes serving several sites keep them apart
+_local_tokens = {}
+_local_stats = Counter()
+_stats_lock = threading.Lock()
+
+
+def get_cached_token(record_stats=True):
+    """
+    Return a still valid access token from process memory or Redis, or None. A check
+    repeating one that was counted already, like the one under the refresh lock,
+    passes record_stats=False.
+    """
+    site = frappe.local.site
+
+    token, expiry = _local_tokens.get(site, (None, None))
+    if is_fresh(expiry):
+        if record_stats:
+            count("local_hit")
+        return token
+
+    cached = frappe.cache().get_value(CACHE_KEY) or {}
+    expiry = get_datetime(cached.get("expiry")) if cached.get("expiry") else None
+    if cached.get("token") and is_fresh(expiry):
+        _local_tokens[site] = (cached["token"], expiry)
+        if record_stats:
+            count("redis_hit", shared=True)
+        return cached["token"]
+
+    if record_stats:
+        count("miss", shared=True)
+    return None
+
+
+def set_cached_token(token, expiry):
+    """Publish a freshly issued token to this process and every other worker"""
+    expiry = get_datetime(expiry)
+    if not token or not expiry:
+        return
+
+    ttl = int((expiry - now_datetime()).total_seconds())
+    if ttl <= 0:
+        return
+
+    frappe.cache().set_value(CACHE_KEY, {"token": token, "expiry": str(expiry)}, expires_in_sec=ttl)
+    _local_tokens[frappe.local.site] = (token, expiry)
+
+
+def clear_cached_token():
+    frappe.cache().delete_value(CACHE_KEY)
+    _local_tokens.pop(frappe.local.site, None)
+
+
+def is_fresh(expiry):
+    return bool(expiry) and now_datetime() < expiry - EXPIRY_BUFFER
+
+
+def refresh_lock():
+    """Redis lock making sure a single worker refreshes the token at a time"""
+    cache = frappe.cache()
+    return cache.lock(
+        cache.make_key(REFRESH_LOCK_KEY),
+        timeout=REFRESH_LOCK_TIMEOUT,
+        blocking_timeout=REFRESH_LOCK_WAIT,
+    )
+
+
+def count(event, shared=False):
+    """Count a cache event in this process, and site wide in Redis for the rarer ones"""
+    with _stats_lock:
+        _local_stats[event] += 1
+
+    if shared:
+        cache = frappe.cache()
+        cache.hincrby(cache.make_key(STATS_KEY), event, 1)
+
+
+@frappe.whitelist()
+def get_token_cache_stats():
+    """Hit/miss/refresh counters of the access token cache"""
+    frappe.only_for("System Manager")
+
+    return {
+        "process": dict(_local_stats),
+        "site": {event: int(value) for event, value in get_counter_hash(STATS_KEY).items()},
+    }
@@ -0,0 +1,22 @@
+import hashlib
+import json
+
+import frappe
+
+
+def payload_hash(payload):
+    """Stable hash of a normalized Zoho payload, used to skip writes when nothing changed"""
+    normalized = json.dumps(payload, sort_keys=True, default=str, separators=(",", ":"))
+    return hashlib.sha1(normalized.encode()).hexdigest()
+
+
+def get_counter_hash(key):
+    """
+    Read a Redis hash of counters kept with hincrby/hincrbyfloat. RedisWrapper.hgetall
+    expects pickled values, so this goes through a plain pipeline.
+    """
+    cache = frappe.cache()
+    pipeline = cache.pipeline()
+    pipeline.hgetall(cache.make_key(key))
+    (values,) = pipeline.execute()
+    return {frappe.safe_decode(field): float(value) for field, value in (values or {}).items()}
@@ -0,0 +1,284 @@
+"""
+Receiver for Zoho Campaigns webhook callbacks.
+
+Zoho posts contact activity (opens, clicks, bounces, unsubscribes, complaints) to
+`receive`, which only checks the shared secret and pushes the events to a Redis list.
+The process_webhook_events scheduler job applies them in micro-batches. While
+webhooks are enabled the scheduled poll only runs as a reconciliation pass.
+"""
+
+import hmac
+import json
+import re
+import time
+from collections import defaultdict
+from functools import partial
+
+import frappe
+from frappe import _
+from frappe.utils import cint, get_datetime, now_datetime
+from frappe.utils.password import get_decrypted_password
+
+from erpnext_zoho_integration.erpnext_zoho_integration.api.click_events import add_click_events
+from erpnext_zoho_integration.erpnext_zoho_integration.api.commit_policy import write_with_savepoint
+from erpnext_zoho_integration.erpnext_zoho_integration.api.contact_resolver import get_contact_resolver
+from erpnext_zoho_integration.erpnext_zoho_integration.api.dashboard import invalidate_campaign_dashboard
+from erpnext_zoho_integration.erpnext_zoho_integration.api.failures import (
+    flush_failures,
+    record_failure,
+    start_failures,
+)
+from erpnext_zoho_integration.erpnext_zoho_integration.api.payload_parser import first_value, parse_sent_date
+from erpnext_zoho_integration.erpnext_zoho_integration.api.recipient_writer import upsert_recipient_rows
+from erpnext_zoho_integration.erpnext_zoho_integration.api.telemetry import count_db_writes
+
+# Redis list of received events, as JSON, oldest first
+WEBHOOK_QUEUE_KEY = "zoho_webhook_events"
+
+WEBHOOK_SECRET_HEADER = "X-Zoho-Webhook-Secret"
+
+# Events accepted per callback and applied per transaction
+MAX_EVENTS_PER_REQUEST = 1000
+WEBHOOK_BATCH_SIZE = 500
+
+# Seconds a processing run may take before leaving the rest to the next run
+WEBHOOK_RUN_SECONDS = 50
+
+# Zoho event names, lower-cased without separators, to Campaign Recipient action types
+EVENT_ACTIONS = {
+    "open": "Opened",
+    "opened": "Opened",
+    "emailopen": "Opened",
+    "click": "Clicked",
+    "clicked": "Clicked",
+    "linkclick": "Clicked",
+    "hardbounce": "Hard Bounced",
+    "softbounce": "Soft Bounced",
+    "unsubscribe": "Unsubscribed",
+    "unsubscribed": "Unsubscribed",
+    "optout": "Unsubscribed",
+    "spam": "Complaint",
+    "complaint": "Complaint",
+    "abuse": "Complaint",
+}
+
+# Keys Zoho has used for the fields of a webhook event
+EVENT_TYPE_KEYS = ("event", "event_type", "eventtype", "type", "action")
+EVENT_CAMPAIGN_KEY_KEYS = ("campaign_key", "campaignkey")
+EVENT_CAMPAIGN_ID_KEYS = ("campaign_id", "campaignid", "campaignId")
+EVENT_EMAIL_KEYS = ("contact_email", "contactemailaddress", "email", "emailid")
+EVENT_CONTACT_ID_KEYS = ("contact_id", "contactid")
+EVENT_TIME_KEYS = ("event_time", "activity_time", "time", "timestamp")
+EVENT_URL_KEYS = ("url", "clicked_url", "clickedurl", "link")
+
+EVENT_NAME_SEPARATORS = re.compile(r"[^a-z]")
+
+
+@frappe.whitelist(allow_guest=True, methods=["POST"])
+def receive():
+    """Accept a Zoho Campaigns webhook callback and queue its events"""
+    verify_secret()
+
+    events = [event for event in map(normalize_event, get_raw_events()) if event]
+    if events:
+        queue_events(events)
+
+    return {"queued": len(events)}
+
+
+def verify_secret():
+    """Reject the request unless webhooks are enabled and it carries the shared secret"""
+    secret = None
+    if cint(frappe.db.get_single_value("Zoho Settings", "enable_webhooks")):
+        secret = get_decrypted_password("Zoho Settings", "Zoho Settings", "webhook_secret", raise_exception=False)
+
+    supplied = frappe.get_request_header(WEBHOOK_SECRET_HEADER) or frappe.form_dict.get("secret") or ""
+    if not secret or not hmac.compare_digest(secret.encode(), str(supplied).encode()):
+        frappe.throw(_("Invalid webhook secret"), frappe.AuthenticationError)
+
+
+def get_raw_events():
+    """Events of the callback: a JSON list, a JSON object with an events list, or one event"""
+    payload = frappe.request.get_json(silent=True) if frappe.request else None
+    if payload is None:
+        payload = {key: value for key, value in frappe.form_dict.items() if key not in ("cmd", "secret")}
+
+    if isinstance(payload, dict):
+        payload = payload.get("events") if isinstance(payload.get("events"), list) else [payload]
+    if not isinstance(payload, list):
+        return []
+
+    return [event for event in payload[:MAX_EVENTS_PER_REQUEST] if isinstance(event, dict)]
+
+
+def normalize_event(raw):
+    """The fields of a Zoho event the sync applies, None for events it doesn't handle"""
+    event_name = EVENT_NAME_SEPARATORS.sub("", str(first_value(raw, EVENT_TYPE_KEYS) or "").lower())
+    action_type = EVENT_ACTIONS.get(event_name)
+    email = first_value(raw, EVENT_EMAIL_KEYS)
+    campaign_key = first_value(raw, EVENT_CAMPAIGN_KEY_KEYS)
+    campaign_id = first_value(raw, EVENT_CAMPAIGN_ID_KEYS)
+
+    if not action_type or not email or not (campaign_key or campaign_id):
+        return None
+
+    return {
+        "action_type": action_type,
+        "campaign_key": campaign_key,
+        "campaign_id": campaign_id,
+        "email": str(email).strip(),
+        "contact_id": first_value(raw, EVENT_CONTACT_ID_KEYS),
+        "event_time": str(parse_event_time(first_value(raw, EVENT_TIME_KEYS))),
+        "url": first_value(raw, EVENT_URL_KEYS),
+    }
+
+
+def parse_event_time(value):
+    """Event time from a milliseconds timestamp or a Zoho date, the receive time otherwise"""
+    try:
+        if str(value).isdigit():
+            return get_datetime(int(value) / 1000)
+        return parse_sent_date(value)
+    except (TypeError, ValueError, OverflowError, OSError):
+        return now_datetime()
+
+
+def queue_events(events):
+    cache = frappe.cache()
+    pipeline = cache.pipeline()
+    pipeline.rpush(cache.make_key(WEBHOOK_QUEUE_KEY), *(json.dumps(event) for event in events))
+    pipeline.execute()
+
+
+def pop_events(count):
+    """Take up to `count` events off the queue atomically"""
+    cache = frappe.cache()
+    key = cache.make_key(WEBHOOK_QUEUE_KEY)
+    pipeline = cache.pipeline()
+    pipeline.lrange(key, 0, count - 1)
+    pipeline.ltrim(key, count, -1)
+    events, _trimmed = pipeline.execute()
+    return [json.loads(event) for event in events]
+
+
+def process_webhook_events():
+    """
+    Scheduler job applying queued webhook events, one transaction per batch, until the
+    queue is empty or the run's time is up. A batch that fails is dropped; the
+    reconciliation poll brings its rows back. Failures are summarized once per kind and window.
+    """
+    frappe.flags.zoho_contact_resolver = None
+    deadline = time.monotonic() + WEBHOOK_RUN_SECONDS
+    start_failures()
+
+    try:
+        while time.monotonic() < deadline:
+            events = pop_events(WEBHOOK_BATCH_SIZE)
+            if not events:
+                break
+
+            try:
+                campaigns = apply_events(events)
+                frappe.db.commit()
+                invalidate_campaign_dashboard(*campaigns)
+            except Exception:
+                frappe.db.rollback()
+                frappe.flags.zoho_contact_resolver = None
+                record_failure(
+                    "Zoho Webhook Error", endpoint="webhook", message=f"Dropped {len(events)} webhook events"
+                )
+    finally:
+        flush_failures()
+
+
+def apply_events(events):
+    """Write a batch of events to Campaign Recipient, Campaign Click and Contact, returns the campaigns written"""
+    campaigns = get_campaigns(events)
+
+    groups = defaultdict(list)
+    for event in events:
+        campaign = campaigns.get(event.get("campaign_key")) or campaigns.get(event.get("campaign_id"))
+        # Events of campaigns never synced yet arrive with the campaign's first poll
+        if campaign:
+            groups[(campaign, event["action_type"])].append(event)
+
+    for (campaign, action_type), group in groups.items():
+        rejected = write_with_savepoint(partial(write_events, campaign, action_type), group)
+        if rejected:
+            record_failure(
+                f"Zoho Webhook Error: {campaign}",
+                endpoint="webhook",
+                campaign=campaign,
+                message=f"Skipped {len(rejected)} {action_type} webhook events: "
+                f"{', '.join(event['email'] for event, _tb in rejected)}",
+                traceback=rejected[-1][1]
+            )
+
+    return {campaign for campaign, _action_type in groups}
+
+
+def get_campaigns(events):
+    """Campaign names of the events' campaigns, keyed by Zoho campaign key and id"""
+    keys = {event["campaign_key"] for event in events if event.get("campaign_key")}
+    ids = {event["campaign_id"] for event in events if event.get("campaign_id")}
+
+    or_filters = []
+    if keys:
+        or_filters.append(["zoho_campaign_key", "in", list(keys)])
+    if ids:
+        or_filters.append(["zoho_campaign_id", "in", list(ids)])
+
+    campaigns = {}
+    for name, campaign_key, campaign_id in frappe.get_all(
+        "Campaign",
+        or_filters=or_filters,
+        fields=["name", "zoho_campaign_key", "zoho_campaign_id"],
+        as_list=True,
+    ):
+        if campaign_key:
+            campaigns[campaign_key] = name
+        if campaign_id:
+            campaigns[campaign_id] = name
+    return campaigns
+
+
+def write_events(campaign_name, action_type, events):
+    """
+    Upsert the Campaign Recipient rows of one campaign action's events. Rows only carry
+    what an event knows, so the columns filled by the poll keep their values.
+    """
+    recipients = [
+        {"contactemailaddress": event["email"], "contactid": event.get("contact_id")} for event in events
+    ]
+    contacts = get_contact_resolver().resolve(recipients, update_known=False)
+
+    rows = []
+    for event in events:
+        row = {
+            "email": event["email"],
+            "action_type": action_type,
+            "action_date": event["event_time"],
+            "contact": contacts.get(event["email"].lower()),
+        }
+        if event.get("contact_id"):
+            row["zoho_contact_id"] = event["contact_id"]
+        if action_type == "Unsubscribed":
+            row["is_optout"] = 1
+        elif action_type == "Complaint":
+            row["is_spam"] = 1
+        rows.append(row)
+
+    stats = upsert_recipient_rows(campaign_name, action_type, rows, partial=True)
+    count_db_writes("Campaign Recipient", "insert", stats["inserted"])
+    count_db_writes("Campaign Recipient", "update", stats["updated"])
+
+    if action_type == "Clicked":
+        add_click_events(
+            campaign_name, [(event["email"], event.get("url"), event["event_time"]) for event in events]
+        )
+
+    if action_type == "Unsubscribed":
+        unsubscribed = list({name for name in contacts.values() if name})
+        if unsubscribed:
+            frappe.db.set_value("Contact", {"name": ["in", unsubscribed]}, "unsubscribed", 1, update_modified=False)
+            count_db_writes("Contact", "update", len(unsubscribed))
@@ -0,0 +1,119 @@
+"""
+Campaign Performance report: per-campaign analytics queries against the single Campaign Metrics query.
+
+    bench --site <site> execute \
+        erpnext_zoho_integration.erpnext_zoho_integration.benchmarks.campaign_performance.run \
+        --kwargs "{'campaigns': 10000}"
+
+Seeds `campaigns` Zoho campaigns with a full set of analytics rows and their Campaign Metrics
+record, all rolled back at the end.
+"""
+
+import frappe
+from frappe.utils import add_to_date, get_datetime, now_datetime
+
+from erpnext_zoho_integration.erpnext_zoho_integration.api.metrics import CAMPAIGN_METRICS
+from erpnext_zoho_integration.erpnext_zoho_integration.benchmarks.utils import rolled_back, timed
+from erpnext_zoho_integration.erpnext_zoho_integration.report.campaign_performance.campaign_performance import (
+    get_data,
+)
+
+
+def run(campaigns=10000, page_length=500):
+    campaigns = int(campaigns)
+    page_length = int(page_length)
+
+    with rolled_back():
+        seed(campaigns)
+        legacy_rows, per_campaign = timed(get_data_per_campaign)
+        report_rows, report = timed(get_data, {"page_length": len(legacy_rows)})
+        _rows, first_page = timed(get_data, {"page_length": page_length})
+
+    return {
+        "campaigns": len(legacy_rows),
+        "report_rows": len(report_rows),
+        "per_campaign_sec": round(per_campaign, 3),
+        "report_sec": round(report, 3),
+        "first_page_sec": round(first_page, 3),
+        "speedup": round(per_campaign / report, 1),
+    }
+
+
+def seed(count):
+    now = now_datetime()
+    user = frappe.session.user
+    standard_fields = ["name", "owner", "creation", "modified", "modified_by", "docstatus", "idx"]
+    prefix = f"ZBENCH-{frappe.generate_hash(length=6)}"
+
+    campaigns, analytics, metrics = [], [], []
+    for i in range(count):
+        name = f"{prefix}-{i}"
+        campaigns.append(
+            [name, user, now, now, user, 0, 0, name, f"bench-{i}", add_to_date(get_datetime("2025-01-01"), hours=i)]
+        )
+        values = []
+        for idx, (_fieldname, label, fieldtype) in enumerate(CAMPAIGN_METRICS.values(), 1):
+            is_percent = fieldtype == "Percent"
+            value = (i + idx) % 100 if is_percent else (i + idx) * 10
+            values.append(value)
+            analytics.append(
+                [
+                    frappe.generate_hash(length=10),
+                    user,
+                    now,
+                    now,
+                    user,
+                    0,
+                    idx,
+                    name,
+                    "Campaign",
+                    "campaign_analytics",
+                    label,
+                    str(value),
+                    value if is_percent else None,
+                ]
+            )
+        metrics.append([name, user, now, now, user, 0, 0, name, now, *values])
+
+    frappe.db.bulk_insert(
+        "Campaign", [*standard_fields, "campaign_name", "zoho_campaign_id", "zoho_sent_time"], campaigns
+    )
+    frappe.db.bulk_insert(
+        "Campaign Analytics",
+        [*standard_fields, "parent", "parenttype", "parentfield", "metric", "value", "percentage"],
+        analytics,
+    )
+    frappe.db.bulk_insert(
+        "Campaign Metrics",
+        [*standard_fields, "campaign", "last_synced", *(field for field, _label, _type in CAMPAIGN_METRICS.values())],
+        metrics,
+    )
+
+
+def get_data_per_campaign():
+    """The report's previous get_data: one analytics query per campaign, pivoted in Python"""
+    data = []
+    for campaign in frappe.get_all(
+        "Campaign", filters={"zoho_campaign_id": ["is", "set"]}, fields=["name", "zoho_sent_time"]
+    ):
+        row = {"campaign_name": campaign.name, "sent_time": campaign.zoho_sent_time}
+        for metric in frappe.get_all(
+            "Campaign Analytics", filters={"parent": campaign.name}, fields=["metric", "value", "percentage"]
+        ):
+            if "Emails Sent" in metric.metric:
+                row["emails_sent"] = int(metric.value or 0)
+            elif metric.metric == "Opens":
+                row["opens"] = int(metric.value or 0)
+            elif metric.metric == "Open Rate %":
+                row["open_rate"] = float(metric.percentage or 0)
+            elif metric.metric == "Unique Clicks":
+                row["clicks"] = int(metric.value or 0)
+            elif metric.metric == "Click Rate %":
+                row["click_rate"] = float(metric.percentage or 0)
+            elif metric.metric == "Bounces":
+                row["bounces"] = int(metric.value or 0)
+            elif metric.metric == "Unsubscribes":
+                row["unsubscribes"] = int(metric.value or 0)
+        data.append(row)
+
+    return data
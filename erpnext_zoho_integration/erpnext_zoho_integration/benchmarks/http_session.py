@@ -0,0 +1,53 @@
+"""
+Per-call latency of one-off requests.get calls against the shared keep-alive session.
+
+    bench --site <site> execute \
+        erpnext_zoho_integration.erpnext_zoho_integration.benchmarks.http_session.run \
+        --kwargs "{'calls': 500}"
+
+The stub answers over plain HTTP on localhost, so the numbers only show the saved
+TCP connects; against campaigns.zoho.in every fresh connection also pays a TLS handshake.
+"""
+
+from statistics import mean, median
+
+import requests
+
+from erpnext_zoho_integration.erpnext_zoho_integration.api.http_session import DEFAULT_TIMEOUT, make_session
+from erpnext_zoho_integration.erpnext_zoho_integration.benchmarks.utils import JSONHandler, serve, timed
+
+PAYLOAD = {"status": "success", "list_of_details": [{"contactemailaddress": "a@example.com"}] * 20}
+
+
+class StubHandler(JSONHandler):
+    def do_GET(self):
+        self.send_body(200, PAYLOAD)
+
+
+def run(calls=500):
+    calls = int(calls)
+    with serve(StubHandler) as base_url:
+        url = f"{base_url}/recentcampaigns"
+        one_off = time_calls(lambda: requests.get(url, timeout=DEFAULT_TIMEOUT), calls)
+        session = make_session()
+        pooled = time_calls(lambda: session.get(url, timeout=DEFAULT_TIMEOUT), calls)
+
+    return {"calls": calls, "requests_get": summarize(one_off), "session": summarize(pooled)}
+
+
+def time_calls(call, count):
+    timings = []
+    for _ in range(count):
+        response, seconds = timed(call)
+        response.raise_for_status()
+        timings.append(seconds)
+    return timings
+
+
+def summarize(timings):
+    timings = sorted(timings)
+    return {
+        "mean_ms": round(mean(timings) * 1000, 3),
+        "median_ms": round(median(timings) * 1000, 3),
+        "p95_ms": round(timings[int(len(timings) * 0.95) - 1] * 1000, 3),
+    }
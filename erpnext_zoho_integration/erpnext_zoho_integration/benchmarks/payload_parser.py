@@ -0,0 +1,80 @@
+"""
+Parsing cost of Zoho's stringified recipient fields: ast.literal_eval + strptime against payload_parser.
+
+    bench --site <site> execute \
+        erpnext_zoho_integration.erpnext_zoho_integration.benchmarks.payload_parser.run \
+        --kwargs "{'recipients': 20000, 'clicks': 20}"
+
+Pure Python, no database access.
+"""
+
+import ast
+import json
+import tracemalloc
+from datetime import datetime
+
+from erpnext_zoho_integration.erpnext_zoho_integration.api.payload_parser import (
+    SENT_DATE_FORMAT,
+    parse_clicked_urls,
+    parse_sent_date,
+    report_to_json,
+)
+from erpnext_zoho_integration.erpnext_zoho_integration.benchmarks.utils import rate, timed
+
+
+def run(recipients=20000, clicks=20):
+    recipients = int(recipients)
+    payloads = make_payloads(recipients, int(clicks))
+
+    result = {"recipients": recipients, "report_bytes": len(payloads[0]["clickreports"])}
+    for label, parse in (("literal_eval", parse_legacy), ("payload_parser", parse_fast)):
+        parse_sent_date.cache_clear()
+        _result, seconds = timed(parse_all, parse, payloads)
+        result[f"{label}_rows_per_sec"] = rate(recipients, seconds)
+
+        # Separate pass, tracemalloc slows everything down
+        tracemalloc.start()
+        parse(payloads[0])
+        result[f"{label}_peak_kb_per_row"] = round(tracemalloc.get_traced_memory()[1] / 1024, 1)
+        tracemalloc.stop()
+
+    return result
+
+
+def parse_all(parse, payloads):
+    for recipient_data in payloads:
+        parse(recipient_data)
+
+
+def parse_legacy(recipient_data):
+    """What build_recipient_row did per clicked recipient before payload_parser"""
+    datetime.strptime(recipient_data["sentdate"], SENT_DATE_FORMAT)
+    recipient_data["clickedurls"].strip("[]")
+    try:
+        json.dumps(ast.literal_eval(recipient_data["clickreports"]))
+    except Exception:
+        pass
+
+
+def parse_fast(recipient_data):
+    parse_sent_date(recipient_data["sentdate"])
+    ", ".join(parse_clicked_urls(recipient_data["clickedurls"]))
+    report_to_json(recipient_data["clickreports"])
+
+
+def make_payloads(count, clicks):
+    urls = [f"https://example.com/landing/{i}?utm_source=zoho&utm_campaign=bench" for i in range(clicks)]
+    report = repr(
+        [
+            {"url": url, "time": f"05 Dec 2025, 0{i % 9 + 1}:{i % 60:02d} PM", "browser": "Chrome", "count": 1}
+            for i, url in enumerate(urls)
+        ]
+    )
+    return [
+        {
+            "sentdate": f"{i % 28 + 1:02d} Dec 2025, 04:21 PM",
+            "clickedurls": "[" + ", ".join(urls) + "]",
+            "clickreports": report,
+        }
+        for i in range(count)
+    ]
@@ -0,0 +1,124 @@
+"""
+Campaign Recipient key lookups and page upserts with and without the table's indexes.
+
+    bench --site <site> execute \
+        erpnext_zoho_integration.erpnext_zoho_integration.benchmarks.recipient_indexes.run \
+        --kwargs "{'rows': 1000000}"
+
+Runs on two scratch tables shaped like the lookup columns of `tabCampaign Recipient`, one
+bare and one with the unique (campaign, email, action_type) key and the email and
+zoho_contact_id indexes. Both are dropped at the end. MariaDB only.
+"""
+
+import random
+
+import frappe
+
+from erpnext_zoho_integration.erpnext_zoho_integration.benchmarks.utils import rate, timed
+
+BARE_TABLE = "_zoho_bench_recipient_bare"
+INDEXED_TABLE = "_zoho_bench_recipient_indexed"
+ACTIONS = ("Opened", "Clicked", "Hard Bounced", "Soft Bounced", "Unsubscribed", "Complaint")
+RECIPIENTS_PER_CAMPAIGN = 2000
+SEED_CHUNK_SIZE = 10000
+
+
+def run(rows=1000000, lookups=200, page_size=200):
+    rows = int(rows)
+    lookups = int(lookups)
+    page_size = int(page_size)
+
+    try:
+        create_tables(rows)
+        keys = [make_key(random.randrange(rows)) for _ in range(lookups)]
+
+        result = {"rows": rows}
+        for label, table in (("bare", BARE_TABLE), ("indexed", INDEXED_TABLE)):
+            result[f"{label}_key_lookup_ms"] = time_lookups(
+                table, "campaign = %s and email = %s and action_type = %s", [key[:3] for key in keys]
+            )
+            result[f"{label}_email_lookup_ms"] = time_lookups(table, "email = %s", [key[1:2] for key in keys])
+            result[f"{label}_contact_id_lookup_ms"] = time_lookups(
+                table, "zoho_contact_id = %s", [key[3:] for key in keys]
+            )
+
+        result["indexed_upsert_rows_per_sec"] = time_upsert(rows, page_size)
+    finally:
+        frappe.db.sql_ddl(f"drop table if exists `{BARE_TABLE}`")
+        frappe.db.sql_ddl(f"drop table if exists `{INDEXED_TABLE}`")
+
+    return result
+
+
+def make_key(i):
+    """(campaign, email, action_type, zoho_contact_id) of the i-th seeded row"""
+    recipient = i // len(ACTIONS)
+    return (
+        f"bench-campaign-{recipient // RECIPIENTS_PER_CAMPAIGN}",
+        f"bench-{recipient}@example.com",
+        ACTIONS[i % len(ACTIONS)],
+        f"bench-{recipient}",
+    )
+
+
+def create_tables(rows):
+    for table in (BARE_TABLE, INDEXED_TABLE):
+        frappe.db.sql_ddl(f"drop table if exists `{table}`")
+
+    frappe.db.sql_ddl(
+        f"""create table `{BARE_TABLE}` (
+            name varchar(140) not null primary key,
+            campaign varchar(140),
+            email varchar(140),
+            action_type varchar(140),
+            zoho_contact_id varchar(140),
+            payload_hash varchar(140)
+        ) engine=InnoDB"""
+    )
+
+    for chunk_start in range(0, rows, SEED_CHUNK_SIZE):
+        chunk = range(chunk_start, min(chunk_start + SEED_CHUNK_SIZE, rows))
+        values = []
+        for i in chunk:
+            values.extend([f"bench-row-{i}", *make_key(i), frappe.generate_hash(length=10)])
+        frappe.db.sql(
+            f"insert into `{BARE_TABLE}` values {', '.join(['(%s, %s, %s, %s, %s, %s)'] * len(chunk))}",
+            values,
+        )
+    frappe.db.commit()
+
+    frappe.db.sql_ddl(f"create table `{INDEXED_TABLE}` like `{BARE_TABLE}`")
+    frappe.db.sql(f"insert into `{INDEXED_TABLE}` select * from `{BARE_TABLE}`")
+    frappe.db.commit()
+    frappe.db.sql_ddl(
+        f"""alter table `{INDEXED_TABLE}`
+            add unique index unique_campaign_email_action (campaign, email, action_type),
+            add index email (email),
+            add index zoho_contact_id (zoho_contact_id)"""
+    )
+
+
+def time_lookups(table, condition, params):
+    query = f"select name from `{table}` where {condition}"
+    _result, seconds = timed(lambda: [frappe.db.sql(query, values) for values in params])
+    return round(seconds / len(params) * 1000, 3)
+
+
+def time_upsert(rows, page_size):
+    """One page of recipients, half already stored, written with ON DUPLICATE KEY UPDATE"""
+    existing = [make_key(i) for i in random.sample(range(rows), page_size // 2)]
+    new = [(*make_key(i)[:3], f"bench-new-{i}") for i in range(rows, rows + page_size - len(existing))]
+
+    values = []
+    for offset, key in enumerate(existing + new):
+        values.extend([f"bench-upsert-{offset}", *key, frappe.generate_hash(length=10)])
+
+    _result, elapsed = timed(
+        frappe.db.sql,
+        f"""insert into `{INDEXED_TABLE}` values {', '.join(['(%s, %s, %s, %s, %s, %s)'] * page_size)}
+        on duplicate key update payload_hash = values(payload_hash)""",
+        values,
+    )
+    frappe.db.rollback()
+
+    return rate(page_size, elapsed)
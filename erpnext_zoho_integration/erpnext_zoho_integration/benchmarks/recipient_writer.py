@@ -0,0 +1,144 @@
+"""
+Rows-per-second of the per-row Campaign Recipient sync against the bulk upsert path.
+
+    bench --site <site> execute \
+        erpnext_zoho_integration.erpnext_zoho_integration.benchmarks.recipient_writer.run \
+        --kwargs "{'rows': 2000}"
+
+Everything written is rolled back at the end.
+"""
+
+import frappe
+from frappe.utils import now_datetime
+
+from erpnext_zoho_integration.erpnext_zoho_integration.api.click_events import write_click_events
+from erpnext_zoho_integration.erpnext_zoho_integration.api.contact_resolver import contact_payload_hash
+from erpnext_zoho_integration.erpnext_zoho_integration.api.pipeline import build_recipient_row, normalize_page
+from erpnext_zoho_integration.erpnext_zoho_integration.api.sync import write_recipient_records
+from erpnext_zoho_integration.erpnext_zoho_integration.api.utils import payload_hash
+from erpnext_zoho_integration.erpnext_zoho_integration.benchmarks.utils import rate, rolled_back, timed
+
+
+def run(rows=2000, page_size=200):
+    rows = int(rows)
+    page_size = int(page_size)
+    campaign = make_campaign()
+    recipients = make_recipients(rows)
+
+    with rolled_back():
+        # Create the contacts up front so both paths only pay for the recipient writes
+        for recipient_data in recipients:
+            find_or_create_contact(recipient_data)
+
+        _result, per_row = timed(sync_rows, campaign, recipients, "Opened")
+        _result, bulk_insert = timed(sync_pages, campaign, recipients, "Clicked", page_size)
+        _result, bulk_update = timed(sync_pages, campaign, recipients, "Clicked", page_size)
+
+    return {
+        "rows": rows,
+        "per_row_rows_per_sec": rate(rows, per_row),
+        "bulk_insert_rows_per_sec": rate(rows, bulk_insert),
+        "bulk_update_rows_per_sec": rate(rows, bulk_update),
+    }
+
+
+def sync_rows(campaign, recipients, action_type):
+    for recipient_data in recipients:
+        sync_recipient(campaign, recipient_data, action_type)
+
+
+def sync_pages(campaign, recipients, action_type, page_size):
+    for i in range(0, len(recipients), page_size):
+        sync_page(campaign, recipients[i : i + page_size], action_type)
+
+
+def sync_page(campaign, recipients, action_type):
+    """Bulk path: normalize a page and write it the way the sync's writer stage does"""
+    records, skipped, warnings = normalize_page(recipients, action_type)
+    return write_recipient_records(campaign, records, action_type)
+
+
+def sync_recipient(campaign, recipient_data, action_type):
+    """Per-row baseline: one Contact lookup and one Campaign Recipient document save per recipient"""
+    row = build_recipient_row(recipient_data, action_type)
+    if not row:
+        return
+
+    contact = find_or_create_contact(recipient_data)
+    row["contact"] = contact.name if contact else None
+    row["payload_hash"] = payload_hash(row)
+
+    existing = frappe.db.exists(
+        "Campaign Recipient",
+        {"campaign": campaign.name, "email": row["email"], "action_type": action_type},
+    )
+    if existing:
+        recipient = frappe.get_doc("Campaign Recipient", existing)
+        if recipient.payload_hash == row["payload_hash"]:
+            return
+    else:
+        recipient = frappe.new_doc("Campaign Recipient")
+        recipient.campaign = campaign.name
+
+    recipient.update(row)
+    recipient.save(ignore_permissions=True)
+
+    if action_type == "Clicked":
+        write_click_events(campaign.name, [row])
+
+
+def find_or_create_contact(contact_data):
+    email = contact_data.get("contactemailaddress")
+    if not email:
+        return None
+
+    existing = None
+    if contact_data.get("contactid"):
+        existing = frappe.db.get_value("Contact", {"zoho_contact_id": contact_data["contactid"]}, "name")
+    existing = existing or frappe.db.get_value("Contact Email", {"email_id": email}, "parent")
+
+    if existing:
+        contact = frappe.get_doc("Contact", existing)
+    else:
+        contact = frappe.new_doc("Contact")
+        contact.first_name = contact_data.get("contactfn") or "Unknown"
+        contact.last_name = contact_data.get("contactln") or ""
+        contact.append("email_ids", {"email_id": email, "is_primary": 1})
+
+    contact_hash = contact_payload_hash(contact_data)
+    if contact.is_new() or contact.zoho_payload_hash != contact_hash:
+        contact.zoho_payload_hash = contact_hash
+        contact.zoho_contact_id = contact_data.get("contactid")
+        contact.zoho_status = contact_data.get("contactstatus")
+        contact.zoho_last_synced = now_datetime()
+        contact.save(ignore_permissions=True)
+
+    return contact
+
+
+def make_campaign():
+    campaign = frappe.new_doc("Campaign")
+    campaign.campaign_name = f"Zoho Benchmark {frappe.generate_hash(length=6)}"
+    campaign.naming_series = "SAL-CAM-.YYYY.-"
+    campaign.insert(ignore_permissions=True)
+    return campaign
+
+
+def make_recipients(count):
+    return [
+        {
+            "contactemailaddress": f"bench-{i}@example.com",
+            "contactid": f"bench-{i}",
+            "contactfn": "Bench",
+            "contactln": str(i),
+            "sentdate": "05 Dec 2025, 04:21 PM",
+            "clickcount": "2",
+            "clickedurls": "[https://example.com/a, https://example.com/b]",
+            "clickreports": "[{'url': 'https://example.com/a', 'time': '05 Dec 2025, 04:30 PM'}]",
+            "country": "India",
+            "city": "Mumbai",
+            "state": "Maharashtra",
+            "contactstatus": "active",
+        }
+        for i in range(count)
+    ]
@@ -0,0 +1,78 @@
+"""
+End-to-end sync against a local Zoho stub: campaigns/min, recipient rows/sec, API calls
+and database queries, for a cold sync_all_campaigns run (everything inserted) and warm
+sync_due_campaigns ticks (unchanged payloads, every campaign made due again).
+
+    bench --site <site> execute \
+        erpnext_zoho_integration.erpnext_zoho_integration.benchmarks.sync.run \
+        --kwargs "{'campaigns': 20, 'recipients': 1000, 'page_size': 200, 'latency': 0.05}"
+
+Campaign jobs run inline in this process and everything synced from the stub is
+deleted afterwards. Use a test site: the settings are changed for the duration.
+"""
+
+import functools
+
+import frappe
+
+from erpnext_zoho_integration.erpnext_zoho_integration.api.sync import sync_all_campaigns, sync_due_campaigns
+from erpnext_zoho_integration.erpnext_zoho_integration.benchmarks.utils import rate, timed
+from erpnext_zoho_integration.erpnext_zoho_integration.benchmarks.zoho_stub import (
+    ZohoStub,
+    make_stub_campaigns_due,
+    use_stub,
+)
+
+
+def run(campaigns=20, recipients=500, page_size=200, latency=0.0, error_rate=0.0, runs=2):
+    result = {
+        "campaigns": int(campaigns),
+        "recipients": int(recipients),
+        "page_size": int(page_size),
+        "latency": float(latency),
+        "error_rate": float(error_rate),
+    }
+
+    with ZohoStub(campaigns, recipients, page_size, latency, error_rate) as stub, use_stub(stub):
+        result["rows_per_run"] = stub.expected_rows()
+        result["cold"] = measure(stub, sync_all_campaigns)
+        for i in range(1, int(runs)):
+            # The first run put every campaign on the adaptive schedule; make them due again
+            # so the tick walks the same campaigns
+            make_stub_campaigns_due()
+            result[f"warm_{i}"] = measure(stub, sync_due_campaigns)
+
+    return result
+
+
+def measure(stub, sync):
+    requests_before = sum(stub.requests.values())
+    rows_before = stub.rows_served
+    queries = count_queries()
+
+    try:
+        _result, elapsed = timed(sync)
+    finally:
+        del frappe.db.sql
+
+    return {
+        "seconds": round(elapsed, 2),
+        "campaigns_per_min": round(stub.campaigns * 60 / elapsed, 1),
+        "rows_per_sec": rate(stub.rows_served - rows_before, elapsed),
+        "api_calls": sum(stub.requests.values()) - requests_before,
+        "db_queries": queries["count"],
+    }
+
+
+def count_queries():
+    """Count every frappe.db.sql call until the instance attribute is deleted again"""
+    queries = {"count": 0}
+    sql = frappe.db.sql
+
+    @functools.wraps(sql)
+    def counting_sql(*args, **kwargs):
+        queries["count"] += 1
+        return sql(*args, **kwargs)
+
+    frappe.db.sql = counting_sql
+    return queries
@@ -0,0 +1,75 @@
+"""Timing, rollback and local HTTP server helpers shared by the benchmarks"""
+
+import json
+import threading
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from time import perf_counter
+
+import frappe
+
+
+def timed(call, *args, **kwargs):
+    """Result of a call and the seconds it took"""
+    start = perf_counter()
+    result = call(*args, **kwargs)
+    return result, perf_counter() - start
+
+
+def rate(count, seconds):
+    """Items per second, rounded for the result dict"""
+    return round(count / seconds, 1)
+
+
+@contextmanager
+def rolled_back():
+    """Roll back everything the block wrote, also when it fails"""
+    try:
+        yield
+    finally:
+        frappe.db.rollback()
+
+
+class JSONHandler(BaseHTTPRequestHandler):
+    """Keep-alive request handler answering with JSON bodies and no access log"""
+
+    protocol_version = "HTTP/1.1"
+
+    def send_body(self, status, payload, headers=None):
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_server(handler):
+    """Serve a handler class on a free localhost port from a daemon thread"""
+    server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def stop_server(server):
+    server.shutdown()
+    server.server_close()
+
+
+def server_url(server):
+    return f"http://127.0.0.1:{server.server_address[1]}"
+
+
+@contextmanager
+def serve(handler):
+    """Serve a handler class for the duration of a block, yields the server's URL"""
+    server = start_server(handler)
+    try:
+        yield server_url(server)
+    finally:
+        stop_server(server)
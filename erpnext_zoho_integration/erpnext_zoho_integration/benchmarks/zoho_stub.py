@@ -0,0 +1,306 @@
+"""
+Local stand-in for the Zoho Campaigns API endpoints the sync uses.
+
+Serves recentcampaigns, campaignreports and getcampaignrecipientsdata from synthetic,
+deterministic data, with optional latency and a share of failed (503) responses.
+use_stub() points the current site at a running stub for the duration of a block.
+"""
+
+import random
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from datetime import timedelta
+from urllib.parse import parse_qs, urlparse
+
+import frappe
+from frappe.utils import now_datetime
+
+from erpnext_zoho_integration.erpnext_zoho_integration.api.token_cache import (
+    clear_cached_token,
+    set_cached_token,
+)
+from erpnext_zoho_integration.erpnext_zoho_integration.benchmarks.utils import (
+    JSONHandler,
+    server_url,
+    start_server,
+    stop_server,
+)
+
+STUB_PREFIX = "stub-"
+
+# Share of a campaign's recipients listed under each recipient action
+ACTION_SHARES = {
+    "openedcontacts": 0.4,
+    "clickedcontacts": 0.1,
+    "senthardbounce": 0.02,
+    "sentsoftbounce": 0.03,
+    "optoutcontacts": 0.01,
+    "spamcontacts": 0.005,
+}
+
+STUB_LINKS = [f"https://example.com/offer/{i}?utm_source=zoho" for i in range(5)]
+
+
+class ZohoStub:
+    """
+    Synthetic Zoho Campaigns account served over HTTP on localhost.
+
+    campaigns: number of sent campaigns listed by recentcampaigns
+    recipients: recipients per campaign, split over the actions as in ACTION_SHARES
+    page_size: largest recipient page served, whatever range is asked for
+    latency: seconds added to every response
+    error_rate: share of requests answered with 503
+    """
+
+    def __init__(self, campaigns=20, recipients=500, page_size=200, latency=0.0, error_rate=0.0, seed=0):
+        self.campaigns = int(campaigns)
+        self.recipients = int(recipients)
+        self.page_size = int(page_size)
+        self.latency = float(latency)
+        self.error_rate = float(error_rate)
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+        self.requests = Counter()
+        self.rows_served = 0
+        self.errors_served = 0
+        self.sent_time = now_datetime() - timedelta(hours=1)
+        self.server = None
+
+    @property
+    def url(self):
+        return server_url(self.server)
+
+    def start(self):
+        stub = self
+
+        class Handler(StubHandler):
+            pass
+
+        Handler.stub = stub
+        self.server = start_server(Handler)
+        return self
+
+    def stop(self):
+        if self.server:
+            stop_server(self.server)
+            self.server = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def expected_rows(self):
+        """Recipient rows a complete sync of the account writes"""
+        return self.campaigns * sum(self.action_count(action) for action in ACTION_SHARES)
+
+    def action_count(self, action):
+        return int(self.recipients * ACTION_SHARES.get(action, 0))
+
+    def should_fail(self):
+        with self.lock:
+            failed = self.error_rate and self.random.random() < self.error_rate
+            if failed:
+                self.errors_served += 1
+            return failed
+
+    def respond(self, endpoint, params):
+        with self.lock:
+            self.requests[endpoint] += 1
+
+        if endpoint == "recentcampaigns":
+            return self.recent_campaigns(params)
+        if endpoint == "campaignreports":
+            return self.campaign_report(params)
+        if endpoint == "getcampaignrecipientsdata":
+            return self.recipients_page(params)
+        return None
+
+    def recent_campaigns(self, params):
+        fromindex = int(params.get("fromindex") or 1)
+        count = int(params.get("range") or 20)
+        indexes = range(fromindex - 1, min(fromindex - 1 + count, self.campaigns))
+        return {
+            "status": "success",
+            "recent_campaigns": [self.campaign(i) for i in indexes],
+            "total_record_count": str(self.campaigns),
+        }
+
+    def campaign(self, i):
+        return {
+            "campaignId": f"{STUB_PREFIX}{i}",
+            "campaign_key": f"{STUB_PREFIX}key-{i}",
+            "campaign_name": f"Stub Campaign {i}",
+            "campaign_status": "Sent",
+            "campaigntype": "normal",
+            "subject": f"Stub subject {i}",
+            "from_email": "news@example.com",
+            "reply_to": "news@example.com",
+            "campaign_preview": f"example.com/preview/{i}",
+            "sent_time": str(int(self.sent_time.timestamp() * 1000)),
+        }
+
+    def campaign_report(self, params):
+        sent = self.recipients
+        opens = self.action_count("openedcontacts")
+        clicks = self.action_count("clickedcontacts")
+        bounces = self.action_count("senthardbounce") + self.action_count("sentsoftbounce")
+        return {
+            "status": "success",
+            "campaign-details": [{"campaign_key": params.get("campaignkey")}],
+            "campaign-reports": [
+                {
+                    "emails_sent_count": sent,
+                    "delivered_count": sent - bounces,
+                    "delivered_percent": round((sent - bounces) * 100 / sent, 2) if sent else 0,
+                    "opens_count": opens,
+                    "open_percent": round(opens * 100 / sent, 2) if sent else 0,
+                    "unique_clicks_count": clicks,
+                    "unique_clicked_percent": round(clicks * 100 / sent, 2) if sent else 0,
+                    "bounces_count": bounces,
+                    "hardbounce_count": self.action_count("senthardbounce"),
+                    "softbounce_count": self.action_count("sentsoftbounce"),
+                    "unsub_count": self.action_count("optoutcontacts"),
+                    "complaints_count": self.action_count("spamcontacts"),
+                }
+            ],
+            "campaign-reach": [{}],
+            "campaign-by-loaction": {},
+        }
+
+    def recipients_page(self, params):
+        action = params.get("action")
+        fromindex = int(params.get("fromindex") or 1)
+        count = min(int(params.get("range") or 20), self.page_size)
+        indexes = range(fromindex - 1, min(fromindex - 1 + count, self.action_count(action)))
+        if not indexes:
+            return {"status": "error", "message": "No contacts found for this action"}
+
+        with self.lock:
+            self.rows_served += len(indexes)
+        return {"status": "success", "list_of_details": [self.recipient(j, action) for j in indexes]}
+
+    def recipient(self, j, action):
+        recipient = {
+            "contactemailaddress": f"{STUB_PREFIX}{j}@example.com",
+            "contactid": f"{STUB_PREFIX}{j}",
+            "contactfn": "Stub",
+            "contactln": str(j),
+            "contactstatus": "active",
+            "companyname": f"Stub Company {j % 50}",
+            "sentdate": self.sent_time.strftime("%d %b %Y, %I:%M %p"),
+            "country": "India",
+            "city": "Mumbai",
+            "state": "Maharashtra",
+        }
+        if action == "openedcontacts":
+            recipient["openreports"] = repr([{"time": recipient["sentdate"], "browser": "Chrome"}])
+        elif action == "clickedcontacts":
+            links = STUB_LINKS[: j % len(STUB_LINKS) + 1]
+            recipient["clickcount"] = str(len(links))
+            recipient["clickedurls"] = "[" + ", ".join(links) + "]"
+            recipient["clickreports"] = repr([{"url": url, "time": recipient["sentdate"]} for url in links])
+        return recipient
+
+
+class StubHandler(JSONHandler):
+    stub = None
+
+    def do_GET(self):
+        self.handle_request()
+
+    def do_POST(self):
+        if int(self.headers.get("Content-Length") or 0):
+            self.rfile.read(int(self.headers["Content-Length"]))
+        self.handle_request()
+
+    def handle_request(self):
+        if self.stub.latency:
+            time.sleep(self.stub.latency)
+
+        url = urlparse(self.path)
+        endpoint = url.path.rstrip("/").rsplit("/", 1)[-1]
+        params = {key: values[-1] for key, values in parse_qs(url.query).items()}
+
+        if self.stub.should_fail():
+            self.send_body(503, {"status": "error", "message": "Stub failure"}, {"Retry-After": "0"})
+            return
+
+        result = self.stub.respond(endpoint, params)
+        if result is None:
+            self.send_body(404, {"status": "error", "message": f"Unknown endpoint {endpoint}"})
+        else:
+            self.send_body(200, result)
+
+
+@contextmanager
+def use_stub(stub):
+    """
+    Point the site's sync at a running stub: API URL, a cached access token, the stub's
+    page size, no rate limit or circuit breaker and campaign jobs, from the coordinator or
+    the tick, run inline. Everything the sync wrote for the stub account is deleted afterwards.
+    """
+    settings = frappe.get_single("Zoho Settings")
+    previous = {
+        "recipient_page_size": settings.recipient_page_size,
+        "requests_per_minute": settings.requests_per_minute,
+        "circuit_failure_threshold": settings.circuit_failure_threshold,
+    }
+
+    frappe.local.conf["zoho_campaigns_api_url"] = stub.url
+    frappe.db.set_single_value(
+        "Zoho Settings",
+        {"recipient_page_size": stub.page_size, "requests_per_minute": 0, "circuit_failure_threshold": 0},
+    )
+    set_cached_token("stub-token", now_datetime() + timedelta(days=1))
+    frappe.flags.zoho_sync_now = True
+    frappe.db.commit()
+
+    try:
+        yield stub
+    finally:
+        frappe.flags.zoho_sync_now = False
+        frappe.local.conf.pop("zoho_campaigns_api_url", None)
+        clear_cached_token()
+        frappe.db.rollback()
+        delete_stub_data()
+        frappe.db.set_single_value("Zoho Settings", previous)
+        frappe.db.commit()
+
+
+def make_stub_campaigns_due():
+    """Move the next sync time of the stub's scheduled campaigns to now, so the next sync_due_campaigns syncs them"""
+    frappe.db.set_value(
+        "Campaign",
+        {"zoho_campaign_id": ["like", f"{STUB_PREFIX}%"], "zoho_next_sync_at": ["is", "set"]},
+        "zoho_next_sync_at",
+        now_datetime(),
+        update_modified=False,
+    )
+    frappe.db.commit()
+
+
+def delete_stub_data():
+    """Remove the campaigns, recipients and contacts synced from a stub account"""
+    campaigns = frappe.get_all("Campaign", filters={"zoho_campaign_id": ["like", f"{STUB_PREFIX}%"]}, pluck="name")
+    if campaigns:
+        for doctype in (
+            "Campaign Recipient",
+            "Campaign Click",
+            "Campaign Link Stats",
+            "Campaign Metrics",
+            "Campaign Metrics Snapshot",
+            "Zoho Sync Run",
+        ):
+            frappe.db.delete(doctype, {"campaign": ["in", campaigns]})
+        frappe.db.delete("Campaign Analytics", {"parent": ["in", campaigns], "parenttype": "Campaign"})
+        frappe.db.delete("Campaign", {"name": ["in", campaigns]})
+
+    contacts = frappe.get_all("Contact", filters={"zoho_contact_id": ["like", f"{STUB_PREFIX}%"]}, pluck="name")
+    if contacts:
+        for doctype in ("Contact Email", "Contact Phone"):
+            frappe.db.delete(doctype, {"parent": ["in", contacts], "parenttype": "Contact"})
+        frappe.db.delete("Contact", {"name": ["in", contacts]})
@@ -0,0 +1,13 @@
+# Copyright (c) 2026, Yanky and contributors
+# For license information, please see license.txt
+
+import frappe
+from frappe.model.document import Document
+
+
+class CampaignClick(Document):
+	pass
+
+
+def on_doctype_update():
+	frappe.db.add_index("Campaign Click", ["campaign", "url_hash"])
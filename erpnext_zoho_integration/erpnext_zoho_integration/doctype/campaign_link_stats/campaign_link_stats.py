@@ -0,0 +1,14 @@
+# Copyright (c) 2026, Yanky and contributors
+# For license information, please see license.txt
+
+import frappe
+from frappe.model.document import Document
+
+
+class CampaignLinkStats(Document):
+	pass
+
+
+def on_doctype_update():
+	# One row per link of a campaign, refreshed by api.click_events.refresh_link_stats
+	frappe.db.add_unique("Campaign Link Stats", ["campaign", "url_hash"], constraint_name="unique_campaign_url")
@@ -4,6 +4,7 @@
 import frappe
 from frappe.model.document import Document
 
+
 class CampaignRecipient(Document):
     def before_save(self):
         # Auto-link to Contact if not already linked
@@ -14,4 +15,13 @@ class CampaignRecipient(Document):
                 "parent"
             )
             if contact:
-                self.contact = contact
\ No newline at end of file
+                self.contact = contact
+
+
+def on_doctype_update():
+    # One row per recipient action of a campaign, the key the sync upserts on
+    frappe.db.add_unique(
+        "Campaign Recipient",
+        ["campaign", "email", "action_type"],
+        constraint_name="unique_campaign_email_action",
+    )
@@ -1,9 +1,37 @@
 # Copyright (c) 2025, Yanky and Contributors
 # See license.txt
 
-# import frappe
+import frappe
 from frappe.tests.utils import FrappeTestCase
 
+from erpnext_zoho_integration.erpnext_zoho_integration.api.sync import sync_all_campaigns, sync_due_campaigns
+from erpnext_zoho_integration.erpnext_zoho_integration.benchmarks.zoho_stub import (
+	STUB_PREFIX,
+	ZohoStub,
+	make_stub_campaigns_due,
+	use_stub,
+)
+
 
 class TestCampaignRecipient(FrappeTestCase):
-	pass
+	def test_sync_from_stub(self):
+		with ZohoStub(campaigns=2, recipients=100, page_size=7) as stub, use_stub(stub):
+			sync_all_campaigns()
+			self.assertEqual(count_stub_recipients(), stub.expected_rows())
+
+			# Scheduled campaigns are left to sync_due_campaigns
+			result = sync_all_campaigns()
+			self.assertEqual(result["queued_count"], 0)
+			self.assertEqual(result["skipped_count"], stub.campaigns)
+
+			# The tick syncs them once due; unchanged payloads are not inserted again
+			make_stub_campaigns_due()
+			recipient_requests = stub.requests["getcampaignrecipientsdata"]
+			sync_due_campaigns()
+			self.assertGreater(stub.requests["getcampaignrecipientsdata"], recipient_requests)
+			self.assertEqual(count_stub_recipients(), stub.expected_rows())
+
+
+def count_stub_recipients():
+	campaigns = frappe.get_all("Campaign", filters={"zoho_campaign_id": ["like", f"{STUB_PREFIX}%"]}, pluck="name")
+	return frappe.db.count("Campaign Recipient", {"campaign": ["in", campaigns]})
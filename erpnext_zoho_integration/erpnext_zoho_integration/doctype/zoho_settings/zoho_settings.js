@@ -28,6 +28,8 @@ frappe.ui.form.on('Zoho Settings', {
 
         // Test Connection button
         if (frm.doc.is_active) {
+            show_circuit_states(frm);
+
             frm.add_custom_button(__('Test Connection'), function() {
                 frappe.call({
                     method: 'erpnext_zoho_integration.erpnext_zoho_integration.api.campaigns.get_recent_campaigns',
@@ -77,23 +79,14 @@ frappe.ui.form.on('Zoho Settings', {
                     frappe.call({
                         method: 'erpnext_zoho_integration.erpnext_zoho_integration.api.sync.sync_all_campaigns',
                         freeze: true,
-                        freeze_message: __('Syncing campaigns from Zoho...'),
+                        freeze_message: __('Queueing campaign syncs...'),
                         callback: function(r) {
                             if (r.message) {
-                                let msg = __('Synced {0} out of {1} campaigns successfully', 
-                                    [r.message.synced_count, r.message.total_campaigns]);
-                                
-                                if (r.message.errors && r.message.errors.length > 0) {
-                                    msg += '<br><br><b>Errors:</b><br>';
-                                    r.message.errors.forEach(err => {
-                                        msg += `${err.campaign}: ${err.error}<br>`;
-                                    });
-                                }
-                                
                                 frappe.msgprint({
-                                    title: __('Sync Complete'),
-                                    message: msg,
-                                    indicator: r.message.errors.length > 0 ? 'orange' : 'green'
+                                    title: __('Sync Queued'),
+                                    message: __('Queued {0} campaigns for sync, {1} settled campaigns skipped. Total campaigns in Zoho: {2}',
+                                        [r.message.queued_count, r.message.skipped_count, r.message.total_campaigns]),
+                                    indicator: 'blue'
                                 });
                             }
                         }
@@ -104,6 +97,31 @@ frappe.ui.form.on('Zoho Settings', {
     }
 });
 
+function show_circuit_states(frm) {
+    const labels = { closed: __('Closed'), open: __('Open'), half_open: __('Half-open') };
+    const colors = { closed: 'green', open: 'red', half_open: 'orange' };
+
+    frappe.call({
+        method: 'erpnext_zoho_integration.erpnext_zoho_integration.api.circuit_breaker.get_circuit_states',
+        callback: function(r) {
+            (r.message || []).forEach(circuit => {
+                frm.dashboard.add_indicator(
+                    __('{0}: {1}', [circuit.host, labels[circuit.state]]),
+                    colors[circuit.state]
+                );
+
+                if (circuit.state !== 'closed') {
+                    frm.dashboard.set_headline_alert(
+                        __('Calls to {0} are suspended after {1} consecutive failures since {2}. A probe request is let through once the circuit is half-open.',
+                            [circuit.host, circuit.failures, moment.unix(circuit.opened_on).fromNow()]),
+                        colors[circuit.state]
+                    );
+                }
+            });
+        }
+    });
+}
+
 function show_campaigns_dialog(campaigns) {
     let d = new frappe.ui.Dialog({
         title: __('Recent Campaigns'),
@@ -4,6 +4,10 @@
 # import frappe
 from frappe.model.document import Document
 
+from erpnext_zoho_integration.erpnext_zoho_integration.api.token_cache import clear_cached_token
+
 
 class ZohoSettings(Document):
-	pass
+	def on_update(self):
+		# Workers pick the token up from Settings again on their next call
+		clear_cached_token()
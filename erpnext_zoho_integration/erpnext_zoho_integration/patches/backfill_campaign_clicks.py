@@ -0,0 +1,20 @@
+import frappe
+
+from erpnext_zoho_integration.erpnext_zoho_integration.api.click_events import write_click_events
+
+BATCH_SIZE = 500
+
+
+def execute():
+    """Explode the click reports of already synced recipients into Campaign Click rows"""
+    for campaign_name in frappe.get_all(
+        "Campaign Recipient", filters={"action_type": "Clicked"}, pluck="campaign", distinct=True
+    ):
+        rows = frappe.get_all(
+            "Campaign Recipient",
+            filters={"campaign": campaign_name, "action_type": "Clicked"},
+            fields=["email", "click_reports", "clicked_links", "action_date"],
+        )
+        for start in range(0, len(rows), BATCH_SIZE):
+            write_click_events(campaign_name, rows[start : start + BATCH_SIZE])
+        frappe.db.commit()
@@ -0,0 +1,42 @@
+import frappe
+from frappe.utils import cint, flt
+
+from erpnext_zoho_integration.erpnext_zoho_integration.api.metrics import CAMPAIGN_METRICS
+
+
+def execute():
+    """Create Campaign Metrics records from the analytics tables of already synced campaigns"""
+    fields_by_label = {label: (fieldname, fieldtype) for fieldname, label, fieldtype in CAMPAIGN_METRICS.values()}
+    existing = set(frappe.get_all("Campaign Metrics", pluck="name"))
+
+    values_by_campaign = {}
+    for row in frappe.get_all(
+        "Campaign Analytics",
+        filters={"parenttype": "Campaign", "parentfield": "campaign_analytics"},
+        fields=["parent", "metric", "value", "percentage"],
+    ):
+        if row.parent in existing or row.metric not in fields_by_label:
+            continue
+
+        fieldname, fieldtype = fields_by_label[row.metric]
+        value = flt(row.percentage if row.percentage is not None else row.value)
+        values_by_campaign.setdefault(row.parent, {})[fieldname] = value if fieldtype == "Percent" else cint(value)
+
+    if not values_by_campaign:
+        return
+
+    last_synced = dict(
+        frappe.get_all(
+            "Campaign",
+            filters={"name": ["in", list(values_by_campaign)]},
+            fields=["name", "last_synced"],
+            as_list=True,
+        )
+    )
+
+    for campaign_name, values in values_by_campaign.items():
+        metrics = frappe.new_doc("Campaign Metrics")
+        metrics.campaign = campaign_name
+        metrics.last_synced = last_synced.get(campaign_name)
+        metrics.update(values)
+        metrics.insert(ignore_permissions=True)
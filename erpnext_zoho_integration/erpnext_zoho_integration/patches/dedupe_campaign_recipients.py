@@ -0,0 +1,32 @@
+import frappe
+
+
+def execute():
+    """
+    Drop duplicate (campaign, email, action_type) rows of Campaign Recipient, keeping the
+    most recently modified one, so the unique key can be added when the doctype is synced.
+    Also indexes Contact Email.email_id, which recipients are linked to Contacts by.
+    """
+    if not frappe.db.table_exists("Campaign Recipient"):
+        return
+
+    duplicates = frappe.db.sql(
+        """
+        select campaign, email, action_type
+        from `tabCampaign Recipient`
+        group by campaign, email, action_type
+        having count(*) > 1
+        """,
+        as_dict=True,
+    )
+
+    for key in duplicates:
+        names = frappe.get_all(
+            "Campaign Recipient",
+            filters={"campaign": key.campaign, "email": key.email, "action_type": key.action_type},
+            order_by="modified desc",
+            pluck="name",
+        )
+        frappe.db.delete("Campaign Recipient", {"name": ["in", names[1:]]})
+
+    frappe.db.add_index("Contact Email", ["email_id"])
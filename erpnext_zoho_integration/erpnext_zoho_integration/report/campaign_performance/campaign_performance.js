@@ -9,6 +9,28 @@ frappe.query_reports["Campaign Performance"] = {
 			"fieldtype": "Data",
 			"default": moment(frappe.datetime.now_datetime()).format("MM-DD-YYYY HH:mm:ss"),
 			"read_only": 1
+		},
+		{
+			"fieldname": "from_date",
+			"label": __("Sent From"),
+			"fieldtype": "Date"
+		},
+		{
+			"fieldname": "to_date",
+			"label": __("Sent To"),
+			"fieldtype": "Date"
+		},
+		{
+			"fieldname": "page",
+			"label": __("Page"),
+			"fieldtype": "Int",
+			"default": 1
+		},
+		{
+			"fieldname": "page_length",
+			"label": __("Campaigns per Page"),
+			"fieldtype": "Int",
+			"default": 500
 		}
 	]
 };
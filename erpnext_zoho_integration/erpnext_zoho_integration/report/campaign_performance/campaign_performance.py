@@ -3,6 +3,20 @@
 
 import frappe
 from frappe import _
+from frappe.utils import add_days, cint, getdate
+
+DEFAULT_PAGE_LENGTH = 500
+
+# Report column -> Campaign Metrics field
+REPORT_METRICS = {
+    "emails_sent": "emails_sent",
+    "opens": "opens",
+    "open_rate": "open_rate",
+    "clicks": "unique_clicks",
+    "click_rate": "click_rate",
+    "bounces": "bounces",
+    "unsubscribes": "unsubscribes",
+}
 
 def execute(filters=None):
     columns = get_columns()
@@ -70,42 +84,37 @@ def get_columns():
     ]
 
 def get_data(filters):
-    campaigns = frappe.get_all(
-        "Campaign",
-        filters={"zoho_campaign_id": ["is", "set"]},
-        fields=["name", "campaign_name", "zoho_sent_time"]
+    filters = frappe._dict(filters or {})
+    page_length = cint(filters.page_length) or DEFAULT_PAGE_LENGTH
+    page = max(cint(filters.page), 1)
+
+    conditions = ["campaign.zoho_campaign_id is not null", "campaign.zoho_campaign_id != ''"]
+    if filters.from_date:
+        conditions.append("campaign.zoho_sent_time >= %(from_date)s")
+    if filters.to_date:
+        conditions.append("campaign.zoho_sent_time < %(to_date)s")
+
+    metric_columns = ",\n".join(
+        f"ifnull(metrics.{field}, 0) as {fieldname}" for fieldname, field in REPORT_METRICS.items()
+    )
+
+    return frappe.db.sql(
+        f"""
+        select
+            campaign.name as campaign_name,
+            campaign.zoho_sent_time as sent_time,
+            {metric_columns}
+        from `tabCampaign` campaign
+        left join `tabCampaign Metrics` metrics on metrics.campaign = campaign.name
+        where {" and ".join(conditions)}
+        order by campaign.zoho_sent_time desc, campaign.name
+        limit %(limit)s offset %(offset)s
+        """,
+        {
+            "from_date": getdate(filters.from_date) if filters.from_date else None,
+            "to_date": add_days(getdate(filters.to_date), 1) if filters.to_date else None,
+            "limit": page_length,
+            "offset": (page - 1) * page_length,
+        },
+        as_dict=True,
     )
-    
-    data = []
-    
-    for campaign in campaigns:
-        analytics = frappe.get_all(
-            "Campaign Analytics",
-            filters={"parent": campaign.name},
-            fields=["metric", "value", "percentage"]
-        )
-        
-        row = {
-            "campaign_name": campaign.name,
-            "sent_time": campaign.zoho_sent_time
-        }
-        
-        for metric in analytics:
-            if "Emails Sent" in metric.metric:
-                row["emails_sent"] = int(metric.value or 0)
-            elif metric.metric == "Opens":
-                row["opens"] = int(metric.value or 0)
-            elif metric.metric == "Open Rate %":
-                row["open_rate"] = float(metric.percentage or 0)
-            elif metric.metric == "Unique Clicks":
-                row["clicks"] = int(metric.value or 0)
-            elif metric.metric == "Click Rate %":
-                row["click_rate"] = float(metric.percentage or 0)
-            elif metric.metric == "Bounces":
-                row["bounces"] = int(metric.value or 0)
-            elif metric.metric == "Unsubscribes":
-                row["unsubscribes"] = int(metric.value or 0)
-        
-        data.append(row)
-    
-    return data
\ No newline at end of file
@@ -0,0 +1,137 @@
+# Copyright (c) 2025, Yanky and Contributors
+# See license.txt
+
+from unittest.mock import patch
+
+import frappe
+from frappe.tests.utils import FrappeTestCase
+
+from erpnext_zoho_integration.erpnext_zoho_integration.api import failures
+from erpnext_zoho_integration.erpnext_zoho_integration.api.failures import (
+	FAILURE_WINDOW,
+	FAILURE_WINDOW_KEY,
+	FAILURE_WINDOWS_KEY,
+	TRACEBACK_KEY,
+	flush_failures,
+	record_failure,
+	signature_hash,
+	start_failures,
+	write_failure_summaries,
+)
+
+# Start of a window, so a run and the following summary fall into known windows
+WINDOW_START = 1_800_000_000 // FAILURE_WINDOW * FAILURE_WINDOW
+
+
+class TestFailures(FrappeTestCase):
+	def setUp(self):
+		# An endpoint of its own keeps the buckets apart from anything else on the site
+		self.endpoint = f"/test/{frappe.generate_hash(length=8)}"
+		self.addCleanup(self.clear_cache)
+
+	def clear_cache(self):
+		frappe.flags.zoho_sync_failures = None
+		cache = frappe.cache()
+		for exception in ("ConnectionError", "Timeout"):
+			signature = signature_hash(self.endpoint, exception)
+			cache.delete_value(f"{TRACEBACK_KEY}:{signature}")
+			for window in range(WINDOW_START // FAILURE_WINDOW - 1, WINDOW_START // FAILURE_WINDOW + 2):
+				bucket = f"{signature}:{window}"
+				key = cache.make_key(f"{FAILURE_WINDOW_KEY}:{bucket}")
+				pipeline = cache.pipeline()
+				pipeline.srem(cache.make_key(FAILURE_WINDOWS_KEY), bucket)
+				pipeline.delete(key, f"{key}:campaigns", f"{key}:samples")
+				pipeline.execute()
+
+	def fail(self, exception, campaign, message):
+		record_failure(
+			f"Campaign Sync Error: {campaign}",
+			endpoint=self.endpoint,
+			campaign=campaign,
+			message=message,
+			traceback=f"Traceback (most recent call last):\n{exception}: {message}",
+			exception=exception,
+		)
+
+	def run_job(self, at, *failed):
+		with patch.object(failures.time, "time", return_value=at):
+			start_failures()
+			for exception, campaign, message in failed:
+				self.fail(exception, campaign, message)
+			return flush_failures()
+
+	def summaries(self, at):
+		with (
+			patch.object(failures.time, "time", return_value=at),
+			patch.object(frappe, "log_error") as log_error,
+		):
+			write_failure_summaries()
+		# Other tests or jobs may have left buckets of their own
+		return {
+			call.kwargs["title"]: call.kwargs["message"]
+			for call in log_error.call_args_list
+			if self.endpoint in call.kwargs["message"]
+		}
+
+	def test_failures_of_a_run_are_grouped(self):
+		run = self.run_job(
+			WINDOW_START,
+			("ConnectionError", "Spring Sale", "Connection refused"),
+			("ConnectionError", "Spring Sale", "Connection refused"),
+			("ConnectionError", "Summer Sale", "Connection reset"),
+			("Timeout", "Spring Sale", "Read timed out"),
+		)
+
+		self.assertEqual(len(run.groups), 2)
+		group = run.groups[(self.endpoint, "ConnectionError")]
+		self.assertEqual(group.count, 3)
+		self.assertEqual(group.campaigns, {"Spring Sale", "Summer Sale"})
+		self.assertEqual(group.samples, ["Connection refused", "Connection reset"])
+		self.assertEqual(run.groups[(self.endpoint, "Timeout")].count, 1)
+
+	def test_exception_is_recorded_once(self):
+		with patch.object(failures.time, "time", return_value=WINDOW_START):
+			start_failures()
+			try:
+				try:
+					raise ConnectionError("Connection refused")
+				except ConnectionError as e:
+					record_failure("Zoho API Error", endpoint=self.endpoint)
+					raise RuntimeError("Sync failed") from e
+			except RuntimeError:
+				# The wrapper reports too, its cause was counted already
+				record_failure("Campaign Sync Error", endpoint=self.endpoint)
+			run = flush_failures()
+
+		self.assertEqual(list(run.groups), [(self.endpoint, "ConnectionError")])
+		self.assertEqual(run.groups[(self.endpoint, "ConnectionError")].count, 1)
+
+	def test_jobs_are_summarized_per_window(self):
+		self.run_job(
+			WINDOW_START + 10,
+			("ConnectionError", "Spring Sale", "Connection refused"),
+			("ConnectionError", "Spring Sale", "Connection refused"),
+		)
+		self.run_job(
+			WINDOW_START + 300,
+			("ConnectionError", "Summer Sale", "Connection reset"),
+			("Timeout", "Summer Sale", "Read timed out"),
+		)
+		# Next window, summarized on its own later
+		self.run_job(WINDOW_START + FAILURE_WINDOW + 10, ("ConnectionError", "Autumn Sale", "Connection refused"))
+
+		# Nothing is logged while the window is open
+		self.assertEqual(self.summaries(WINDOW_START + 500), {})
+
+		logged = self.summaries(WINDOW_START + FAILURE_WINDOW + 20)
+		self.assertEqual(len(logged), 2)
+		summary = logged["Zoho Sync Error: ConnectionError (3 failures in 2 campaigns)"]
+		self.assertIn("Campaigns: Spring Sale, Summer Sale", summary)
+		self.assertIn("Occurrences: 3 between", summary)
+		self.assertIn("- Connection refused\n- Connection reset", summary)
+		self.assertIn("Campaign Sync Error: Summer Sale", logged)
+
+		# Every bucket is logged once
+		self.assertEqual(self.summaries(WINDOW_START + FAILURE_WINDOW + 30), {})
+		logged = self.summaries(WINDOW_START + 2 * FAILURE_WINDOW)
+		self.assertEqual(list(logged), ["Campaign Sync Error: Autumn Sale"])
@@ -0,0 +1,90 @@
+# Copyright (c) 2025, Yanky and Contributors
+# See license.txt
+
+import ast
+import json
+from datetime import datetime
+
+from frappe.tests.utils import FrappeTestCase
+
+from erpnext_zoho_integration.erpnext_zoho_integration.api.payload_parser import (
+	MAX_REPORT_LENGTH,
+	PayloadTooLarge,
+	parse_clicked_urls,
+	parse_report,
+	parse_sent_date,
+	report_to_json,
+	repr_to_json,
+)
+from erpnext_zoho_integration.erpnext_zoho_integration.api.pipeline import build_recipient_row
+
+# Reprs the fast JSON rewrite must read exactly like ast.literal_eval
+JSON_REPRS = (
+	"[{'url': 'https://example.com/a', 'time': '05 Dec 2025, 04:30 PM'}]",
+	"{'opened': True, 'bounced': False, 'reason': None}",
+	"['True story', 'None of it', 'False start']",
+	"[{'note': 'it\\'s here'}]",
+	"[{'note': 'say \"hi\"'}]",
+	"{'path': 'C:\\\\temp\\\\new'}",
+	"['tab\\there', 'line\\nbreak', 'caf\\u00e9']",
+	'["double", "it\'s"]',
+	'{"key": "value", \'mixed\': "quotes"}',
+)
+
+# Reprs only ast.literal_eval can read
+PYTHON_REPRS = (
+	"['\\x41\\x42']",
+	"{1: 'one', 2.5: 'two and a half', None: 'none'}",
+	"[(1, 2), 'tuple']",
+)
+
+
+class TestPayloadParser(FrappeTestCase):
+	def test_repr_to_json_matches_literal_eval(self):
+		for value in JSON_REPRS:
+			with self.subTest(value=value):
+				self.assertEqual(json.loads(repr_to_json(value)), ast.literal_eval(value))
+
+	def test_parse_report_matches_literal_eval(self):
+		for value in JSON_REPRS + PYTHON_REPRS:
+			with self.subTest(value=value):
+				self.assertEqual(parse_report(value), ast.literal_eval(value))
+
+	def test_parse_report_rejects_unparsable_and_oversized(self):
+		self.assertRaises(ValueError, parse_report, "[{'url': ")
+		self.assertRaises(PayloadTooLarge, parse_report, "'" + "x" * MAX_REPORT_LENGTH + "'")
+
+	def test_report_to_json(self):
+		self.assertIsNone(report_to_json(""))
+		self.assertEqual(json.loads(report_to_json("[{'url': 'https://a.example'}]")), [{"url": "https://a.example"}])
+		# Unparsable reports are stored as they came
+		self.assertEqual(report_to_json("[{'url': "), "[{'url': ")
+		self.assertRaises(PayloadTooLarge, report_to_json, "'" + "x" * MAX_REPORT_LENGTH + "'")
+
+	def test_oversized_report_warns(self):
+		warnings = []
+		row = build_recipient_row(
+			{"contactemailaddress": "big@example.com", "openreports": "'" + "x" * MAX_REPORT_LENGTH + "'"},
+			"Opened",
+			warnings,
+		)
+		self.assertIsNone(row["open_reports"])
+		self.assertEqual(len(warnings), 1)
+		self.assertIn("big@example.com", warnings[0])
+
+	def test_parse_sent_date(self):
+		self.assertEqual(parse_sent_date("05 Dec 2025, 04:21 PM"), datetime(2025, 12, 5, 16, 21))
+		self.assertEqual(parse_sent_date("05 Dec 2025, 12:00 AM"), datetime(2025, 12, 5, 0, 0))
+		self.assertEqual(parse_sent_date("05 Dec 2025, 12:30 PM"), datetime(2025, 12, 5, 12, 30))
+		self.assertEqual(parse_sent_date("5 dec 2025, 12:30 am"), datetime(2025, 12, 5, 0, 30))
+		self.assertRaises(ValueError, parse_sent_date, "05 Dec 2025, 13:00 PM")
+		self.assertRaises(ValueError, parse_sent_date, None)
+
+	def test_parse_clicked_urls(self):
+		self.assertEqual(parse_clicked_urls(None), [])
+		self.assertEqual(parse_clicked_urls("[]"), [])
+		self.assertEqual(
+			parse_clicked_urls("[https://example.com/?ids=1,2,3, https://example.com/b,c, http://example.org]"),
+			["https://example.com/?ids=1,2,3", "https://example.com/b,c", "http://example.org"],
+		)
+		self.assertEqual(parse_clicked_urls(["https://a.example", "https://b.example"]), ["https://a.example", "https://b.example"])
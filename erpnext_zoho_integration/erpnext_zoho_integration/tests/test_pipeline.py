@@ -0,0 +1,49 @@
+# Copyright (c) 2025, Yanky and Contributors
+# See license.txt
+
+from frappe.tests.utils import FrappeTestCase
+
+from erpnext_zoho_integration.erpnext_zoho_integration.api.pipeline import StagedPage, ordered_pages
+
+
+def page(action, fromindex, received=10, error=None):
+	return StagedPage(action, fromindex, received=received, error=error)
+
+
+def keys(pages):
+	return [(page.action, page.fromindex) for page in pages]
+
+
+class TestOrderedPages(FrappeTestCase):
+	def test_pages_leave_in_order(self):
+		arrivals = [
+			page("opened", 21),
+			page("clicked", 1),
+			page("opened", 11),
+			page("opened", 31, received=0),
+			page("opened", 1),
+			page("clicked", 11, received=0),
+		]
+		self.assertEqual(
+			keys(ordered_pages(arrivals, {"opened": 1, "clicked": 1})),
+			[("clicked", 1), ("opened", 1), ("opened", 11), ("opened", 21)],
+		)
+
+	def test_held_pages_wait_for_a_resumed_start(self):
+		arrivals = [page("opened", 111), page("opened", 101)]
+		self.assertEqual(keys(ordered_pages(arrivals, {"opened": 101})), [("opened", 101), ("opened", 111)])
+
+	def test_nothing_after_a_failed_page(self):
+		arrivals = [page("opened", 11), page("opened", 1, received=0, error=ValueError("boom"))]
+		ordered = list(ordered_pages(arrivals, {"opened": 1}))
+		self.assertEqual(keys(ordered), [("opened", 1)])
+		self.assertIsNotNone(ordered[0].error)
+
+	def test_cursor_never_skips_a_page(self):
+		# The cursor the sync stores after each written page must always be the next page to fetch
+		arrivals = [page("opened", 1 + 10 * i) for i in (3, 1, 4, 0, 2)]
+		cursor = 1
+		for ordered in ordered_pages(arrivals, {"opened": 1}):
+			self.assertEqual(ordered.fromindex, cursor)
+			cursor = ordered.fromindex + ordered.received
+		self.assertEqual(cursor, 51)
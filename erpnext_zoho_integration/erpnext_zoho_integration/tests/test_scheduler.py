@@ -0,0 +1,57 @@
+# Copyright (c) 2025, Yanky and Contributors
+# See license.txt
+
+from datetime import datetime, timedelta
+
+from frappe.tests.utils import FrappeTestCase
+
+from erpnext_zoho_integration.erpnext_zoho_integration.api.scheduler import (
+	SETTLING_INTERVAL,
+	get_next_sync_at,
+)
+
+NOW = datetime(2026, 1, 10, 12, 0)
+SETTLE_WINDOW = timedelta(days=30)
+
+
+def next_sync_at(sent_ago, recipients_synced_on=None, min_interval=None):
+	sent_time = NOW - sent_ago if sent_ago is not None else None
+	return get_next_sync_at(sent_time, recipients_synced_on, NOW, SETTLE_WINDOW, min_interval)
+
+
+class TestScheduler(FrappeTestCase):
+	def test_tiers_by_age(self):
+		self.assertEqual(next_sync_at(timedelta(hours=1)), NOW + timedelta(minutes=5))
+		# Tiers are upper bounds on the age
+		self.assertEqual(next_sync_at(timedelta(days=1)), NOW + timedelta(hours=1))
+		self.assertEqual(next_sync_at(timedelta(days=3)), NOW + timedelta(hours=1))
+		self.assertEqual(next_sync_at(timedelta(days=10)), NOW + SETTLING_INTERVAL)
+
+	def test_unknown_sent_time(self):
+		self.assertEqual(next_sync_at(None), NOW + SETTLING_INTERVAL)
+
+	def test_final_pass_when_window_closes(self):
+		# Half a day before the window closes, the final pass is not pushed past it
+		self.assertEqual(next_sync_at(timedelta(days=29, hours=12)), NOW + timedelta(hours=12))
+
+	def test_settle(self):
+		sent_ago = timedelta(days=40)
+		settled_on = NOW - sent_ago + SETTLE_WINDOW
+
+		# Synced after the window closed: never again
+		self.assertIsNone(next_sync_at(sent_ago, settled_on))
+		self.assertIsNone(next_sync_at(sent_ago, NOW))
+		# Not synced since the window closed: the final pass is retried daily
+		self.assertEqual(next_sync_at(sent_ago), NOW + SETTLING_INTERVAL)
+		self.assertEqual(next_sync_at(sent_ago, settled_on - timedelta(minutes=1)), NOW + SETTLING_INTERVAL)
+
+	def test_reconcile_interval(self):
+		reconcile = timedelta(hours=6)
+		# Webhooks keep young campaigns current, polls wait for the reconcile interval
+		self.assertEqual(next_sync_at(timedelta(hours=1), min_interval=reconcile), NOW + reconcile)
+		# Slower tiers are not made faster
+		self.assertEqual(next_sync_at(timedelta(days=10), min_interval=reconcile), NOW + SETTLING_INTERVAL)
+		# The final pass still runs when the window closes
+		self.assertEqual(
+			next_sync_at(timedelta(days=29, hours=22), min_interval=reconcile), NOW + timedelta(hours=2)
+		)
@@ -0,0 +1,84 @@
+# Copyright (c) 2025, Yanky and Contributors
+# See license.txt
+
+from datetime import timedelta
+from unittest.mock import patch
+
+import frappe
+from frappe.tests.utils import FrappeTestCase
+from frappe.utils import get_datetime, now_datetime
+
+from erpnext_zoho_integration.erpnext_zoho_integration.api.sync import sync_due_campaigns
+
+
+class TestSyncDueCampaigns(FrappeTestCase):
+	def setUp(self):
+		frappe.flags.zoho_sync_now = False
+		self.now = now_datetime()
+		self.enqueued = {}
+
+	def make_campaign(self, title, next_sync_at, sent_ago, recipients_synced_on=None):
+		campaign = frappe.get_doc(
+			{
+				"doctype": "Campaign",
+				"campaign_name": f"_Test Zoho Tick {title} {frappe.generate_hash(length=6)}",
+				"zoho_campaign_id": f"tick-{frappe.generate_hash(length=10)}",
+				"zoho_campaign_key": frappe.generate_hash(length=10),
+				"zoho_sent_time": self.now - sent_ago,
+				"zoho_recipients_synced_on": recipients_synced_on,
+				"zoho_next_sync_at": next_sync_at,
+			}
+		).insert(ignore_permissions=True)
+		self.addCleanup(self.delete_campaign, campaign.name)
+		return campaign.name
+
+	def delete_campaign(self, name):
+		frappe.delete_doc("Campaign", name, force=True, ignore_permissions=True)
+		frappe.db.commit()
+
+	def enqueue(self, method, **kwargs):
+		# What the job will find when it starts
+		name = kwargs["campaign_name"]
+		self.enqueued[name] = frappe.db.get_value("Campaign", name, "zoho_next_sync_at")
+
+	def tick(self):
+		with patch.object(frappe, "enqueue", side_effect=self.enqueue):
+			sync_due_campaigns()
+
+	def next_sync_at(self, name):
+		return frappe.db.get_value("Campaign", name, "zoho_next_sync_at")
+
+	def test_due_campaigns_are_queued_after_moving_on(self):
+		due = self.make_campaign("Due", self.now - timedelta(minutes=1), timedelta(hours=1))
+		later = self.make_campaign("Later", self.now + timedelta(hours=1), timedelta(hours=1))
+
+		self.tick()
+
+		self.assertIn(due, self.enqueued)
+		self.assertGreater(get_datetime(self.enqueued[due]), self.now)
+		self.assertEqual(get_datetime(self.next_sync_at(due)), get_datetime(self.enqueued[due]))
+
+		# Not due yet: neither queued nor rescheduled
+		self.assertNotIn(later, self.enqueued)
+		self.assertEqual(get_datetime(self.next_sync_at(later)), self.now + timedelta(hours=1))
+
+		# Queued once, the following tick leaves it to the running job
+		self.enqueued.clear()
+		self.tick()
+		self.assertNotIn(due, self.enqueued)
+
+	def test_settled_campaigns_are_skipped(self):
+		settled = self.make_campaign("Settled", None, timedelta(days=400), self.now)
+		# Synced after its settle window closed, a due pass settles it for good
+		settling = self.make_campaign("Settling", self.now - timedelta(minutes=1), timedelta(days=400), self.now)
+
+		self.tick()
+
+		self.assertNotIn(settled, self.enqueued)
+		self.assertIsNone(self.next_sync_at(settled))
+
+		self.assertIn(settling, self.enqueued)
+		self.assertIsNone(self.enqueued[settling])
+		self.enqueued.clear()
+		self.tick()
+		self.assertNotIn(settling, self.enqueued)
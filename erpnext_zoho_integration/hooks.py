@@ -170,8 +170,18 @@ doctype_js = {
 # }
 scheduler_events = {
     "hourly": [
-        "erpnext_zoho_integration.erpnext_zoho_integration.api.sync.sync_all_campaigns"
-    ]
+        "erpnext_zoho_integration.erpnext_zoho_integration.api.sync.scheduled_sync"
+    ],
+    "daily": [
+        "erpnext_zoho_integration.erpnext_zoho_integration.api.journal.prune_journal"
+    ],
+    "cron": {
+        "* * * * *": [
+            "erpnext_zoho_integration.erpnext_zoho_integration.api.webhook.process_webhook_events",
+            "erpnext_zoho_integration.erpnext_zoho_integration.api.sync.sync_due_campaigns",
+            "erpnext_zoho_integration.erpnext_zoho_integration.api.failures.write_failure_summaries"
+        ]
+    }
 }
 
 # Testing
@@ -249,4 +259,7 @@ scheduler_events = {
 # default_log_clearing_doctypes = {
 # 	"Logging DocType Name": 30  # days to retain logs
 # }
+default_log_clearing_doctypes = {
+    "Zoho Sync Run": 30
+}
 
@@ -4,38 +4,71 @@ frappe.ui.form.on('Campaign', {
 
         frm.add_custom_button(__('Sync from Zoho'), function () {
             frappe.call({
-                method: 'erpnext_zoho_integration.erpnext_zoho_integration.api.sync.sync_campaign_by_name',
+                method: 'erpnext_zoho_integration.erpnext_zoho_integration.api.sync.enqueue_campaign_sync_by_name',
                 args: { campaign_name: frm.doc.name },
-                freeze: true,
-                freeze_message: __('Syncing campaign data...'),
                 callback(r) {
                     if (r.message?.success) {
                         frappe.show_alert({
-                            message: __('Campaign synced successfully'),
-                            indicator: 'green'
+                            message: r.message.message,
+                            indicator: r.message.queued ? 'blue' : 'orange'
                         });
-                        frm.reload_doc();
                     }
                 }
             });
         });
 
-        setTimeout(() => {
-            render_campaign_dashboard(frm);
-        }, 500);
+        load_campaign_dashboard(frm);
     },
     
     onload: function(frm) {
-        if (frm.doc.zoho_campaign_key) {
-            setTimeout(() => {
-                render_campaign_dashboard(frm);
-            }, 1000);
-        }
+        // Progress of the background sync queued by "Sync from Zoho"
+        frappe.realtime.off('zoho_campaign_sync_progress');
+        frappe.realtime.on('zoho_campaign_sync_progress', (data) => {
+            if (data.campaign !== frm.doc.name) return;
+            show_sync_progress(frm, data);
+        });
     }
 });
 
-function render_campaign_dashboard(frm) {
-    if (!frm.doc.campaign_analytics || !Array.isArray(frm.doc.campaign_analytics) || frm.doc.campaign_analytics.length === 0) {
+function show_sync_progress(frm, data) {
+    if (data.status === 'Completed' || data.status === 'Failed') {
+        frm.dashboard.hide_progress(__('Zoho Sync'));
+        frappe.show_alert({
+            message: data.message,
+            indicator: data.status === 'Completed' ? 'green' : 'red'
+        });
+        if (data.status === 'Completed') {
+            // Recipient writes don't touch last_synced, so drop the payload explicitly
+            frm.zoho_dashboard = null;
+            frm.reload_doc();
+        }
+        return;
+    }
+
+    frm.dashboard.show_progress(__('Zoho Sync'), data.progress, data.message);
+}
+
+function load_campaign_dashboard(frm) {
+    // refresh runs on every save and reload, the payload only changes with a sync
+    const version = `${frm.doc.name}:${frm.doc.last_synced}`;
+    if (frm.zoho_dashboard && frm.zoho_dashboard.version === version) {
+        render_campaign_dashboard(frm, frm.zoho_dashboard.payload);
+        return;
+    }
+
+    frappe.call({
+        method: 'erpnext_zoho_integration.erpnext_zoho_integration.api.dashboard.get_campaign_dashboard',
+        args: { campaign_name: frm.doc.name },
+        callback(r) {
+            if (!r.message || frm.doc.name !== r.message.campaign) return;
+            frm.zoho_dashboard = { version, payload: r.message };
+            render_campaign_dashboard(frm, r.message);
+        }
+    });
+}
+
+function render_campaign_dashboard(frm, dashboard) {
+    if (!dashboard.metrics.length && !Object.keys(dashboard.action_counts).length) {
         return;
     }
 
@@ -121,6 +154,24 @@ function render_campaign_dashboard(frm) {
             color: #9CA3AF;
             margin-top: 2px;
         }
+        .zoho-dashboard-table {
+            width: 100%;
+            font-size: 13px;
+        }
+        .zoho-dashboard-table td {
+            padding: 6px 8px;
+            border-bottom: 1px solid #f3f4f6;
+        }
+        .zoho-dashboard-table td.url {
+            max-width: 480px;
+            overflow: hidden;
+            text-overflow: ellipsis;
+            white-space: nowrap;
+        }
+        .zoho-dashboard-table td.count {
+            text-align: right;
+            white-space: nowrap;
+        }
         .zoho-metric-card::before {
             content: '';
             position: absolute;
@@ -152,113 +203,98 @@ function render_campaign_dashboard(frm) {
         $('<style id="zoho-dashboard-styles">').text(gridCSS).appendTo('head');
     }
 
-    // Group metrics
-    const metricMapping = {
-        'Opened': ['total opens', 'unique opens', 'opens', 'opened', 'total opened'],
-        'Clicked': ['total clicks', 'unique clicks', 'clicks', 'clicked', 'total clicked'],
-        'Bounced': ['bounces', 'total bounces', 'bounced', 'hard bounces', 'soft bounces'],
-        'Unsubscribed': ['unsubscribes', 'total unsubscribes', 'unsubscribed'],
-        'Complaint': ['spam complaints', 'complaints', 'spam', 'complaint'],
-        'info': ['emails sent', 'sent', 'total sent', 'delivered', 'total delivered', 
-                 'click through rate', 'ctr', 'open rate', 'unique open rate']
-    };
+    // Recipients per action, linking to their Campaign Recipient list
+    const actions = [
+        ['Opened', '#5e64ff'],
+        ['Clicked', '#5856d6'],
+        ['Hard Bounced', '#ff9500'],
+        ['Soft Bounced', '#ffcc00'],
+        ['Unsubscribed', '#ff3b30'],
+        ['Complaint', '#ff2d55']
+    ].filter(([action]) => dashboard.action_counts[action]);
 
-    const engagementMetrics = [];
-    const infoMetrics = [];
-    
-    frm.doc.campaign_analytics.forEach(metric => {
-        if (!metric.metric || !metric.value) return;
-        
-        let action = null;
-        const metricLower = metric.metric.toLowerCase();
-        
-        for (const [actionType, keywords] of Object.entries(metricMapping)) {
-            if (actionType === 'info') continue;
-            if (keywords.some(keyword => metricLower.includes(keyword))) {
-                action = actionType;
-                break;
-            }
-        }
-        
-        if (action) {
-            engagementMetrics.push({...metric, action});
-        } else if (metricMapping.info.some(keyword => metricLower.includes(keyword))) {
-            infoMetrics.push({...metric, action: 'info'});
-        }
-    });
+    // Campaign Metrics shown as cards, the rest stays in the analytics table
+    const stat_fields = ['emails_sent', 'delivered', 'open_rate', 'click_rate', 'bounce_rate', 'unsubscribe_rate'];
+    const stats = dashboard.metrics.filter(metric => stat_fields.includes(metric.fieldname));
 
-    // Build HTML
     let html = `<div class="zoho-campaign-dashboard">`;
     
-    // Engagement metrics section
-    if (engagementMetrics.length > 0) {
+    if (actions.length > 0) {
         html += `<div class="zoho-dashboard-section">
-                    <h4>Engagement Metrics</h4>
+                    <h4>${__('Engagement Metrics')}</h4>
                     <div class="zoho-metrics-container">`;
         
-        const colors = ['#5e64ff', '#5856d6', '#ff9500', '#ff3b30', '#ff2d55', '#34c759'];
-        
-        engagementMetrics.slice(0, 6).forEach((metric, index) => {
-            const color = colors[index % colors.length];
+        actions.forEach(([action, color]) => {
             html += `
                 <div class="zoho-metric-card clickable" 
-                     data-action="${metric.action}"
+                     data-action="${action}"
                      style="color: ${color}">
-                    <div class="metric-label" title="${metric.metric}">
-                        ${metric.metric}
+                    <div class="metric-label" title="${__(action)}">
+                        ${__(action)}
                     </div>
-                    <div class="metric-value">${metric.value}</div>
-                    ${metric.percentage > 0 ? `<div class="metric-percentage">${metric.percentage}%</div>` : ''}
+                    <div class="metric-value">${format_number(dashboard.action_counts[action], null, 0)}</div>
                 </div>`;
         });
         
         html += `</div></div>`;
     }
     
-    // Info metrics section
-    if (infoMetrics.length > 0) {
+    if (stats.length > 0) {
         html += `<div class="zoho-dashboard-section">
-                    <h4>Campaign Stats</h4>
+                    <h4>${__('Campaign Stats')}</h4>
                     <div class="zoho-metrics-container">`;
         
         const colors = ['#10b981', '#3b82f6', '#8b5cf6', '#f59e0b', '#ef4444', '#ec4899'];
         
-        infoMetrics.slice(0, 6).forEach((metric, index) => {
+        stats.forEach((metric, index) => {
             const color = colors[index % colors.length];
+            const value = metric.fieldtype === 'Percent'
+                ? `${flt(metric.value, 2)}%`
+                : format_number(metric.value, null, 0);
             html += `
                 <div class="zoho-metric-card" style="color: ${color}">
-                    <div class="metric-label" title="${metric.metric}">
-                        ${metric.metric}
+                    <div class="metric-label" title="${__(metric.label)}">
+                        ${__(metric.label)}
                     </div>
-                    <div class="metric-value">${metric.value}</div>
-                    ${metric.percentage > 0 ? `<div class="metric-percentage">${metric.percentage}%</div>` : ''}
+                    <div class="metric-value">${value}</div>
                 </div>`;
         });
         
         html += `</div></div>`;
     }
     
-    // Fallback
-    if (engagementMetrics.length === 0 && infoMetrics.length === 0) {
+    if (dashboard.top_links.length > 0) {
         html += `<div class="zoho-dashboard-section">
-                    <h4>Campaign Analytics</h4>
-                    <div class="zoho-metrics-container">`;
+                    <h4>${__('Top Links')}</h4>
+                    <table class="zoho-dashboard-table">`;
         
-        const colors = ['#5e64ff', '#10b981', '#f59e0b', '#ef4444', '#8b5cf6', '#ec4899'];
+        dashboard.top_links.forEach(link => {
+            const url = frappe.utils.escape_html(link.url);
+            html += `
+                <tr>
+                    <td class="url" title="${url}">${url}</td>
+                    <td class="count">${__('{0} clicks', [format_number(link.total_clicks, null, 0)])}</td>
+                    <td class="count">${__('{0} unique', [format_number(link.unique_clicks, null, 0)])}</td>
+                </tr>`;
+        });
         
-        frm.doc.campaign_analytics.slice(0, 6).forEach((metric, index) => {
-            const color = colors[index % colors.length];
+        html += `</table></div>`;
+    }
+    
+    if (dashboard.countries.length > 0) {
+        html += `<div class="zoho-dashboard-section">
+                    <h4>${__('Recipients by Country')}</h4>
+                    <table class="zoho-dashboard-table">`;
+        
+        dashboard.countries.forEach(row => {
             html += `
-                <div class="zoho-metric-card" style="color: ${color}">
-                    <div class="metric-label" title="${metric.metric}">
-                        ${metric.metric}
-                    </div>
-                    <div class="metric-value">${metric.value}</div>
-                    ${metric.percentage > 0 ? `<div class="metric-percentage">${metric.percentage}%</div>` : ''}
-                </div>`;
+                <tr>
+                    <td>${frappe.utils.escape_html(row.country)}</td>
+                    <td class="count">${format_number(row.recipients, null, 0)}</td>
+                </tr>`;
         });
         
-        html += `</div></div>`;
+        html += `</table></div>`;
     }
     
     html += `</div>`;